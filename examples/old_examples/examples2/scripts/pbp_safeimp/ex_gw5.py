@@ -259,16 +259,13 @@ if __name__ == '__main__':
         json.dump({str(st): str(sasi.rank(st)) for st in imdp.states()}, file, indent=2)
 
     with open("out/win0.json", "w") as file:
-        win = imdp._winning_regions[0]
-        json.dump([win.graph()["state"][uid] for uid in win.win1()], file)
+        json.dump(list(imdp._winning_regions[0]), file)
 
     with open("out/win1.json", "w") as file:
-        win = imdp._winning_regions[1]
-        json.dump([win.graph()["state"][uid] for uid in win.win1()], file)
+        json.dump(list(imdp._winning_regions[1]), file)
 
     with open("out/win2.json", "w") as file:
-        win = imdp._winning_regions[2]
-        json.dump([win.graph()["state"][uid] for uid in win.win1()], file)
+        json.dump(list(imdp._winning_regions[2]), file)
 
     print(f"level 3 has {len(sasi.win1()[3])} states, i_state=0: ",
           len([imdp_graph["state"][uid] for uid in imdp_graph.nodes()
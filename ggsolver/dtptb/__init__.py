@@ -1,5 +1,8 @@
 from ggsolver.dtptb.models import DTPTBGame, ProductWithDFA
 from ggsolver.dtptb.reach import SWinReach, SWinSafe, ASWinReach, ASWinSafe
+from ggsolver.dtptb.buchi import SWinBuchi, SWinCoBuchi
+from ggsolver.dtptb.parity import SWinParity, SWinParityPP
+from ggsolver.dtptb.quotient import Quotient
 
 __all__ = [
     "DTPTBGame",
@@ -7,5 +10,10 @@ __all__ = [
     "SWinReach",
     "SWinSafe",
     "ASWinReach",
-    "ASWinSafe"
+    "ASWinSafe",
+    "SWinBuchi",
+    "SWinCoBuchi",
+    "SWinParity",
+    "SWinParityPP",
+    "Quotient"
 ]
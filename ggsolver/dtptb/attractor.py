@@ -0,0 +1,235 @@
+"""
+Array-backed attractor engine for deterministic two-player turn-based games.
+"""
+
+import numpy as np
+
+from ggsolver.graph import GraphIndex, _gather
+
+
+class Attractor:
+    """
+    Computes attractors in a game graph and in its subgames.
+
+    The game graph is compiled once into flat arrays: an edge list, the successor and predecessor indices of every
+    node (in CSR format) and the turn of every node. The edge arrays and indices are shared with other solvers of
+    the same graph (see :class:`ggsolver.graph.GraphIndex`). The engine maintains a *subgame*, which is represented
+    by a boolean mask of alive nodes, together with a persistent array that counts the successors of every node
+    within the subgame. Removing nodes from the subgame updates the counts incrementally. Hence, nested fixpoint
+    algorithms (Buchi, co-Buchi, parity) do not recount the successors before every attractor computation.
+
+    Nodes are indexed by their node ids in the graph. Edges are indexed by their position in :meth:`Attractor.edges`.
+
+    :param graph: (Graph or SubGraph instance) A graph or subgraph of a deterministic two-player turn-based game.
+    :param turn: (str) Name of the node property that defines which player controls a node. [Default: "turn"]
+    """
+    def __init__(self, graph, turn="turn"):
+        # Compiled graph arrays are shared with other solvers via the cached graph index.
+        index = GraphIndex.of(graph)
+        nodes = index.nodes
+        self._edges = index.edges
+        self._num_nodes = index.num_nodes
+        self._src = index.src
+        self._dst = index.dst
+        self._succ_eid, self._succ_ptr = index.succ_eid, index.succ_ptr
+        self._pred_eid, self._pred_ptr = index.pred_eid, index.pred_ptr
+
+        # Turn array
+        np_turn = graph[turn]
+        self._turn = np.zeros(self._num_nodes, dtype=np.int8)
+        self._turn[nodes] = [np_turn[uid] for uid in nodes.tolist()]
+
+        # Subgame: alive nodes and number of successors of each node within the subgame.
+        self._alive = np.zeros(self._num_nodes, dtype=bool)
+        self._alive[nodes] = True
+        self._degree = np.bincount(self._src, minlength=self._num_nodes)
+
+    def __str__(self):
+        return f"<Attractor with |V|={self._num_nodes}, |E|={len(self._edges)}>"
+
+    # ==========================================================================
+    # PROPERTIES
+    # ==========================================================================
+    @property
+    def num_nodes(self):
+        """ Size of node-indexed arrays (largest node id + 1). """
+        return self._num_nodes
+
+    @property
+    def edges(self):
+        """ List of edges (uid, vid, key). The position of an edge in the list is its edge id. """
+        return self._edges
+
+    @property
+    def src(self):
+        """ Array mapping edge id to its source node. """
+        return self._src
+
+    @property
+    def dst(self):
+        """ Array mapping edge id to its target node. """
+        return self._dst
+
+    @property
+    def turn(self):
+        """ Array mapping node id to the player who controls it. """
+        return self._turn
+
+    @property
+    def alive(self):
+        """ Boolean mask of nodes in the current subgame. """
+        return self._alive
+
+    @property
+    def degree(self):
+        """ Array mapping node id to its number of successors in the current subgame. """
+        return self._degree
+
+    # ==========================================================================
+    # SUBGAME MANIPULATION
+    # ==========================================================================
+    def copy(self):
+        """
+        Returns a copy of the engine that shares the compiled graph arrays but has its own subgame.
+        """
+        other = Attractor.__new__(Attractor)
+        other.__dict__.update(self.__dict__)
+        other._alive = self._alive.copy()
+        other._degree = self._degree.copy()
+        return other
+
+    def nodes(self):
+        """ Array of nodes in the current subgame. """
+        return np.flatnonzero(self._alive)
+
+    def mask(self, nodes):
+        """ Converts an iterable of node ids (or a boolean mask) to a boolean mask restricted to the subgame. """
+        if isinstance(nodes, np.ndarray) and nodes.dtype == bool:
+            return nodes & self._alive
+        mask = np.zeros(self._num_nodes, dtype=bool)
+        mask[self._as_index(nodes)] = True
+        return mask & self._alive
+
+    def remove(self, nodes):
+        """
+        Removes the given nodes from the subgame.
+        The successor counts of their predecessors are decremented (incremental update).
+
+        :param nodes: (Iterable[int] or boolean mask) Nodes to be removed.
+        """
+        nodes = np.flatnonzero(self.mask(nodes))
+        self._alive[nodes] = False
+        eids = _gather(self._pred_ptr, self._pred_eid, nodes)
+        np.subtract.at(self._degree, self._src[eids], 1)
+
+    def restrict(self, nodes):
+        """
+        Sets the subgame to the given set of nodes. The successor counts are recomputed.
+
+        :param nodes: (Iterable[int] or boolean mask) Nodes in the new subgame. Must be nodes of the game graph.
+        """
+        mask = np.zeros(self._num_nodes, dtype=bool)
+        if isinstance(nodes, np.ndarray) and nodes.dtype == bool:
+            mask[:] = nodes
+        else:
+            mask[self._as_index(nodes)] = True
+        self._alive = mask
+        inside = self._alive[self._src] & self._alive[self._dst]
+        self._degree = np.bincount(self._src[inside], minlength=self._num_nodes)
+
+    # ==========================================================================
+    # ATTRACTOR COMPUTATION
+    # ==========================================================================
+    def attractor(self, target, player, strategy=None):
+        """
+        Computes the attractor of the target set for the player within the current subgame.
+
+        :param target: (Iterable[int] or boolean mask) Target nodes. Nodes outside subgame are ignored.
+        :param player: (int) The player (1 or 2) who wants to reach the target.
+        :param strategy: (numpy array or None) If provided, for every node of the player added to the attractor,
+            `strategy[node]` is set to the id of an edge that leads to a node with a smaller rank.
+        :return: (tuple of numpy arrays) A boolean mask of the attractor and an array mapping every node in the
+            attractor to its rank (the number of steps in which the player can force a visit to target).
+            Nodes outside the attractor have rank -1.
+        """
+        attr = self.mask(target)
+        rank = np.full(self._num_nodes, -1, dtype=np.int64)
+        rank[attr] = 0
+        count = self._degree.copy()
+
+        level = 0
+        frontier = np.flatnonzero(attr)
+        while frontier.size > 0:
+            level += 1
+
+            # Edges entering the frontier from the subgame nodes that are not yet in attractor.
+            eids = _gather(self._pred_ptr, self._pred_eid, frontier)
+            srcs = self._src[eids]
+            keep = self._alive[srcs] & ~attr[srcs]
+            eids, srcs = eids[keep], srcs[keep]
+            own = self._turn[srcs] == player
+
+            # A node of the player is attracted by a single edge into the attractor.
+            own_nodes, first = np.unique(srcs[own], return_index=True)
+            if strategy is not None:
+                strategy[own_nodes] = eids[own][first]
+
+            # A node of the opponent is attracted when all its edges in subgame lead into the attractor.
+            opp_srcs = srcs[~own]
+            np.subtract.at(count, opp_srcs, 1)
+            opp_nodes = np.unique(opp_srcs[count[opp_srcs] == 0])
+
+            frontier = np.concatenate([own_nodes, opp_nodes])
+            attr[frontier] = True
+            rank[frontier] = level
+
+        return attr, rank
+
+    def remove_dead_ends(self, strategy=None):
+        """
+        Removes the regions where a player can force the play to reach a dead end (a node without successors in the
+        subgame) of the opponent, who cannot move and loses. After removal, no node in the subgame is a dead end.
+
+        :param strategy: (numpy array or None) Strategy array, updated by attractor computation
+            (see :meth:`Attractor.attractor`).
+        :return: (tuple of numpy arrays) Regions won by player 1 and player 2 as boolean masks.
+        """
+        win = dict()
+        for player in [2, 1]:
+            opponent = 1 if player == 2 else 2
+            dead_ends = self._alive & (self._degree == 0) & (self._turn == opponent)
+            win[player], _ = self.attractor(dead_ends, player, strategy=strategy)
+            self.remove(win[player])
+        return win[1], win[2]
+
+    def out_edges(self, nodes):
+        """
+        Returns the ids of edges leaving the given nodes. Targets are not restricted to the subgame.
+
+        :param nodes: (Iterable[int] or boolean mask) Source nodes.
+        :return: (numpy array) Edge ids.
+        """
+        return _gather(self._succ_ptr, self._succ_eid, np.flatnonzero(self.mask(nodes)))
+
+    def successor_edge(self, nodes, target):
+        """
+        For every given node, selects an edge that leads into the target set.
+
+        :param nodes: (Iterable[int] or boolean mask) Source nodes.
+        :param target: (boolean mask) Target nodes.
+        :return: (tuple of numpy arrays) The nodes that have an edge into target and the selected edge ids.
+        """
+        eids = self.out_edges(nodes)
+        eids = eids[target[self._dst[eids]]]
+        srcs, first = np.unique(self._src[eids], return_index=True)
+        return srcs, eids[first]
+
+    # ==========================================================================
+    # HELPER FUNCTIONS
+    # ==========================================================================
+    @staticmethod
+    def _as_index(nodes):
+        """ Converts an iterable of node ids to an integer array. """
+        if isinstance(nodes, np.ndarray):
+            return nodes.astype(np.int64, copy=False)
+        return np.fromiter(nodes, dtype=np.int64)
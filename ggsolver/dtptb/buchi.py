@@ -0,0 +1,167 @@
+import logging
+import numpy as np
+from tqdm import tqdm
+
+from ggsolver.dtptb.attractor import Attractor
+from ggsolver.dtptb.reach import SWinReach
+
+
+logger = logging.getLogger(__name__)
+
+
+class SWinBuchi(SWinReach):
+    """
+    Computes sure winning region for player 1 or player 2 to visit a set of final states infinitely often in a
+    deterministic two-player turn-based game.
+
+    Implements the classical nested fixpoint algorithm. In every iteration, the attractor R of final states for the
+    player is computed within the current subgame. The remaining nodes form a trap for the player, whose attractor
+    for the opponent is winning for the opponent and is removed from the subgame. The algorithm terminates when
+    every final state in the subgame can be revisited, i.e., R equals the subgame.
+
+    A player who cannot move loses the game (as in :class:`ggsolver.dtptb.parity.SWinParity`). Hence, the regions
+    where a player can force the play to reach a dead end of the opponent are removed before solving the game
+    (see :meth:`ggsolver.dtptb.attractor.Attractor.remove_dead_ends`). In particular, a final dead end is losing
+    for the player who controls it.
+
+    All attractors are computed by a shared :class:`ggsolver.dtptb.attractor.Attractor` engine, which updates the
+    successor counts incrementally when the opponent's region is removed from the subgame.
+
+    :param graph: (Graph or SubGraph instance) A graph or subgraph of a deterministic two-player turn-based game.
+    :param final: (Iterable) The set of final states. By default, the final states are determined using
+        node property "final" of the graph.
+    :param player: (int) The player who has the Buchi objective.
+        Value should be 1 for player 1, and 2 for player 2.
+    """
+    def __init__(self, graph, final=None, player=1, **kwargs):
+        super(SWinBuchi, self).__init__(graph, final=final, player=player, **kwargs)
+
+    def solve(self):
+        """ Implements the nested fixpoint algorithm to determine winning nodes and edges for each player. """
+        # Reset solver
+        self.reset()
+
+        player = self._player
+        opponent = 1 if self._player == 2 else 2
+
+        engine = Attractor(self._graph)
+        n = engine.num_nodes
+        final = engine.mask(self._final)
+
+        # Strategy edges (edge ids) and ranks used to identify winning edges.
+        p_strategy = np.full(n, -1, dtype=np.int64)
+        p_rank = np.full(n, -1, dtype=np.int64)
+        np_strategy = np.full(n, -1, dtype=np.int64)
+        np_rank = np.full(n, -1, dtype=np.int64)
+        np_iter = np.full(n, -1, dtype=np.int64)
+        np_win = np.zeros(n, dtype=bool)
+
+        # Dead ends: a player who cannot move loses. Both the regions are removed before solving the game.
+        dead_strategy = np.full(n, -1, dtype=np.int64)
+        dead_win = dict(zip([1, 2], engine.remove_dead_ends(strategy=dead_strategy)))
+
+        with tqdm(total=self._graph.number_of_nodes(), desc="Solving Buchi game") as progress_bar:
+            progress_bar.update(int(dead_win[1].sum() + dead_win[2].sum()))
+            iteration = 0
+            while True:
+                # Nodes from which player can force a visit to final states within subgame.
+                reach, p_rank = engine.attractor(final, player, strategy=p_strategy)
+                trap = engine.alive & ~reach
+                if not trap.any():
+                    break
+
+                # Opponent can keep the game within the trap (or its previously won region).
+                trap_nodes, trap_edges = engine.successor_edge(trap & (engine.turn == opponent), trap | np_win)
+                np_strategy[trap_nodes] = trap_edges
+
+                # Opponent's attractor of the trap is winning for opponent.
+                attr, rank = engine.attractor(trap, opponent, strategy=np_strategy)
+                np_rank[attr] = rank[attr]
+                np_iter[attr] = iteration
+                np_win |= attr
+                engine.remove(attr)
+
+                iteration += 1
+                progress_bar.update(int(attr.sum()))
+
+            p_win = engine.alive.copy()
+            progress_bar.update(int(p_win.sum()))
+
+        # Player revisits final states by choosing a successor that stays in the winning region.
+        final_nodes, final_edges = engine.successor_edge(final & p_win & (engine.turn == player), p_win)
+        p_strategy[final_nodes] = final_edges
+
+        # Node winners and ranks
+        nodes = engine.nodes()
+        self._node_winner[nodes] = player
+        self._rank.update(zip(nodes.tolist(), p_rank[nodes].tolist()))
+        self._node_winner[np_win] = opponent
+        for winner, region in dead_win.items():
+            self._node_winner[region] = winner
+
+        # Edge winners.
+        #   Player's edges are winning if they decrease the rank to final states, or if they leave a final state
+        #   and remain in winning region. Opponent's edges are winning if they lead to a region removed in an
+        #   earlier iteration, or decrease the rank within the same region, or stay within the trap.
+        #   Edges of nodes controlled by the losing player are won by the owner of the winning region.
+        #   In the regions of dead ends, the owner's strategy edge (of attractor) is winning.
+        src, dst = engine.src, engine.dst
+        p_good = p_win[dst] & (final[src] | ((p_rank[dst] >= 0) & (p_rank[dst] < p_rank[src])))
+        same_iter = np_iter[dst] == np_iter[src]
+        np_good = np_win[dst] & (
+            (np_iter[dst] < np_iter[src]) |
+            (same_iter & ((np_rank[dst] < np_rank[src]) | ((np_rank[src] == 0) & (np_rank[dst] == 0))))
+        )
+        edge_winner = np.where(
+            p_win[src],
+            np.where(engine.turn[src] == player, np.where(p_good, player, opponent), player),
+            np.where(engine.turn[src] == opponent, np.where(np_good, opponent, player), opponent)
+        )
+        dead_winner = np.where(dead_win[1], 1, np.where(dead_win[2], 2, 0))[src]
+        owner_wins = engine.turn[src] == dead_winner
+        dead_edge_winner = np.where(owner_wins & (dead_strategy[src] != np.arange(len(src))), 3 - dead_winner,
+                                    dead_winner)
+        edge_winner = np.where(dead_winner > 0, dead_edge_winner, edge_winner)
+        self._edge_winner[:] = edge_winner
+
+        # Mark the game to be solved
+        self._is_solved = True
+
+
+class SWinCoBuchi(SWinReach):
+    """
+    Computes sure winning region for player 1 or player 2 to eventually remain within a set of final states forever
+    in a deterministic two-player turn-based game. That is, the states visited infinitely often must be final
+    states (see :class:`ggsolver.logic.automata.DCBA`).
+
+    Solves the dual Buchi game, in which the opponent must visit non-final states infinitely often.
+    A player who cannot move loses the game (see :class:`SWinBuchi`).
+
+    :param graph: (Graph or SubGraph instance) A graph or subgraph of a deterministic two-player turn-based game.
+    :param final: (Iterable) The set of final states. By default, the final states are determined using
+        node property "final" of the graph.
+    :param player: (int) The player who has the co-Buchi objective.
+        Value should be 1 for player 1, and 2 for player 2.
+    """
+    def __init__(self, graph, final=None, player=1, **kwargs):
+        super(SWinCoBuchi, self).__init__(graph, final=final, player=player, **kwargs)
+
+    def solve(self):
+        """ Solves the dual Buchi game to solve the co-Buchi game. """
+
+        # Reset solver
+        self.reset()
+
+        # Formulate and solve dual Buchi game
+        final = set(self.graph().nodes()) - set(self._final)
+        dual_player = 1 if self._player == 2 else 2
+        dual_solver = SWinBuchi(self.graph(), final, dual_player)
+        dual_solver.solve()
+
+        # Process the output back to co-Buchi game. Solution graph is constructed on demand.
+        self._node_winner = dual_solver._node_winner
+        self._edge_winner = dual_solver._edge_winner
+        self._rank = dual_solver._rank
+
+        # Mark the game to be solved
+        self._is_solved = True
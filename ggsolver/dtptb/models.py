@@ -3,6 +3,8 @@ import logging
 
 import ggsolver.models as models
 import ggsolver.logic.automata as automata
+import ggsolver.logic.products as products
+import ggsolver.util as util
 
 
 logging.basicConfig(level=logging.INFO)
@@ -54,7 +56,7 @@ class ProductWithDFA(DTPTBGame):
 
     def init_state(self):
         if self._game.init_state() is not None:
-            s0 = self.init_state()
+            s0 = self._game.init_state()
             q0 = self._aut.init_state()
             return s0, self._aut.delta(q0, self._game.label(s0))
 
@@ -64,3 +66,35 @@ class ProductWithDFA(DTPTBGame):
     def turn(self, state):
         return self._game.turn(state[0])
 
+    def graphify(self, pointed=False, base_only=False, game_graph=None):
+        """
+        Constructs the underlying graph of the product game.
+
+        When `pointed` is `True`, only the product states reachable from the initial state of the game are
+        constructed (see :func:`ggsolver.logic.products.product_with_dfa`). The product is computed from the game
+        graph, which is constructed by graphifying the game unless it is provided as `game_graph`.
+        Otherwise, the complete product is constructed by :meth:`ggsolver.models.GraphicalModel.graphify`.
+
+        :param pointed: (bool) Whether to construct only the reachable product states.
+        :param base_only: (bool) If `True`, only the node property "state", edge properties "input" and "prob"
+            and graph property "input_domain" are kept, as in :meth:`ggsolver.models.GraphicalModel.graphify`.
+        :param game_graph: (Graph instance) The underlying graph of the game, if it is already graphified.
+        :return: (:class:`ggsolver.graph.Graph` object) An equivalent graph representation of the product game.
+        """
+        if not pointed:
+            return super(ProductWithDFA, self).graphify(pointed=pointed, base_only=base_only)
+
+        if game_graph is None:
+            game_graph = self._game.graphify()
+        graph = products.product_with_dfa(game_graph, self._aut)
+
+        if base_only:
+            print(util.BColors.WARNING, f"[WARN] Ignoring node, edge and graph (base_only: True)", util.BColors.ENDC)
+            for p_name in set(graph.node_properties) - {"state"}:
+                del graph.node_properties[p_name]
+            for p_name in set(graph.edge_properties) - {"input", "prob"}:
+                del graph.edge_properties[p_name]
+            for p_name in set(graph.graph_properties) - {"input_domain"}:
+                del graph.graph_properties[p_name]
+        return graph
+
@@ -0,0 +1,251 @@
+import logging
+import sys
+import numpy as np
+
+import ggsolver.util as util
+import ggsolver.models as models
+from ggsolver.dtptb.attractor import Attractor
+
+
+logger = logging.getLogger(__name__)
+
+
+class SWinParity(models.Solver):
+    """
+    Computes sure winning regions of player 1 and player 2 in a deterministic two-player turn-based parity game.
+
+    The color of every node is given by node property "final". The parity condition follows the convention of
+    :class:`ggsolver.logic.automata.DPA` (`Parity Min Even`): player 1 wins a play if the minimum color visited
+    infinitely often is even; otherwise player 2 wins. When "final" is a list of acceptance sets (as produced by
+    :class:`ggsolver.logic.base.SpotAutomaton`), the color of a node is the minimum of the list.
+    A node with no color (empty list or None) is assigned the largest color plus one.
+
+    A player who cannot move loses the game.
+
+    Implements Zielonka's recursive algorithm over array-backed subgames
+    (see :class:`ggsolver.dtptb.attractor.Attractor`).
+
+    :param graph: (Graph or SubGraph instance) A graph or subgraph of a deterministic two-player turn-based game.
+    :param final: (dict[int, int]) A mapping of nodes to colors. By default, the colors are determined using
+        node property "final" of the graph.
+    """
+    def __init__(self, graph, final=None, **kwargs):
+        if not graph["is_deterministic"]:
+            logger.warning(util.ColoredMsg.warn(f"dtptb.{self.__class__.__name__} expects deterministic game graph. "
+                                                f"Input parameters: "
+                                                f"is_deterministic={graph['is_deterministic']}, "
+                                                f"is_probabilistic={graph['is_probabilistic']}."))
+
+        if not graph["is_turn_based"]:
+            logger.warning(util.ColoredMsg.warn(f"dtptb.{self.__class__.__name__} expects turn-based game graph. "
+                                                f"Input parameters: is_turn_based={graph['is_turn_based']}."))
+
+        super(SWinParity, self).__init__(graph, **kwargs)
+        self._final = final if final is not None else self.get_final_states()
+
+    def get_final_states(self):
+        """ Determines the node colors using "final" property of the input graph. """
+        return {uid: self.graph()["final"][uid] for uid in self.graph().nodes()}
+
+    def solve(self):
+        """ Solves the parity game and determines winning nodes and edges for each player. """
+        # Reset solver
+        self.reset()
+
+        engine = Attractor(self._graph)
+        strategy = np.full(engine.num_nodes, -1, dtype=np.int64)
+        priority = self._priorities(engine)
+
+        # Dead ends: a player who cannot move loses. Both the regions are removed before solving the game.
+        win1, win2 = engine.remove_dead_ends(strategy=strategy)
+
+        w1, w2 = self._solve(engine, priority, strategy)
+        self._save_solution(engine, win1 | w1, win2 | w2, strategy)
+
+        # Mark the game to be solved
+        self._is_solved = True
+
+    # ==========================================================================
+    # ALGORITHM
+    # ==========================================================================
+    def _solve(self, engine, priority, strategy):
+        """
+        Implements Zielonka's recursive algorithm.
+
+        :param engine: (Attractor) The subgame to be solved. The engine is modified.
+        :param priority: (numpy array) Node priorities under max-parity convention (player 1 wins even priority).
+        :param strategy: (numpy array) Strategy array, updated in place.
+        :return: (tuple of numpy arrays) Winning regions of player 1 and player 2 as boolean masks.
+        """
+        num_priorities = len(np.unique(priority[engine.alive])) if engine.alive.any() else 0
+        if sys.getrecursionlimit() < num_priorities + 100:
+            sys.setrecursionlimit(num_priorities + 100)
+        return self._zielonka(engine, priority, strategy)
+
+    def _zielonka(self, engine, priority, strategy):
+        win = {
+            1: np.zeros(engine.num_nodes, dtype=bool),
+            2: np.zeros(engine.num_nodes, dtype=bool)
+        }
+        while engine.alive.any():
+            top = priority[engine.alive].max()
+            player = 1 if top % 2 == 0 else 2
+            opponent = 1 if player == 2 else 2
+
+            # Attractor of nodes with highest priority for the player who likes the priority.
+            top_nodes = engine.alive & (priority == top)
+            attr, _ = engine.attractor(top_nodes, player, strategy=strategy)
+
+            sub = engine.copy()
+            sub.remove(attr)
+            sub_win = dict(zip([1, 2], self._zielonka(sub, priority, strategy)))
+
+            # Player wins the entire subgame. At the top nodes, player chooses any edge within subgame.
+            if not sub_win[opponent].any():
+                nodes, edges = engine.successor_edge(top_nodes & (engine.turn == player), engine.alive)
+                strategy[nodes] = edges
+                win[player] |= engine.alive
+                break
+
+            # Opponent's attractor of its winning region is winning for opponent. Solve the rest.
+            attr, _ = engine.attractor(sub_win[opponent], opponent, strategy=strategy)
+            win[opponent] |= attr
+            engine.remove(attr)
+
+        return win[1], win[2]
+
+    # ==========================================================================
+    # HELPER FUNCTIONS
+    # ==========================================================================
+    def _priorities(self, engine):
+        """
+        Converts the node colors (Parity Min Even) to priorities under max-parity convention,
+        in which player 1 wins if the maximum priority visited infinitely often is even.
+        Consecutive priorities with same parity are compressed.
+        """
+        nodes = engine.nodes()
+        colors = []
+        for uid in nodes:
+            color = self._final[uid]
+            if isinstance(color, (list, tuple, set)):
+                color = min(color) if len(color) > 0 else None
+            colors.append(-1 if color is None else int(color))
+        colors = np.array(colors, dtype=np.int64)
+        if len(colors) > 0 and np.any(colors < 0):
+            colors[colors < 0] = colors.max() + 1
+
+        # Min-parity to max-parity: max_color is even to preserve parity of colors.
+        max_color = colors.max() if len(colors) > 0 else 0
+        max_color += max_color % 2
+        priority = np.zeros(engine.num_nodes, dtype=np.int64)
+        priority[nodes] = max_color - colors
+
+        # Compression: merge adjacent priorities of same parity.
+        unique = np.unique(priority[nodes])
+        if len(unique) > 0:
+            parity = unique % 2
+            compressed = parity[0] + np.concatenate([[0], np.cumsum(parity[1:] != parity[:-1])])
+            priority[nodes] = compressed[np.searchsorted(unique, priority[nodes])]
+        return priority
+
+    def _save_solution(self, engine, win1, win2, strategy):
+        """
+        Saves node and edge winners. The strategy edge of a node is winning for the owner of node.
+        All edges of a node whose owner loses are winning for the winner.
+        """
+        winner = np.zeros(engine.num_nodes, dtype=np.int8)
+        winner[win1] = 1
+        winner[win2] = 2
+
+        nodes = np.flatnonzero(win1 | win2)
+        self._node_winner[nodes] = winner[nodes]
+
+        src = engine.src
+        eids = np.arange(len(src))
+        owner_wins = engine.turn[src] == winner[src]
+        edge_winner = np.where(owner_wins & (strategy[src] != eids), 3 - winner[src], winner[src])
+        self._edge_winner[:] = edge_winner
+
+
+class SWinParityPP(SWinParity):
+    """
+    Computes sure winning regions of player 1 and player 2 in a deterministic two-player turn-based parity game.
+
+    Implements the priority promotion algorithm (Benerecetti, Dell'Erba, Mogavero, 2016).
+    Instead of solving subgames recursively, the algorithm explores the game top-down by priority, computes
+    regions (quasi-dominions) as attractors and promotes a region to a higher priority whenever the opponent can
+    only escape from it to higher regions. A region from which no escape is possible is a dominion, which is
+    removed from the game together with its attractor. Colors are interpreted as in :class:`SWinParity`.
+
+    :param graph: (Graph or SubGraph instance) A graph or subgraph of a deterministic two-player turn-based game.
+    :param final: (dict[int, int]) A mapping of nodes to colors. By default, the colors are determined using
+        node property "final" of the graph.
+    """
+    def _solve(self, engine, priority, strategy):
+        """
+        Implements the priority promotion algorithm.
+
+        :param engine: (Attractor) The subgame to be solved. The engine is modified.
+        :param priority: (numpy array) Node priorities under max-parity convention (player 1 wins even priority).
+        :param strategy: (numpy array) Strategy array, updated in place.
+        :return: (tuple of numpy arrays) Winning regions of player 1 and player 2 as boolean masks.
+        """
+        win = {
+            1: np.zeros(engine.num_nodes, dtype=bool),
+            2: np.zeros(engine.num_nodes, dtype=bool)
+        }
+        turn, dst = engine.turn, engine.dst
+        while engine.alive.any():
+            region = priority.copy()
+            current = region[engine.alive].max()
+            while True:
+                player = 1 if current % 2 == 0 else 2
+                opponent = 1 if player == 2 else 2
+
+                # Region of current priority is the attractor of its nodes in subgame of lower regions.
+                sub = engine.copy()
+                sub.restrict(engine.alive & (region <= current))
+                top_nodes = sub.alive & (region == current)
+                attr, _ = sub.attractor(top_nodes, player, strategy=strategy)
+                region[attr] = current
+
+                # Region is open if opponent can leave it within the subgame or player cannot stay in it.
+                eids = engine.out_edges(top_nodes & (turn == opponent))
+                is_open = np.any(sub.alive[dst[eids]] & ~attr[dst[eids]])
+                if not is_open:
+                    top_player = top_nodes & (turn == player)
+                    nodes, _ = sub.successor_edge(top_player, attr)
+                    is_open = len(nodes) < np.count_nonzero(top_player)
+
+                if is_open:
+                    current = region[engine.alive & (region < current)].max()
+                    continue
+
+                # Region is closed in subgame. Player's nodes that do not have a strategy within the region
+                #   (i.e., top nodes) choose any edge within the region.
+                invalid = attr & (turn == player)
+                invalid[invalid] = (strategy[invalid] < 0) | ~attr[dst[strategy[invalid]]]
+                nodes, edges = sub.successor_edge(invalid, attr)
+                strategy[nodes] = edges
+
+                # Opponent may escape only to higher regions.
+                eids = engine.out_edges(attr & (turn == opponent))
+                escape = dst[eids]
+                escape = escape[engine.alive[escape] & ~attr[escape]]
+
+                # Dominion: player wins from region and its attractor.
+                if len(escape) == 0:
+                    dominion, _ = engine.attractor(attr, player, strategy=strategy)
+                    win[player] |= dominion
+                    engine.remove(dominion)
+                    break
+
+                # Promote region to lowest higher region. Regions below it are reset.
+                promoted = region[escape].min()
+                reset = engine.alive & (region < promoted) & ~attr
+                region[reset] = priority[reset]
+                strategy[reset] = -1
+                region[attr] = promoted
+                current = promoted
+
+        return win[1], win[2]
@@ -0,0 +1,212 @@
+"""
+Quotient of game graphs under bisimulation.
+"""
+
+import numpy as np
+
+from ggsolver.graph import Graph, SubGraph, NodePropertyMap, EdgePropertyMap, _as_hashable
+
+
+class Quotient:
+    """
+    Computes the quotient of a deterministic two-player turn-based game graph under (strong) bisimulation.
+
+    Two nodes are bisimilar when they agree on the given node properties (by default, "turn" and "final") and,
+    for every edge of one node, the other node has an edge with the same input (edge property "input") leading to
+    a bisimilar node. The coarsest bisimulation is computed by signature-based partition refinement: starting
+    from the partition induced by node properties, every block is split according to the set of
+    (input, block of successor) pairs of its nodes, until the partition is stable.
+
+    Every equivalence class (block) is a node of the quotient graph. Solving the quotient game instead of the
+    original game yields the same winner at every node and the same winning edges, which are lifted back to the
+    original graph by :meth:`Quotient.lift`.
+
+    The quotient graph has the node properties "state" and the given node properties of a representative node
+    of every block, edge property "input" and the graph properties "is_deterministic", "is_probabilistic",
+    "is_turn_based", "input_domain" and "init_state" of the input graph.
+
+    :param graph: (Graph or SubGraph instance) A graph or subgraph of a deterministic two-player turn-based game.
+    :param node_props: (Iterable[str]) Node properties that must be preserved by the quotient.
+        [Default: ("turn", "final")]
+    :param edge_prop: (str) Edge property that labels the edges. [Default: "input"]
+    """
+    def __init__(self, graph, node_props=("turn", "final"), edge_prop="input"):
+        self._graph = graph
+        self._node_props = list(node_props)
+        self._edge_prop = edge_prop
+
+        # Nodes (possibly non-consecutive in subgraph) are indexed by their position.
+        self._nodes = np.array(sorted(graph.nodes()), dtype=np.int64)
+        self._edges = graph.edges()
+        position = np.full(int(self._nodes.max()) + 1 if len(self._nodes) > 0 else 0, -1, dtype=np.int64)
+        position[self._nodes] = np.arange(len(self._nodes))
+        edges = np.array([(uid, vid) for uid, vid, _ in self._edges], dtype=np.int64).reshape(-1, 2)
+        self._src = position[edges[:, 0]]
+        self._dst = position[edges[:, 1]]
+
+        # Inputs and node labels are interned as integers.
+        ep_input = graph[edge_prop]
+        self._inputs, self._inp = self._intern(ep_input[edge] for edge in self._edges)
+        node_props = [graph[p_name] for p_name in self._node_props]
+        _, label = self._intern(tuple(p_map[uid] for p_map in node_props) for uid in self._nodes.tolist())
+
+        self._block = self._refine(label)
+        self._num_blocks = int(self._block.max()) + 1 if len(self._block) > 0 else 0
+        self._quotient, self._edge_map = self._construct()
+
+    def __str__(self):
+        return f"<Quotient of {self._graph} with {self._num_blocks} blocks>"
+
+    def graph(self):
+        """ Returns the quotient graph. """
+        return self._quotient
+
+    def num_blocks(self):
+        """ Returns the number of blocks, i.e., the number of nodes in quotient graph. """
+        return self._num_blocks
+
+    def block(self, uid):
+        """ Returns the block (node in quotient graph) of the given node in input graph. """
+        return int(self._block[np.searchsorted(self._nodes, uid)])
+
+    def node2block(self):
+        """ Returns a dictionary mapping every node in input graph to its block (node in quotient graph). """
+        return dict(zip(self._nodes.tolist(), self._block.tolist()))
+
+    def blocks(self):
+        """ Returns a list whose i-th element is the list of nodes in input graph that belong to i-th block. """
+        order = np.argsort(self._block, kind="stable")
+        bounds = np.cumsum(np.bincount(self._block, minlength=self._num_blocks))[:-1]
+        return [part.tolist() for part in np.split(self._nodes[order], bounds)]
+
+    def lift_node_property(self, p_map, default=None):
+        """
+        Lifts a node property of the quotient graph to the input graph.
+
+        :param p_map: (NodePropertyMap) Node property of quotient graph.
+        :param default: (object) Default value of the lifted property.
+        :return: (NodePropertyMap) Node property of input graph.
+        """
+        lifted = NodePropertyMap(self._graph, default=default)
+        values = [p_map[bid] for bid in range(self._num_blocks)]
+        lifted.update(zip(self._nodes.tolist(), (values[bid] for bid in self._block.tolist())))
+        return lifted
+
+    def lift_edge_property(self, p_map, default=None):
+        """
+        Lifts an edge property of the quotient graph to the input graph.
+
+        :param p_map: (EdgePropertyMap) Edge property of quotient graph.
+        :param default: (object) Default value of the lifted property.
+        :return: (EdgePropertyMap) Edge property of input graph.
+        """
+        lifted = EdgePropertyMap(self._graph, default=default)
+        q_edges = self._quotient.edges()
+        values = [p_map[edge] for edge in q_edges]
+        lifted.update(zip(self._edges, (values[eid] for eid in self._edge_map.tolist())))
+        return lifted
+
+    def lift(self, solution):
+        """
+        Lifts the solution of the quotient game to the input graph.
+
+        :param solution: (SubGraph) Solution of quotient game with node property "node_winner" and
+            edge property "edge_winner" (see :meth:`ggsolver.models.Solver.solution`).
+        :return: (SubGraph) Subgraph of input graph with node property "node_winner" and edge property
+            "edge_winner".
+        """
+        lifted = SubGraph(self._graph)
+        lifted["node_winner"] = self.lift_node_property(solution["node_winner"], default=-1)
+        lifted["edge_winner"] = self.lift_edge_property(solution["edge_winner"], default=-1)
+        return lifted
+
+    # ==========================================================================
+    # HELPER FUNCTIONS
+    # ==========================================================================
+    def _refine(self, label):
+        """
+        Signature-based partition refinement.
+
+        The signature of a node is its current block and the set of (input, block of successor) pairs.
+        Signatures are compared as rows of a matrix of sorted pairs padded with -1.
+        """
+        num_nodes = len(self._nodes)
+        block = label
+        num_blocks = int(block.max()) + 1 if num_nodes > 0 else 0
+        while True:
+            # Unique (source, code) pairs sorted by source and code.
+            code = self._inp * max(num_blocks, 1) + block[self._dst]
+            order = np.lexsort((code, self._src))
+            src, code = self._src[order], code[order]
+            keep = np.ones(len(src), dtype=bool)
+            keep[1:] = (src[1:] != src[:-1]) | (code[1:] != code[:-1])
+            src, code = src[keep], code[keep]
+
+            # Signature matrix: [block, code_1, code_2, ...]
+            degree = np.bincount(src, minlength=num_nodes)
+            ptr = np.concatenate([[0], np.cumsum(degree)])
+            signature = np.full((num_nodes, int(degree.max(initial=0)) + 1), -1, dtype=np.int64)
+            signature[:, 0] = block
+            signature[src, 1 + np.arange(len(src)) - ptr[src]] = code
+
+            _, refined = np.unique(signature, axis=0, return_inverse=True)
+            refined = refined.reshape(-1)
+            if int(refined.max(initial=-1)) + 1 == num_blocks:
+                return refined
+            block, num_blocks = refined, int(refined.max()) + 1
+
+    def _construct(self):
+        """
+        Constructs the quotient graph.
+
+        :return: (tuple) Quotient graph and an array mapping every edge of input graph to the index of
+            its edge in quotient graph.
+        """
+        graph = Graph()
+        graph.add_nodes(self._num_blocks)
+        _, representative = np.unique(self._block, return_index=True)
+        rep_nodes = self._nodes[representative].tolist()
+
+        # Quotient edges are unique (block, input, block) triples.
+        triples = np.column_stack([self._block[self._src], self._inp, self._block[self._dst]])
+        triples, edge_map = np.unique(triples, axis=0, return_inverse=True)
+        keys = graph.add_edges(zip(triples[:, 0].tolist(), triples[:, 2].tolist()))
+
+        ep_input = EdgePropertyMap(graph)
+        ep_input.update(zip(zip(triples[:, 0].tolist(), triples[:, 2].tolist(), keys),
+                            (self._inputs[inp] for inp in triples[:, 1].tolist())))
+        graph[self._edge_prop] = ep_input
+
+        for p_name in ["state"] + self._node_props:
+            if self._graph.has_property(p_name):
+                p_map = NodePropertyMap(graph)
+                p_map.update(zip(range(self._num_blocks), (self._graph[p_name][uid] for uid in rep_nodes)))
+                graph[p_name] = p_map
+
+        for p_name in ["is_deterministic", "is_probabilistic", "is_turn_based", "input_domain"]:
+            if self._graph.has_property(p_name):
+                graph[p_name] = self._graph[p_name]
+
+        # Initial state of quotient is the representative state of block containing the initial state.
+        if self._graph.has_property("init_state") and self._graph["init_state"] is not None:
+            np_state = self._graph["state"]
+            init = next(uid for uid in self._nodes.tolist() if np_state[uid] == self._graph["init_state"])
+            graph["init_state"] = graph["state"][self.block(init)]
+
+        # Edges of quotient graph are ordered as graph.edges(). Map unique triples to that order.
+        q_edges = {edge: eid for eid, edge in enumerate(graph.edges())}
+        triple2edge = np.array([q_edges[edge] for edge in zip(triples[:, 0].tolist(), triples[:, 2].tolist(), keys)],
+                               dtype=np.int64)
+        return graph, triple2edge[edge_map.reshape(-1)]
+
+    @staticmethod
+    def _intern(values):
+        """ Assigns consecutive integers to distinct values. Returns the list of distinct values and the ids. """
+        distinct, index, ids = [], dict(), []
+        for value in values:
+            key = _as_hashable(value)
+            if key not in index:
+                index[key] = len(distinct)
+                distinct.append(value)
+            ids.append(index[key])
+        return distinct, np.array(ids, dtype=np.int64)
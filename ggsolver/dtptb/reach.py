@@ -25,31 +25,36 @@ class SWinReach(models.Solver):
     """
     def __init__(self, graph, final=None, player=1, **kwargs):
         if not graph["is_deterministic"]:
-            logger.warning(util.ColoredMsg.warn(f"dtptb.SWinReach expects deterministic game graph. Input parameters: "
+            logger.warning(util.ColoredMsg.warn(f"dtptb.{self.__class__.__name__} expects deterministic game graph. Input parameters: "
                                            f"is_deterministic={graph['is_deterministic']}, "
                                            f"is_probabilistic={graph['is_probabilistic']}."))
 
         if not graph["is_turn_based"]:
-            logger.warning(util.ColoredMsg.warn(f"dtptb.SWinReach expects turn-based game graph. Input parameters: "
+            logger.warning(util.ColoredMsg.warn(f"dtptb.{self.__class__.__name__} expects turn-based game graph. Input parameters: "
                                            f"is_turn_based={graph['is_turn_based']}."))
 
         super(SWinReach, self).__init__(graph, **kwargs)
         self._player = player
         self._final = final if final is not None else self.get_final_states()
-        self._turn = self._solution["turn"]
-        self._rank = mod_graph.NodePropertyMap(self._solution, default=float("inf"))
-        self._solution["rank"] = self._rank
+        self._turn = self._graph["turn"]
+        self._rank = mod_graph.NodePropertyMap(self._graph, default=float("inf"))
 
     def reset(self):
         """ Resets the solver to initial state. """
         super(SWinReach, self).reset()
-        self._rank = mod_graph.NodePropertyMap(self._solution)
+        self._rank = mod_graph.NodePropertyMap(self._graph, default=float("inf"))
         self._is_solved = False
 
     def get_final_states(self):
         """ Determines the final states using "final" property of the input graph. """
         return {uid for uid in self.graph().nodes() if self.graph()["final"][uid]}
 
+    def _make_solution(self):
+        """ Solution subgraph additionally has node property "rank". """
+        solution = super(SWinReach, self)._make_solution()
+        solution["rank"] = self._rank
+        return solution
+
     def solve(self):
         """ Implements Zielonka's recursive algorithm to determine winning nodes and edges for each player. """
         # Reset solver
@@ -63,17 +68,17 @@ class SWinReach(models.Solver):
         for uid in win_nodes:
             self._rank[uid] = rank
             self._node_winner[uid] = self._player
-            for _, vid, key in self._solution.out_edges(uid):
-                self._edge_winner[uid, vid, key] = self._player
+            for _, vid, key in self._graph.out_edges(uid):
+                self._set_edge_winner(uid, vid, key, self._player)
 
         # Zielonka's recursive algorithm
-        with tqdm(total=self._solution.number_of_visible_nodes(), desc="Pointed graphify adding edges") as progress_bar:
+        with tqdm(total=self._graph.number_of_nodes(), desc="Pointed graphify adding edges") as progress_bar:
             while True:
-                predecessors = set(reduce(set.union, map(set, map(self._solution.predecessors, win_nodes))))
+                predecessors = set(reduce(set.union, map(set, map(self._graph.predecessors, win_nodes))))
 
                 pre_p = {uid for uid in predecessors if self._turn[uid] == self._player}
                 pre_np = predecessors - pre_p
-                pre_np = {uid for uid in pre_np if set(self._solution.successors(uid)).issubset(win_nodes)}
+                pre_np = {uid for uid in pre_np if set(self._graph.successors(uid)).issubset(win_nodes)}
 
                 next_level = set.union(pre_p, pre_np) - win_nodes
                 if len(next_level) == 0:
@@ -88,14 +93,14 @@ class SWinReach(models.Solver):
                     # Update progress_bar
                     progress_bar.update(1)
 
-                    for _, vid, key in self._solution.out_edges(uid):
-                        self._edge_winner[uid, vid, key] = self._player if vid in win_nodes else \
-                            (1 if self._player == 2 else 2)
+                    for _, vid, key in self._graph.out_edges(uid):
+                        self._set_edge_winner(uid, vid, key, self._player if vid in win_nodes else
+                                              (1 if self._player == 2 else 2))
 
                 win_nodes |= next_level
 
             # States not in win_nodes are winning for np.
-            for uid in set(self._solution.nodes()) - win_nodes:
+            for uid in set(self._graph.nodes()) - win_nodes:
                 self._node_winner[uid] = (1 if self._player == 2 else 2)
                 progress_bar.update(1)
 
@@ -136,10 +141,10 @@ class SWinSafe(SWinReach):
         dual_solver = SWinReach(self.graph(), final, dual_player)
         dual_solver.solve()
 
-        # Process the output back to safety game
-        self._solution = dual_solver.solution()
-        self._node_winner = self._solution["node_winner"]
-        self._edge_winner = self._solution["edge_winner"]
+        # Process the output back to safety game. Solution graph is constructed on demand.
+        self._node_winner = dual_solver._node_winner
+        self._edge_winner = dual_solver._edge_winner
+        self._rank = dual_solver._rank
 
         # Mark the game to be solved
         self._is_solved = True
@@ -9,6 +9,7 @@ import pickle
 from functools import reduce
 
 import networkx as nx
+import numpy as np
 from ggsolver import util
 
 
@@ -21,6 +22,8 @@ class IGraph:
         self._node_properties = dict()
         self._edge_properties = dict()
         self._graph_properties = dict()
+        self._version = 0           # Incremented on every change to nodes, edges or properties.
+        self._graph_index = None    # Cached (version, GraphIndex) pair. See GraphIndex.of().
 
     def __getitem__(self, pname):
         if pname in self._node_properties:
@@ -50,6 +53,16 @@ class IGraph:
         else:
             self._graph_properties[pname] = pmap
 
+        self._modified()
+
+    def _modified(self):
+        """ Marks the graph as modified. Invalidates the cached :class:`GraphIndex`. """
+        self._version += 1
+
+    def _cache_key(self):
+        """ A value that changes whenever the nodes, edges or properties of the graph change. """
+        return self._version
+
     @property
     def node_properties(self):
         """ Returns the node properties as a dictionary of {"property name": NodePropertyMap object}. """
@@ -289,6 +302,7 @@ class Graph(IGraph):
         """
         uid = self._graph.number_of_nodes()
         self._graph.add_node(uid)
+        self._modified()
         return uid
 
     def add_nodes(self, num_nodes):
@@ -299,7 +313,11 @@ class Graph(IGraph):
         :param num_nodes: (int) Number of nodes to be added.
         :return: (list) IDs of added nodes.
         """
-        return [self.add_node() for _ in range(num_nodes)]
+        start = self._graph.number_of_nodes()
+        uids = list(range(start, start + num_nodes))
+        self._graph.add_nodes_from(uids)
+        self._modified()
+        return uids
 
     def add_edge(self, uid, vid):
         """
@@ -311,6 +329,7 @@ class Graph(IGraph):
         :return: (int) Key of the added edge. Key = 0 means the first edge was added between the given nodes.
             If Key = k, then (k+1)-th edge was added.
         """
+        self._modified()
         return self._graph.add_edge(uid, vid)
 
     def add_edges(self, edges):
@@ -320,10 +339,11 @@ class Graph(IGraph):
         :warning: Duplication is NOT checked. Hence, calling the function twice adds two parallel edges between
             the same nodes.
 
-        :return: (int) Key of the added edge. Key = 0 means the first edge was added between the given nodes.
+        :return: (list of int) Keys of the added edges. Key = 0 means the first edge was added between the given nodes.
             If Key = k, then (k+1)-th edge was added.
         """
-        return [self.add_edge(uid, vid) for uid, vid in edges]
+        self._modified()
+        return self._graph.add_edges_from(edges)
 
     def rem_node(self, uid):
         """
@@ -442,6 +462,7 @@ class Graph(IGraph):
         self._node_properties = dict()
         self._edge_properties = dict()
         self._graph_properties = dict()
+        self._modified()
 
     def serialize(self):
         """
@@ -746,6 +767,10 @@ class SubGraph(Graph):
     def base_graph(self):
         return self._base_graph
 
+    def _cache_key(self):
+        """ Subgraph changes when its hidden nodes/edges or its base graph change. """
+        return self._version, self._base_graph._cache_key()
+
     def is_node_visible(self, uid):
         """
         Is the node included in the subgraph?
@@ -765,6 +790,7 @@ class SubGraph(Graph):
         If `uid` was hidden then no change is made.
         """
         self._hidden_nodes[uid] = True
+        self._modified()
 
     def show_node(self, uid):
         """
@@ -773,6 +799,7 @@ class SubGraph(Graph):
         If `uid` was already visible, then no change is made.
         """
         self._hidden_nodes[uid] = False
+        self._modified()
 
     def hide_nodes(self, ulist):
         """
@@ -799,10 +826,12 @@ class SubGraph(Graph):
     def hide_edge(self, uid, vid, key):
         """ Removes the edge from subgraph. No changes are made to base graph. """
         self._hidden_edges[(uid, vid, key)] = True
+        self._modified()
 
     def show_edge(self, uid, vid, key):
         """ Adds the edge to subgraph. The edge must be a valid edge in base graph. """
         self._hidden_edges[(uid, vid, key)] = False
+        self._modified()
 
     def hide_edges(self, elist):
         """ Removes multiple edge from subgraph. No changes are made to base graph. """
@@ -972,6 +1001,7 @@ class SubGraph(Graph):
         self._node_properties = dict()
         self._edge_properties = dict()
         self._graph_properties = dict()
+        self._modified()
 
     def serialize(self):
         """
@@ -1191,6 +1221,271 @@ class SubGraph(Graph):
         return ep
 
 
+class GraphIndex:
+    """
+    Read-only index of a graph compiled into arrays. The index is shared by all solvers (and other algorithms)
+    that operate on the same graph. Use :meth:`GraphIndex.of` to get the cached index of a graph, which is
+    reconstructed only when nodes, edges or properties of the graph are added, replaced or hidden.
+
+    .. note:: Changing the value of a property in-place (e.g., `graph["state"][uid] = s`) after the index is
+        constructed does not invalidate the index. Assign the property again to the graph (`graph["state"] = ...`).
+
+    Nodes are indexed by their node ids. Edges are indexed by their position in :meth:`GraphIndex.edges`.
+    The index contains
+
+    - the edge list and the arrays mapping edge id to its source and target,
+    - the successor and predecessor edge ids of every node in CSR format,
+    - the mapping of states to node ids (using node property "state"; constructed on first use), and
+    - the grouping of edges by actions (using edge property "input"; constructed on first use).
+
+    :param graph: (Graph or SubGraph instance) Graph to be indexed.
+    """
+    def __init__(self, graph):
+        self._graph = graph
+        self._nodes = np.array(sorted(graph.nodes()), dtype=np.int64)
+        self._num_nodes = int(self._nodes[-1]) + 1 if len(self._nodes) > 0 else 0
+        self._edges = graph.edges()
+
+        # Edge arrays
+        edges = np.array([(uid, vid) for uid, vid, _ in self._edges], dtype=np.int64).reshape(-1, 2)
+        self._src = edges[:, 0]
+        self._dst = edges[:, 1]
+
+        # Successor and predecessor indices (CSR): edge ids sorted by source and by target.
+        self._succ_eid = np.argsort(self._src, kind="stable")
+        self._succ_ptr = np.zeros(self._num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._src, minlength=self._num_nodes), out=self._succ_ptr[1:])
+
+        self._pred_eid = np.argsort(self._dst, kind="stable")
+        self._pred_ptr = np.zeros(self._num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._dst, minlength=self._num_nodes), out=self._pred_ptr[1:])
+
+        # Constructed on first use
+        self._state2node = None
+        self._edge2id = None
+        self._actions = None
+        self._edge_act = None
+        self._action_groups = None
+
+    def __str__(self):
+        return f"<GraphIndex of {self._graph}>"
+
+    @classmethod
+    def of(cls, graph):
+        """
+        Returns the index of the graph. The index is cached by the graph and reused until the graph is modified.
+
+        :param graph: (Graph or SubGraph instance) Graph to be indexed.
+        :return: (GraphIndex) Index of the graph.
+        """
+        key = graph._cache_key()
+        if graph._graph_index is None or graph._graph_index[0] != key:
+            graph._graph_index = (key, cls(graph))
+        return graph._graph_index[1]
+
+    def save(self, dirpath):
+        """
+        Saves the arrays of the index as `.npy` files in the given directory.
+        The action groups are saved when the graph has edge property "input".
+        The saved index can be loaded (memory-mapped) by other processes using :meth:`GraphIndex.load`.
+
+        :param dirpath: (str) Path to an existing directory.
+        """
+        arrays = {
+            "nodes": self._nodes,
+            "src": self._src,
+            "dst": self._dst,
+            "keys": np.array([key for _, _, key in self.edges], dtype=np.int64),
+            "succ_ptr": self._succ_ptr,
+            "succ_eid": self._succ_eid,
+            "pred_ptr": self._pred_ptr,
+            "pred_eid": self._pred_eid,
+        }
+        if self._action_groups is not None or (self._graph is not None and self._graph.has_property("input")):
+            arrays.update(zip(["group_node", "group_act", "edge_group"], self.action_groups()))
+
+        for name, array in arrays.items():
+            np.save(os.path.join(dirpath, f"{name}.npy"), array)
+
+    @classmethod
+    def load(cls, dirpath, mmap_mode="r"):
+        """
+        Loads the index saved by :meth:`GraphIndex.save`. The loaded index is not associated with a graph.
+        Hence, :meth:`GraphIndex.state2node` and :meth:`GraphIndex.actions` are not available.
+
+        :param dirpath: (str) Path to the directory containing the index.
+        :param mmap_mode: (str) Memory-map mode passed to `numpy.load`. Use None to read the arrays into memory.
+        :return: (GraphIndex) Index.
+        """
+        def load(name):
+            fpath = os.path.join(dirpath, f"{name}.npy")
+            return np.load(fpath, mmap_mode=mmap_mode) if os.path.exists(fpath) else None
+
+        obj = cls.__new__(cls)
+        obj._graph = None
+        obj._nodes = load("nodes")
+        obj._num_nodes = int(obj._nodes[-1]) + 1 if len(obj._nodes) > 0 else 0
+        obj._src, obj._dst, obj._keys = load("src"), load("dst"), load("keys")
+        obj._edges = None
+        obj._succ_ptr, obj._succ_eid = load("succ_ptr"), load("succ_eid")
+        obj._pred_ptr, obj._pred_eid = load("pred_ptr"), load("pred_eid")
+        obj._state2node = None
+        obj._edge2id = None
+        obj._actions = None
+        obj._edge_act = None
+        groups = (load("group_node"), load("group_act"), load("edge_group"))
+        obj._action_groups = groups if groups[-1] is not None else None
+        return obj
+
+    # ==========================================================================
+    # PROPERTIES
+    # ==========================================================================
+    @property
+    def num_nodes(self):
+        """ Size of node-indexed arrays (largest node id + 1). """
+        return self._num_nodes
+
+    @property
+    def nodes(self):
+        """ Sorted array of node ids. """
+        return self._nodes
+
+    @property
+    def edges(self):
+        """ List of edges (uid, vid, key). The position of an edge in the list is its edge id. """
+        if self._edges is None:
+            self._edges = list(zip(self._src.tolist(), self._dst.tolist(), self._keys.tolist()))
+        return self._edges
+
+    @property
+    def src(self):
+        """ Array mapping edge id to its source node. """
+        return self._src
+
+    @property
+    def dst(self):
+        """ Array mapping edge id to its target node. """
+        return self._dst
+
+    @property
+    def succ_ptr(self):
+        """ CSR row pointers of successor index. Out-edges of `uid` are `succ_eid[succ_ptr[uid]:succ_ptr[uid + 1]]`. """
+        return self._succ_ptr
+
+    @property
+    def succ_eid(self):
+        """ CSR column indices of successor index (edge ids sorted by source). """
+        return self._succ_eid
+
+    @property
+    def pred_ptr(self):
+        """ CSR row pointers of predecessor index. In-edges of `uid` are `pred_eid[pred_ptr[uid]:pred_ptr[uid + 1]]`. """
+        return self._pred_ptr
+
+    @property
+    def pred_eid(self):
+        """ CSR column indices of predecessor index (edge ids sorted by target). """
+        return self._pred_eid
+
+    # ==========================================================================
+    # QUERIES
+    # ==========================================================================
+    def state2node(self):
+        """ Returns the dictionary mapping states (node property "state") to node ids. """
+        if self._state2node is None:
+            np_state = self._graph["state"]
+            self._state2node = {np_state[uid]: uid for uid in self._nodes.tolist()}
+        return self._state2node
+
+    def edge2id(self):
+        """ Returns the dictionary mapping edges (uid, vid, key) to edge ids. """
+        if self._edge2id is None:
+            self._edge2id = {edge: eid for eid, edge in enumerate(self.edges)}
+        return self._edge2id
+
+    def actions(self):
+        """
+        Returns the distinct actions (edge property "input") and an array mapping edge id to the index of its action.
+
+        :return: (tuple) List of distinct actions and an integer array of length equal to number of edges.
+        """
+        if self._actions is None:
+            ep_input = self._graph["input"]
+            actions, action2index = [], dict()
+            edge_act = np.zeros(len(self._edges), dtype=np.int64)
+            for eid, edge in enumerate(self._edges):
+                action = ep_input[edge]
+                key = _as_hashable(action)
+                if key not in action2index:
+                    action2index[key] = len(actions)
+                    actions.append(action)
+                edge_act[eid] = action2index[key]
+            self._actions, self._edge_act = actions, edge_act
+        return self._actions, self._edge_act
+
+    def action_groups(self):
+        """
+        Groups the edges by (source node, action) pairs. In a probabilistic game, a group is the set of edges
+        along which the game may proceed when the action is chosen at the node.
+
+        :return: (tuple of numpy arrays) Source node and action index of every group (sorted by node and action),
+            and an array mapping edge id to the index of its group.
+        """
+        if self._action_groups is None:
+            _, edge_act = self.actions()
+            num_actions = max(len(self._actions), 1)
+            groups, edge_group = np.unique(self._src * num_actions + edge_act, return_inverse=True)
+            group_node, group_act = np.divmod(groups, num_actions)
+            self._action_groups = (group_node, group_act, edge_group.reshape(-1))
+        return self._action_groups
+
+    def out_edges(self, nodes):
+        """
+        Returns the ids of edges leaving the given nodes.
+
+        :param nodes: (numpy array) Node ids.
+        :return: (numpy array) Edge ids.
+        """
+        return _gather(self._succ_ptr, self._succ_eid, np.asarray(nodes, dtype=np.int64))
+
+    def in_edges(self, nodes):
+        """
+        Returns the ids of edges entering the given nodes.
+
+        :param nodes: (numpy array) Node ids.
+        :return: (numpy array) Edge ids.
+        """
+        return _gather(self._pred_ptr, self._pred_eid, np.asarray(nodes, dtype=np.int64))
+
+    def mask(self, nodes):
+        """ Converts an iterable of node ids to a boolean mask over node ids. """
+        mask = np.zeros(self._num_nodes, dtype=bool)
+        mask[np.fromiter(nodes, dtype=np.int64) if not isinstance(nodes, np.ndarray) else nodes] = True
+        return mask
+
+
+def _gather(ptr, index, nodes):
+    """ Concatenates the CSR rows `index[ptr[u]:ptr[u+1]]` for all nodes u. """
+    starts = ptr[nodes]
+    lengths = ptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+    return index[offsets]
+
+
+def _as_hashable(value):
+    """ Converts lists, sets and dictionaries (recursively) to hashable values. """
+    if isinstance(value, (list, tuple)):
+        return tuple(_as_hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_as_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _as_hashable(v)) for k, v in value.items()))
+    return value
+
+
 if __name__ == '__main__':
     g = Graph()
     nodes = g.add_nodes(10)
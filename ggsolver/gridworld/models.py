@@ -1,8 +1,12 @@
 import inspect
+import numpy as np
 import pygame
 import random
 import scipy.stats as stats
+import time
 import ggsolver.gridworld.color_util as colors
+from ggsolver.graph import GraphIndex, _as_hashable
+from ggsolver.models import DeterministicStrategy
 
 # ===========================================================================================
 # GLOBALS
@@ -35,6 +39,11 @@ class AnchorStyle:
     CENTER = "Center"
 
 
+class RenderMode:
+    DIRTY = "dirty"
+    FULL = "full"
+
+
 # ===========================================================================================
 # SIMULATION OBJECTS
 # ===========================================================================================
@@ -225,6 +234,336 @@ class StateMachine:
         pass
 
 
+class FastStateMachine:
+    """
+    Headless state machine that steps many independent episodes of a game in lockstep.
+
+    Unlike :class:`StateMachine`, the engine does not use states and actions during simulation. The successors of
+    every (node, action) pair are precomputed as a table in CSR format, where actions are indexed by their position
+    in graph property "actions". The current nodes of all episodes are stored in an array and every step samples the
+    successors of all episodes at once: uniformly for non-deterministic games and according to edge property "prob"
+    for probabilistic games. The histories are stored in a preallocated ring buffer of `memory_limit` steps.
+
+    An episode whose action is not enabled at its current node is stopped. The node of a stopped episode is -1.
+
+    :param graph: (Graph or SubGraph instance) Game graph with node property "state", edge property "input" and
+        graph property "actions".
+    :param n_episodes: (int) Number of episodes. [Default: 1]
+    :param memory_limit: (int) Number of steps stored in history. [Default: 1024]
+    :param seed: (int or numpy.random.Generator) Seed of the random number generator. [Default: None]
+    """
+    def __init__(self, graph, n_episodes=1, memory_limit=1024, seed=None):
+        self._graph = graph
+        self._n_episodes = n_episodes
+        self._memory_limit = memory_limit
+        self._rng = np.random.default_rng(seed)
+
+        # Cache
+        self._index = GraphIndex.of(graph)
+        self._actions = list(graph["actions"])
+        self._next, self._succ_ptr, self._succ, self._cdf = self._compute_transition_table()
+
+        # Episodes and history (ring buffer)
+        self._curr_nodes = np.full(n_episodes, -1, dtype=np.int64)
+        self._curr_time_step = 0
+        self._state_history = np.full((memory_limit, n_episodes), -1, dtype=np.int64)
+        self._action_history = np.full((memory_limit, n_episodes), -1, dtype=np.int64)
+
+    def initialize(self, state):
+        """
+        Initializes all episodes and clears the history.
+
+        :param state: (object or list) Initial state of all episodes, or a list of initial states of every episode.
+        """
+        state2node = self._index.state2node()
+        if isinstance(state, list):
+            assert len(state) == self._n_episodes
+            nodes = np.fromiter((state2node[st] for st in state), dtype=np.int64)
+        else:
+            nodes = np.full(self._n_episodes, state2node[state], dtype=np.int64)
+        self._curr_nodes[:] = nodes
+        self._curr_time_step = 0
+        self._state_history.fill(-1)
+        self._action_history.fill(-1)
+        self._state_history[0] = nodes
+
+    def step_forward(self, acts, active=None):
+        """
+        One-step forward for all episodes.
+
+        :param acts: (int or numpy array) Action index (position in graph property "actions") for all episodes,
+            or an array of action indices of every episode.
+        :param active: (numpy array) Boolean mask of episodes to be stepped. Other episodes remain at their nodes.
+            [Default: None, all episodes are stepped]
+        :return: (numpy array) Current nodes of all episodes.
+        """
+        acts = np.broadcast_to(np.asarray(acts, dtype=np.int64), (self._n_episodes,))
+        if np.any((acts < 0) | (acts >= len(self._actions))):
+            raise ValueError(f"FSM.step_forward called with invalid action index. Acceptable: 0..{len(self._actions) - 1}.")
+
+        nodes = self._curr_nodes
+        running = nodes >= 0 if active is None else (nodes >= 0) & active
+        next_nodes = nodes.copy()
+        next_nodes[running] = self._sample(nodes[running] * len(self._actions) + acts[running])
+
+        # Update current nodes, histories and time
+        self._curr_time_step += 1
+        slot = self._curr_time_step % self._memory_limit
+        self._state_history[slot] = next_nodes
+        self._action_history[slot] = np.where(running, acts, -1)
+        self._curr_nodes = next_nodes
+        return next_nodes
+
+    def step_forward_n(self, actions, n):
+        """
+        Step forward `n`-steps.
+
+        :param actions: (list) List of `n` actions, each of which is accepted by :meth:`FastStateMachine.step_forward`.
+        """
+        assert len(actions) == n
+        for acts in actions:
+            self.step_forward(acts)
+
+    def history(self):
+        """
+        Returns the node and action histories stored in ring buffer in chronological order.
+
+        :return: (tuple of numpy arrays) Arrays of shape (T, n_episodes) of nodes and of action indices, where `T` is
+            the number of stored steps. The action at row `t` is the action that led to the node at row `t`
+            (-1 for the first row, or when the episode was not stepped).
+        """
+        length = min(self._curr_time_step + 1, self._memory_limit)
+        slots = np.arange(self._curr_time_step + 1 - length, self._curr_time_step + 1) % self._memory_limit
+        return self._state_history[slots], self._action_history[slots]
+
+    def state_to_node(self, state):
+        return self._index.state2node()[state]
+
+    def node_to_state(self, node):
+        return self._graph["state"][node]
+
+    def enabled(self, nodes=None):
+        """
+        Returns a boolean array of shape (len(nodes), num_actions) marking enabled actions at given nodes.
+        No action is enabled at a negative node id (stopped episode).
+
+        :param nodes: (numpy array) Node ids. [Default: None, current nodes of all episodes]
+        """
+        nodes = self._curr_nodes if nodes is None else np.asarray(nodes, dtype=np.int64)
+        return (self._next[np.maximum(nodes, 0)] >= 0) & (nodes >= 0)[:, None]
+
+    def _compute_transition_table(self):
+        """
+        Constructs the (node, action) -> successors table.
+
+        :return: (tuple of numpy arrays) Array `next` of shape (num_nodes, num_actions) mapping (node, action) to
+            a successor (-1 if action is not enabled), CSR row pointers and successors of row `node * num_actions +
+            action`, and the cumulative distribution of successors (None, if successors are uniformly sampled).
+        """
+        index = self._index
+        num_actions = len(self._actions)
+        action2index = {_as_hashable(act): i for i, act in enumerate(self._actions)}
+        edge_actions, edge_act = index.actions()
+        try:
+            act_map = np.array([action2index[_as_hashable(act)] for act in edge_actions], dtype=np.int64)
+        except KeyError as err:
+            raise ValueError(f"Edge input {err} is not in graph property 'actions': {self._actions}.")
+        rows = index.src * num_actions + act_map[edge_act]
+
+        order = np.argsort(rows, kind="stable")
+        succ = index.dst[order]
+        succ_ptr = np.zeros(index.num_nodes * num_actions + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=index.num_nodes * num_actions), out=succ_ptr[1:])
+
+        next_ = np.full(index.num_nodes * num_actions, -1, dtype=np.int64)
+        has_succ = succ_ptr[1:] > succ_ptr[:-1]
+        next_[has_succ] = succ[succ_ptr[:-1][has_succ]]
+
+        # Cumulative distribution over all edges. Row `r` covers cdf[succ_ptr[r]:succ_ptr[r + 1] + 1].
+        cdf = None
+        if self._graph.has_property("prob") and self._graph["is_probabilistic"]:
+            ep_prob = self._graph["prob"]
+            edges = index.edges
+            prob = np.array([ep_prob[edges[eid]] for eid in order.tolist()], dtype=float)
+            cdf = np.concatenate([[0.0], np.cumsum(prob)])
+
+        return next_.reshape(index.num_nodes, num_actions), succ_ptr, succ, cdf
+
+    def _sample(self, rows):
+        """ Samples a successor of every (node, action) row. Rows without successors are mapped to -1. """
+        lo, hi = self._succ_ptr[rows], self._succ_ptr[rows + 1]
+        has_succ = hi > lo
+        u = self._rng.random(len(rows))
+        if self._cdf is None:
+            pos = lo + (u * (hi - lo)).astype(np.int64)
+        else:
+            target = self._cdf[lo] + u * (self._cdf[hi] - self._cdf[lo])
+            pos = np.searchsorted(self._cdf, target, side="right") - 1
+        pos = np.clip(pos, lo, np.maximum(hi - 1, lo))
+        return np.where(has_succ, self._succ[np.minimum(pos, len(self._succ) - 1)], -1)
+
+    @property
+    def n_episodes(self):
+        return self._n_episodes
+
+    @property
+    def actions(self):
+        return self._actions
+
+    @property
+    def curr_nodes(self):
+        """ Current nodes of all episodes (-1 for stopped episodes). """
+        return self._curr_nodes
+
+    @property
+    def curr_states(self):
+        """ Current states of all episodes (None for stopped episodes). """
+        np_state = self._graph["state"]
+        return [np_state[uid] if uid >= 0 else None for uid in self._curr_nodes.tolist()]
+
+    @property
+    def step_counter(self):
+        """ Number of steps since initialization. """
+        return self._curr_time_step
+
+
+def rollout(graph, strategy, n_episodes, horizon, seed=None, init_state=None, final=None):
+    """
+    Evaluates a strategy by simulating `n_episodes` episodes of length `horizon` in lockstep
+    (see :class:`FastStateMachine`).
+
+    At every step, the action of an episode is selected by the strategy. For turn-based games, a compiled strategy
+    is followed only at the nodes of its player. At the other nodes, and the nodes where the strategy selects no
+    action, an enabled action is chosen uniformly at random. An episode is stopped when no action is enabled.
+
+    The report contains
+
+    - "reach_rate": fraction of episodes that visit a final node.
+    - "safety_rate": fraction of episodes that remain within final nodes for `horizon` steps.
+    - "stopped_rate": fraction of episodes that were stopped before `horizon` steps.
+    - "path_lengths": array of the number of steps to reach a final node in every episode (-1, if not reached).
+    - "path_length_hist": histogram of path lengths of the episodes that reach a final node
+      (i-th element is the number of episodes with path length i).
+    - "steps", "elapsed", "steps_per_sec": number of simulated steps (summed over episodes), time taken (in seconds)
+      and throughput.
+
+    :param graph: (Graph or SubGraph instance) Game graph with node property "state", edge property "input" and
+        graph property "actions". Edge property "prob" is used to sample the successors in probabilistic games.
+    :param strategy: (DeterministicStrategy, NonDeterministicStrategy or dict) Strategy compiled from a solution of
+        the game on `graph` (see :class:`ggsolver.models.Strategy`) or a dictionary mapping states to actions.
+    :param n_episodes: (int) Number of episodes.
+    :param horizon: (int) Number of steps of every episode.
+    :param seed: (int) Seed of the random number generator. [Default: None]
+    :param init_state: (object) Initial state of episodes. [Default: None, graph property "init_state" is used]
+    :param final: (Iterable) Final nodes. [Default: None, nodes whose node property "final" is True (boolean),
+        or 0 or contains 0 (acceptance sets, e.g., games with final states and products with automata)]
+    :return: (dict) Report.
+    """
+    rng = np.random.default_rng(seed)
+    fsm = FastStateMachine(graph, n_episodes=n_episodes, memory_limit=1, seed=rng)
+    index = GraphIndex.of(graph)
+
+    init_state = init_state if init_state is not None else graph["init_state"]
+    final = final if final is not None else (uid for uid in graph.nodes() if _is_final(graph["final"][uid]))
+    is_final = index.mask(final)
+    select = _compile_strategy(graph, strategy, fsm)
+
+    start = time.perf_counter()
+    fsm.initialize(init_state)
+    nodes = fsm.curr_nodes
+    path_lengths = np.where(is_final[nodes], 0, -1)
+    is_safe = is_final[nodes].copy()
+    steps = 0
+    for step in range(1, horizon + 1):
+        running = nodes >= 0
+        if not running.any():
+            break
+        steps += int(np.count_nonzero(running))
+        nodes = fsm.step_forward(_select_actions(fsm, select, nodes, rng), active=running)
+        alive = nodes >= 0
+        path_lengths[alive & (path_lengths < 0) & is_final[np.maximum(nodes, 0)]] = step
+        is_safe &= alive & is_final[np.maximum(nodes, 0)]
+    elapsed = time.perf_counter() - start
+
+    reached = path_lengths >= 0
+    return {
+        "reach_rate": float(np.mean(reached)),
+        "safety_rate": float(np.mean(is_safe)),
+        "stopped_rate": float(np.mean(nodes < 0)),
+        "path_lengths": path_lengths,
+        "path_length_hist": np.bincount(path_lengths[reached], minlength=1),
+        "steps": steps,
+        "elapsed": elapsed,
+        "steps_per_sec": steps / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def _is_final(value):
+    """
+    Whether a node with the given value of node property "final" is final. Boolean values mark final nodes.
+    Other values are acceptance sets: a node is final if it is in acceptance set 0 (as in `ggsolver.mdp.reach`).
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (list, tuple, set)):
+        return 0 in value
+    return value == 0
+
+
+def _compile_strategy(graph, strategy, fsm):
+    """
+    Converts the strategy to CSR arrays (indptr, indices) of action indices of `fsm` at every node.
+    Nodes at which the strategy is not followed have no actions.
+    """
+    index = GraphIndex.of(graph)
+    action2index = {_as_hashable(act): i for i, act in enumerate(fsm.actions)}
+
+    if isinstance(strategy, dict):
+        state2node = index.state2node()
+        pairs = [(state2node[st], action2index[_as_hashable(act)]) for st, act in strategy.items() if act is not None]
+        src, act = np.array(pairs, dtype=np.int64).reshape(-1, 2).T
+    else:
+        act_map = np.array([action2index[_as_hashable(act)] for act in strategy.actions()], dtype=np.int64)
+        if isinstance(strategy, DeterministicStrategy):
+            table = strategy.table()
+            src = np.flatnonzero(table >= 0)
+            act = act_map[table[src]]
+        else:
+            indptr, indices = strategy.table()
+            src = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+            act = act_map[indices]
+
+        # Turn-based games: strategy is followed only at the nodes of its player.
+        if graph.has_property("is_turn_based") and graph["is_turn_based"]:
+            np_turn = graph["turn"]
+            keep = np.array([np_turn[uid] == strategy.player() for uid in src.tolist()], dtype=bool)
+            src, act = src[keep], act[keep]
+
+    indptr = np.zeros(index.num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=index.num_nodes), out=indptr[1:])
+    return indptr, act[np.argsort(src, kind="stable")]
+
+
+def _select_actions(fsm, select, nodes, rng):
+    """ Selects an action of every episode using the compiled strategy, or uniformly among enabled actions. """
+    indptr, indices = select
+    uids = np.maximum(nodes, 0)
+    lo, hi = indptr[uids], indptr[uids + 1]
+    u = rng.random(len(nodes))
+    acts = np.full(len(nodes), -1, dtype=np.int64)
+    if len(indices) > 0:
+        acts = np.where(hi > lo, indices[np.minimum(lo + (u * (hi - lo)).astype(np.int64), len(indices) - 1)], -1)
+
+    # Uniformly random enabled action when strategy selects no action.
+    free = np.flatnonzero(acts < 0)
+    if len(free) > 0:
+        enabled = fsm.enabled(nodes[free])
+        count = enabled.sum(axis=1)
+        k = (u[free] * count).astype(np.int64)
+        acts[free] = np.argmax(np.cumsum(enabled, axis=1) > k[:, None], axis=1)
+    return acts
+
+
 class Window:
     def __init__(self, name, size, **kwargs):
         """
@@ -239,6 +578,8 @@ class Window:
         * frame_rate: (float) Frames per second for pygame rendering. (Default: 60)
         * sm_update_rate: (float) State machine updates per second. (Default: 1)
         * backcolor: (tuple[int, int, int]) Default backcolor of window. (Default: (0, 0, 0))
+        * render_mode: (RenderMode) DIRTY redraws only the controls that changed and updates their rectangles on
+            display. FULL redraws all controls and flips the display every frame. (Default: RenderMode.DIRTY)
         * on_quit: (function[dict:event_args] -> None) Handler for pygame.QUIT event. (Default: None)
         * on_window_resized: (function[dict:event_args] -> None) Handler for pygame.WINDOWRESIZED event. (Default: None)
         * on_window_minimized: (function[dict:event_args] -> None) Handler for pygame.WINDOWMINIMIZED event. (Default: None)
@@ -257,12 +598,14 @@ class Window:
         Programmer's Note:
             * Since SM is a special element, Window handles the SMUPDATE event with sm_update() function.
                 Users are not allowed to add any more handlers to this event.
+            * The display mode is set only when the window is resized.
         """
         # Instance variables
         self._gw_sim = None
         self._name = name
         self._controls = dict()
-        self._sprites = pygame.sprite.LayeredUpdates()
+        self._sprites = pygame.sprite.LayeredDirty()
+        self._background = None
         self._size = pygame.math.Vector2(*size)
         self._title = kwargs["title"] if "title" in kwargs else f"Window({name})"
         self._backcolor = kwargs["backcolor"] if "backcolor" in kwargs else (0, 0, 0)
@@ -270,6 +613,7 @@ class Window:
         self._frame_rate = kwargs["frame_rate"] if "frame_rate" in kwargs else 60
         self._sm_update_rate = kwargs["sm_update_rate"] if "sm_update_rate" in kwargs else 1
         self._visible = kwargs["visible"] if "visible" in kwargs else True
+        self._render_mode = kwargs["render_mode"] if "render_mode" in kwargs else RenderMode.DIRTY
         self._running = False
 
         # Event handling flags
@@ -351,6 +695,7 @@ class Window:
     @backcolor.setter
     def backcolor(self, value):
         self._backcolor = value
+        self._background = None
 
     @property
     def frame_rate(self):
@@ -396,7 +741,7 @@ class Window:
             pygame.display.set_icon(pygame.image.load("sprites/GWSim.png"))
         except FileNotFoundError:
             pass
-        screen = pygame.display.set_mode([self.width, self.height], pygame.RESIZABLE)
+        screen = None
 
         # Clock and timer related stuff
         clock = pygame.time.Clock()
@@ -420,7 +765,7 @@ class Window:
                 self.process_event(event)
 
             # Update screen
-            self.render_update(screen)
+            screen = self.render_update(screen)
 
             # Control FPS
             clock.tick(self._frame_rate)
@@ -458,21 +803,36 @@ class Window:
             control.process_event(event)
 
     def render_update(self, screen):
-        # print(f"Called: {self}.{inspect.stack()[0][3]}")
-        if self.resizable:
-            screen = pygame.display.set_mode(self.size, pygame.RESIZABLE)
-        else:
-            screen = pygame.display.set_mode(self.size)
-
-        # Clear previous drawing
-        screen.fill(self._backcolor)
+        """
+        Renders a frame and returns the display surface.
 
-        # Update all controls (sprites)
+        :param screen: (pygame.Surface) Display surface. If None or if its size differs from window size,
+            the display mode is set.
+        """
+        # print(f"Called: {self}.{inspect.stack()[0][3]}")
+        size = (int(self.width), int(self.height))
+        if screen is None or screen.get_size() != size:
+            screen = pygame.display.set_mode(size, pygame.RESIZABLE if self.resizable else 0)
+
+        # Background is reconstructed (and everything repainted) when display is resized or backcolor changes.
+        if self._background is None or self._background.get_size() != screen.get_size():
+            self._background = pygame.Surface(screen.get_size())
+            self._background.fill(self._backcolor)
+            self._sprites.clear(screen, self._background)
+            self._sprites.repaint_rect(screen.get_rect())
+
+        # Update all controls (sprites). Only moved or redrawn controls are marked dirty.
         self._sprites.update()
-        self._sprites.draw(screen)
 
         # Update screen
-        pygame.display.flip()
+        if self._render_mode == RenderMode.FULL:
+            self._sprites.repaint_rect(screen.get_rect())
+            self._sprites.draw(screen, self._background)
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._sprites.draw(screen, self._background))
+
+        return screen
 
     # =================================================================================
     # EVENT CONFIGURATION
@@ -602,7 +962,7 @@ class GWSim(StateMachine):
         self._windows[self._main_window].run()
 
 
-class Control(pygame.sprite.Sprite):
+class Control(pygame.sprite.DirtySprite):
     def __init__(self, name, parent, position, size, **kwargs):
         """
         :param name: (Hashable object) Unique identifier of the control.
@@ -648,6 +1008,7 @@ class Control(pygame.sprite.Sprite):
         self._borderwidth = kwargs["borderwidth"] if "borderwidth" in kwargs else 1
         self._canselect = kwargs["canselect"] if "canselect" in kwargs else False
         self._is_selected = kwargs["is_selected"] if "is_selected" in kwargs else False
+        self._redraw = True
 
         # Event handlers
         self._event_handlers = dict()
@@ -763,6 +1124,7 @@ class Control(pygame.sprite.Sprite):
     @visible.setter
     def visible(self, value):
         self._visible = value
+        self.dirty = 1
 
     @property
     def backcolor(self):
@@ -771,6 +1133,7 @@ class Control(pygame.sprite.Sprite):
     @backcolor.setter
     def backcolor(self, value):
         self._backcolor = value
+        self.invalidate()
 
     @property
     def backimage(self):
@@ -779,6 +1142,7 @@ class Control(pygame.sprite.Sprite):
     @backimage.setter
     def backimage(self, value):
         self._backimage = value
+        self.invalidate()
 
     @property
     def borderstyle(self):
@@ -787,6 +1151,7 @@ class Control(pygame.sprite.Sprite):
     @borderstyle.setter
     def borderstyle(self, value):
         self._borderstyle = value
+        self.invalidate()
 
     @property
     def borderwidth(self):
@@ -795,6 +1160,7 @@ class Control(pygame.sprite.Sprite):
     @borderwidth.setter
     def borderwidth(self, value):
         self._borderwidth = value
+        self.invalidate()
 
     @property
     def bordercolor(self):
@@ -803,6 +1169,7 @@ class Control(pygame.sprite.Sprite):
     @bordercolor.setter
     def bordercolor(self, value):
         self._bordercolor = value
+        self.invalidate()
 
     @property
     def can_select(self):
@@ -893,27 +1260,44 @@ class Control(pygame.sprite.Sprite):
     # PUBLIC FUNCTIONS: RENDERING
     # ============================================================================================
     def update(self):
+        """
+        Updates the position of control and redraws the control if it was invalidated (see :meth:`Control.invalidate`).
+        The control is marked dirty when it is moved or redrawn.
+        """
         # Update position and size
         # TODO. Resize surface, if applicable.
-        self._rect.topleft = self.point_to_world(self.position)
+        topleft = self.point_to_world(self.position)
+        if self._rect.topleft != (int(topleft[0]), int(topleft[1])):
+            self._rect.topleft = topleft
+            self.dirty = 1
 
         # If control is not visible, then none of its children are visible either.
-        if self.visible:
-            # Fill with backcolor, backimage
-            self._image.fill(self._backcolor)
-            if self._backimage is not None:  # FIXME. Check if this code works.
-                self._image.blit(self._backimage, (0, 0))
-
-            # Update borders
-            if self._borderstyle == BorderStyle.SOLID:
-                pygame.draw.rect(
-                    self._image,
-                    self._backcolor,
-                    pygame.Rect(0, 0, self.rect.width, self.rect.height),
-                    self._borderwidth
-                )
-            else:  # self._borderstyle == BorderStyle.HIDDEN:
-                pass
+        if self.visible and self._redraw:
+            self.render()
+            self._redraw = False
+            self.dirty = 1
+
+    def invalidate(self):
+        """ Marks the control to be redrawn on next update. """
+        self._redraw = True
+
+    def render(self):
+        """ Draws the control on its image. Derived controls override this function to draw their content. """
+        # Fill with backcolor, backimage
+        self._image.fill(self._backcolor)
+        if self._backimage is not None:  # FIXME. Check if this code works.
+            self._image.blit(self._backimage, (0, 0))
+
+        # Update borders
+        if self._borderstyle == BorderStyle.SOLID:
+            pygame.draw.rect(
+                self._image,
+                self._backcolor,
+                pygame.Rect(0, 0, self.rect.width, self.rect.height),
+                self._borderwidth
+            )
+        else:  # self._borderstyle == BorderStyle.HIDDEN:
+            pass
 
     def show(self):
         raise NotImplementedError
@@ -1051,19 +1435,42 @@ class Grid(Control):
 
 
 class Cell(Control):
-    def update(self):
+    """
+    Cell of a grid. The background of cells (backcolor and border) is pre-rendered once for every distinct
+    appearance and shared among the cells. A cell blits the pre-rendered surface when it is redrawn.
+    """
+    _surfaces = dict()
+
+    def render(self):
         # print(f"Called: {self}.{inspect.stack()[0][3]}")
-        super(Cell, self).update()
+        if self._backimage is not None:
+            self._render_background(self.image)
+            return
+
+        key = (tuple(self.image.get_size()), tuple(self._backcolor), self._borderstyle, tuple(self._bordercolor),
+               self._borderwidth)
+        if key not in Cell._surfaces:
+            surface = pygame.Surface(self.image.get_size(), flags=pygame.SRCALPHA)
+            self._render_background(surface)
+            Cell._surfaces[key] = surface
+        self.image.fill(colors.COLOR_TRANSPARENT)
+        self.image.blit(Cell._surfaces[key], (0, 0))
+
+    def _render_background(self, surface):
+        """ Draws backcolor, backimage and border of the cell on the given surface. """
+        surface.fill(self._backcolor)
+        if self._backimage is not None:
+            surface.blit(self._backimage, (0, 0))
 
         if self._borderstyle == BorderStyle.SOLID:
             pygame.draw.rect(
-                self.image,
+                surface,
                 self._bordercolor,
                 pygame.Rect(0, 0, self.rect.width, self.rect.height),
                 self._borderwidth
             )
         else:
-            self.image.fill(colors.COLOR_TRANSPARENTAN)
+            surface.fill(colors.COLOR_TRANSPARENT)
 
 
 
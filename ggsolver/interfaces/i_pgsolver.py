@@ -1,3 +1,217 @@
 """
-Think of what functions are needed.
+Implements to_pgsolver and from_pgsolver interface for game graphs.
+
+PGSolver format (https://github.com/tcsprojects/pgsolver)::
+
+    parity <max-id>;
+    <id> <priority> <owner> <successor>,<successor>,... "<name>";
+    ...
+
+PGSolver uses the max-parity convention (player Even, i.e. owner 0, wins a play if the maximum priority visited
+infinitely often is even), whereas ggsolver uses `Parity Min Even` colors (see :class:`ggsolver.logic.automata.DPA`).
+Colors and priorities are converted by `priority = M - color`, where `M` is the largest color (resp. priority)
+rounded up to an even number, which preserves the parity of every color. Player 1 is mapped to owner 0 (Even)
+and player 2 to owner 1 (Odd).
 """
+
+import itertools
+import re
+import numpy as np
+
+from ggsolver.graph import Graph, GraphIndex, NodePropertyMap
+
+
+PGSOLVER_NAME = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def to_pgsolver(graph, fpath, objective="parity", player=1, name=None, chunk_size=2 ** 16):
+    """
+    Saves a deterministic two-player turn-based game graph in PGSolver format.
+
+    Supported objectives:
+
+    - "parity": Node property "final" defines the color of a node (`Parity Min Even`).
+    - "reach": Node property "final" marks the final states that `player` wants to reach.
+      Final states are made absorbing (self-loop) in the exported game.
+    - "buchi": Node property "final" marks the final states that `player` wants to visit infinitely often.
+
+    PGSolver requires every node to have a successor, so dead ends are exported as self-loops. Under "parity" and
+    "buchi" objectives, a dead end gets priority 1 if its owner is Even and 0 if its owner is Odd, i.e. the player
+    who cannot move loses (consistent with :class:`ggsolver.dtptb.SWinParity`). Under "reach" objective, it keeps
+    its priority, i.e. `player` wins at a dead end if and only if it is final.
+
+    If the graph has graph property "init_state", its node is written as the start node (`start <id>;`).
+
+    :param graph: (Graph or SubGraph instance) Game graph with node properties "turn" and "final".
+    :param fpath: (str) Path to which the file should be saved.
+    :param objective: (str) One of "parity", "reach", "buchi". [Default: "parity"]
+    :param player: (int) The player with the reachability or Buchi objective. Ignored for parity objective.
+    :param name: (str) Node property used to name nodes in the exported file. If None, nodes are not named.
+        Nodes whose name is None are not named.
+    :param chunk_size: (int) Number of lines written to the file at once.
+    :return: (dict) Mapping from node ids in the graph to node ids in the exported file.
+    """
+    if objective not in ["parity", "reach", "buchi"]:
+        raise ValueError(f"Objective {objective} is not supported. Use one of 'parity', 'reach', 'buchi'.")
+
+    nodes = list(graph.nodes())
+    node2id = {uid: idx for idx, uid in enumerate(nodes)}
+    np_turn = graph["turn"]
+    np_final = graph["final"]
+    np_name = graph[name] if name is not None else None
+
+    # Priorities in PGSolver (max-parity) convention
+    if objective == "parity":
+        colors = [np_final[uid] for uid in nodes]
+        colors = [(min(c) if len(c) > 0 else None) if isinstance(c, (list, tuple, set)) else c for c in colors]
+        neutral = max((c for c in colors if c is not None), default=-1) + 1
+        colors = np.array([neutral if c is None else int(c) for c in colors], dtype=np.int64)
+        max_color = int(colors.max()) if len(colors) > 0 else 0
+        priority = max_color + max_color % 2 - colors
+    else:
+        # Even priority is good for player 1. Objective is satisfied by visiting final states (infinitely often).
+        is_final = np.array([bool(np_final[uid]) for uid in nodes], dtype=bool)
+        good, bad = (2, 1) if player == 1 else (1, 0)
+        priority = np.where(is_final, good, bad)
+
+    init_state = graph["init_state"] if graph.has_property("init_state") else None
+
+    with open(fpath, "w") as file:
+        file.write(f"parity {len(nodes) - 1};\n")
+        if init_state is not None:
+            state2node = GraphIndex.of(graph).state2node()
+            file.write(f"start {node2id[state2node[init_state]]};\n")
+        for chunk_start in range(0, len(nodes), chunk_size):
+            lines = []
+            for idx in range(chunk_start, min(chunk_start + chunk_size, len(nodes))):
+                uid = nodes[idx]
+                owner = 0 if np_turn[uid] == 1 else 1
+                prio = priority[idx]
+                if objective == "reach" and is_final[idx]:
+                    succ = [idx]
+                else:
+                    succ = sorted({node2id[vid] for vid in graph.successors(uid)})
+                    if len(succ) == 0:
+                        succ, prio = [idx], (prio if objective == "reach" else 1 - owner)
+                line = f"{idx} {prio} {owner} {','.join(map(str, succ))}"
+                if np_name is not None and np_name[uid] is not None:
+                    label = str(np_name[uid]).replace("\\", "\\\\").replace('"', '\\"')
+                    line += f' "{label}"'
+                lines.append(line + ";\n")
+            file.writelines(lines)
+
+    return node2id
+
+
+def from_pgsolver(fpath, chunk_size=2 ** 16):
+    """
+    Loads a parity game in PGSolver format as a game graph.
+
+    The file is parsed in chunks of lines. Each chunk is tokenized at once: names are extracted, separators are
+    replaced by whitespace and the end of every node declaration (;) is replaced by a sentinel -1. The tokens are
+    then converted to an integer array and split into node declarations using numpy operations.
+
+    The returned graph has node properties "state" (node id in file), "turn" (1 for owner 0, 2 for owner 1),
+    "final" (color under `Parity Min Even` convention) and "name" (if nodes are named in file). Graph properties
+    "is_deterministic", "is_probabilistic", "is_turn_based" are set. If the file specifies a start node, graph
+    property "init_state" is set to its id in file.
+
+    :param fpath: (str) Path to file in PGSolver format.
+    :param chunk_size: (int) Number of lines parsed at once.
+    :return: (Graph) Game graph.
+    """
+    ids, priorities, owners, sources, targets, names = [], [], [], [], [], dict()
+    init_state = None
+    with open(fpath, "r") as file:
+        while True:
+            lines = list(itertools.islice(file, chunk_size))
+            if len(lines) == 0:
+                break
+
+            # Header lines: "parity <max-id>;" and "start <id>;"
+            text = "".join(line for line in lines if not line.lstrip()[:1].isalpha())
+            for line in lines:
+                if line.lstrip().startswith("start"):
+                    init_state = int(line.split()[1].rstrip(";"))
+
+            # Node names are replaced by a marker. Marker positions identify the named node declarations.
+            offset = sum(len(chunk) for chunk in ids)
+            if '"' in text:
+                labels = [match.group(1).replace('\\"', '"').replace("\\\\", "\\")
+                          for match in PGSOLVER_NAME.finditer(text)]
+                text = PGSOLVER_NAME.sub("\0", text)
+                buffer = np.frombuffer(text.encode(), dtype=np.uint8)
+                index = np.searchsorted(np.flatnonzero(buffer == ord(";")), np.flatnonzero(buffer == 0))
+                names.update(zip((index + offset).tolist(), labels))
+                text = text.replace("\0", " ")
+
+            # Tokenize: id priority owner succ,succ,... ; -> id priority owner succ succ ... -1
+            text = text.replace(",", " ").replace(";", " -1 ")
+            tokens = np.fromstring(text, dtype=np.int64, sep=" ")
+            ends = np.flatnonzero(tokens == -1)
+            if len(ends) == 0:
+                continue
+            starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64)
+
+            is_succ = np.ones(len(tokens), dtype=bool)
+            is_succ[ends] = False
+            for position in range(3):
+                is_succ[starts + position] = False
+
+            ids.append(tokens[starts])
+            priorities.append(tokens[starts + 1])
+            owners.append(tokens[starts + 2])
+            sources.append(np.repeat(tokens[starts], ends - starts - 3))
+            targets.append(tokens[is_succ])
+
+    ids = np.concatenate(ids) if len(ids) > 0 else np.zeros(0, dtype=np.int64)
+    priorities = np.concatenate(priorities) if len(priorities) > 0 else np.zeros(0, dtype=np.int64)
+    owners = np.concatenate(owners) if len(owners) > 0 else np.zeros(0, dtype=np.int64)
+    sources = np.concatenate(sources) if len(sources) > 0 else np.zeros(0, dtype=np.int64)
+    targets = np.concatenate(targets) if len(targets) > 0 else np.zeros(0, dtype=np.int64)
+
+    # Remap (possibly sparse) ids in file to consecutive node ids.
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    if len(sorted_ids) > 1 and np.any(sorted_ids[1:] == sorted_ids[:-1]):
+        raise ValueError(f"Duplicate node declarations in {fpath}.")
+    uids = np.empty(len(ids), dtype=np.int64)
+    uids[order] = np.arange(len(ids))
+    src = uids[np.searchsorted(sorted_ids, sources)]
+    pos = np.searchsorted(sorted_ids, targets)
+    if np.any(pos >= len(sorted_ids)) or np.any(sorted_ids[np.minimum(pos, len(sorted_ids) - 1)] != targets):
+        raise ValueError(f"Successor is not declared as a node in {fpath}.")
+    dst = uids[pos]
+
+    # Priorities (max-parity) to colors (Parity Min Even).
+    max_priority = int(priorities.max()) if len(priorities) > 0 else 0
+    colors = max_priority + max_priority % 2 - priorities
+
+    # Construct graph
+    graph = Graph()
+    graph.add_nodes(len(ids))
+    graph.add_edges(zip(src.tolist(), dst.tolist()))
+
+    np_state = NodePropertyMap(graph)
+    np_turn = NodePropertyMap(graph)
+    np_final = NodePropertyMap(graph)
+    uids = uids.tolist()
+    np_state.update(zip(uids, ids.tolist()))
+    np_turn.update(zip(uids, np.where(owners == 0, 1, 2).tolist()))
+    np_final.update(zip(uids, colors.tolist()))
+    graph["state"] = np_state
+    graph["turn"] = np_turn
+    graph["final"] = np_final
+
+    if len(names) > 0:
+        np_name = NodePropertyMap(graph)
+        np_name.update((uids[idx], label) for idx, label in names.items())
+        graph["name"] = np_name
+
+    graph["is_deterministic"] = True
+    graph["is_probabilistic"] = False
+    graph["is_turn_based"] = True
+    if init_state is not None:
+        graph["init_state"] = init_state
+
+    return graph
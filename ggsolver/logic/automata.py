@@ -1,4 +1,6 @@
+import numpy as np
 import ggsolver.logic.base as base
+import ggsolver.util as util
 
 
 def filter_kwargs(states=None, atoms=None, trans_dict=None, init_state=None, final=None):
@@ -51,6 +53,26 @@ class DFA(base.Automaton):
                                   is_deterministic=True,
                                   acc_cond=(base.Automaton.ACC_REACH, 0))
 
+    def minimize(self):
+        """
+        Constructs the minimal DFA accepting the same language using Hopcroft's algorithm.
+
+        The transition function is tabulated once over sigma (see :func:`letter_table`). Inputs on which every
+        state behaves identically are merged into a single letter before partition refinement. Unreachable
+        states are removed and missing transitions are completed by a rejecting sink, which is dropped again
+        unless it is equivalent to a reachable state.
+
+        :return: (DFA) Minimal DFA, whose states are integers `0, ..., n-1` and initial state is `0`.
+        """
+        states, atoms, table = letter_table(self)
+        accepting = np.array([0 in _acc_sets(self.final(q)) for q in states] + [False], dtype=bool)
+        q0 = states.index(self.init_state())
+        table, reachable = _complete(table, q0)
+
+        # Letters with identical columns are indistinguishable.
+        block = _hopcroft(np.unique(table, axis=1), accepting, reachable)
+        return _quotient(DFA, q0, atoms, table, block, reachable, accepting)
+
 
 class Monitor(base.Automaton):
     """
@@ -82,6 +104,18 @@ class Monitor(base.Automaton):
                                       is_deterministic=True,
                                       acc_cond=(base.Automaton.ACC_SAFETY, 0))
 
+    def reduce(self):
+        """
+        Constructs a language-equivalent Monitor by merging bisimilar states.
+
+        Two states are bisimilar when they have the same acceptance sets and, on every input, move to bisimilar
+        states. The coarsest bisimulation is computed by signature-based partition refinement over the tabulated
+        transition function (see :func:`letter_table`). Unreachable states are removed.
+
+        :return: (Monitor) Reduced automaton, whose states are integers `0, ..., n-1` and initial state is `0`.
+        """
+        return _reduce(self, Monitor)
+
 
 class DBA(base.Automaton):
     """
@@ -113,6 +147,18 @@ class DBA(base.Automaton):
                                   is_deterministic=True,
                                   acc_cond=(base.Automaton.ACC_BUCHI, 0))
 
+    def reduce(self):
+        """
+        Constructs a language-equivalent DBA by merging bisimilar states.
+
+        Two states are bisimilar when they have the same acceptance sets and, on every input, move to bisimilar
+        states. The coarsest bisimulation is computed by signature-based partition refinement over the tabulated
+        transition function (see :func:`letter_table`). Unreachable states are removed.
+
+        :return: (DBA) Reduced automaton, whose states are integers `0, ..., n-1` and initial state is `0`.
+        """
+        return _reduce(self, DBA)
+
 
 class DCBA(base.Automaton):
     """
@@ -175,3 +221,202 @@ class DPA(base.Automaton):
         super(DPA, self).__init__(**kwargs,
                                   is_deterministic=True,
                                   acc_cond=(base.Automaton.ACC_PARITY, 0))
+
+
+# ==========================================================================
+# STATE REDUCTION
+# ==========================================================================
+def letter_table(aut):
+    """
+    Tabulates the transition function of a deterministic automaton over sigma.
+
+    The table is computed from :meth:`SpotAutomaton.transition_table` if available. Otherwise, the guards
+    of every state are compiled into truth tables (see :func:`ggsolver.logic.base.compile_pl`),
+    or `delta` is evaluated for every element of sigma when the automaton does not provide guards.
+
+    :param aut: (Automaton) A deterministic automaton with at most 16 atoms.
+    :return: (tuple) List of states, list of atoms and an array of shape (|Q|, 2^|AP|) whose entry `[i, mask]`
+        is the index of successor of i-th state on input `mask` (i-th bit of mask is set when i-th atom is true),
+        or -1 if the transition is undefined.
+    """
+    if not aut.is_deterministic():
+        raise ValueError(f"{aut.__class__.__name__} is not deterministic.")
+
+    states = list(aut.states())
+    atoms = list(aut.atoms())
+    util.apply_atoms_limit(atoms)
+
+    transition_table = getattr(aut, "transition_table", None)
+    table = transition_table() if transition_table is not None else None
+    if table is not None and states == list(range(len(states))):
+        return states, atoms, table.astype(np.int64)
+
+    index = {q: i for i, q in enumerate(states)}
+    num_masks = 2 ** len(atoms)
+    table = np.full((len(states), num_masks), -1, dtype=np.int64)
+    for q in states:
+        guards = aut.guards(q)
+        if guards is not None:
+            for formula, n_state in guards:
+                enabled = base.compile_pl(str(formula), tuple(atoms)).truth_table()[:num_masks]
+                table[index[q], enabled] = index[n_state]
+        else:
+            for inp in util.powerset(atoms):
+                n_state = aut.delta(q, list(inp))
+                if n_state is not None:
+                    table[index[q], sum(1 << atoms.index(p) for p in inp)] = index[n_state]
+
+    return states, atoms, table
+
+
+def _acc_sets(acc):
+    """ Acceptance sets of a state as a list. """
+    return list(acc) if isinstance(acc, (list, tuple, set)) else [acc]
+
+
+def _complete(table, q0):
+    """
+    Completes the table by redirecting undefined transitions to a sink (the last row) and
+    determines the reachable states from `q0`.
+    """
+    sink = table.shape[0]
+    table = np.vstack([np.where(table < 0, sink, table), np.full((1, table.shape[1]), sink, dtype=np.int64)])
+
+    reachable = np.zeros(sink + 1, dtype=bool)
+    reachable[q0] = True
+    frontier = np.array([q0])
+    while frontier.size > 0:
+        successors = np.unique(table[frontier])
+        frontier = successors[~reachable[successors]]
+        reachable[frontier] = True
+    return table, reachable
+
+
+def _hopcroft(table, accepting, reachable):
+    """
+    Hopcroft's partition refinement over the reachable states of a complete transition table.
+
+    :return: (numpy array) Block index of every reachable state (-1 for unreachable states).
+    """
+    num_states, num_letters = table.shape
+
+    # Predecessors of every state per letter (over reachable states).
+    sources = np.flatnonzero(reachable)
+    pred = [dict() for _ in range(num_letters)]
+    for a in range(num_letters):
+        for q, t in zip(sources.tolist(), table[sources, a].tolist()):
+            pred[a].setdefault(t, []).append(q)
+
+    block = np.full(num_states, -1, dtype=np.int64)
+    blocks = [set(q for q in sources.tolist() if accepting[q]), set(q for q in sources.tolist() if not accepting[q])]
+    blocks = [b for b in blocks if len(b) > 0]
+    for idx, b in enumerate(blocks):
+        block[list(b)] = idx
+
+    work = {(min(range(len(blocks)), key=lambda i: len(blocks[i])), a) for a in range(num_letters)} \
+        if len(blocks) > 1 else set()
+    while len(work) > 0:
+        splitter, a = work.pop()
+        predecessors = set()
+        for t in blocks[splitter]:
+            predecessors.update(pred[a].get(t, []))
+
+        # Split every block that has states both inside and outside of the predecessors.
+        touched = dict()
+        for q in predecessors:
+            touched.setdefault(int(block[q]), set()).add(q)
+        for b, inside in touched.items():
+            if len(inside) == len(blocks[b]):
+                continue
+            outside = blocks[b] - inside
+            small, large = (inside, outside) if len(inside) <= len(outside) else (outside, inside)
+            blocks[b] = large
+            blocks.append(small)
+            new = len(blocks) - 1
+            block[list(small)] = new
+            # The smaller half is the new block. Hence, it is added to the work set whether or not
+            #   (b, c) is in the work set.
+            for c in range(num_letters):
+                work.add((new, c))
+
+    return block
+
+
+def _bisimulation(table, acc_sets):
+    """
+    Signature-based partition refinement. The initial partition groups states by acceptance sets
+    (the sink forms its own block). A block is split until all its states move to the same blocks on every input.
+
+    :return: (numpy array) Block index of every state.
+    """
+    labels = {acc: idx for idx, acc in enumerate(sorted(set(acc_sets), key=str))}
+    block = np.array([labels[acc] for acc in acc_sets] + [len(labels)], dtype=np.int64)
+    num_blocks = len(np.unique(block))
+    while True:
+        signature = np.column_stack([block, block[table]])
+        _, block = np.unique(signature, axis=0, return_inverse=True)
+        block = block.reshape(-1)
+        if block.max() + 1 == num_blocks:
+            return block
+        num_blocks = block.max() + 1
+
+
+def _reduce(aut, cls):
+    """
+    Constructs the quotient automaton of class `cls` of a deterministic automaton `aut` under
+    the coarsest bisimulation (see :func:`_bisimulation`). Unreachable states are removed.
+    """
+    states, atoms, table = letter_table(aut)
+    acc_sets = [tuple(_acc_sets(aut.final(q))) for q in states]
+    q0 = states.index(aut.init_state())
+    table, reachable = _complete(table, q0)
+    block = _bisimulation(table, acc_sets)
+    accepting = np.array([0 in acc for acc in acc_sets] + [False], dtype=bool)
+    return _quotient(cls, q0, atoms, table, block, reachable, accepting)
+
+
+def _quotient(cls, q0, atoms, table, block, reachable, accepting):
+    """
+    Constructs the quotient automaton of class `cls` over the reachable blocks.
+    Blocks are numbered in BFS order from the initial block. Blocks containing only the sink are dropped.
+    Guards are constructed from the inputs leading to each block (see :func:`ggsolver.logic.base.bdd2formula`).
+    """
+    sink = table.shape[0] - 1
+    real = reachable.copy()
+    real[sink] = False
+
+    # Representative of every block that contains a reachable state.
+    representative = dict()
+    for q in np.flatnonzero(real).tolist():
+        representative.setdefault(int(block[q]), q)
+
+    # Number blocks in BFS order starting from the initial block.
+    start = int(block[q0])
+    order = {start: 0}
+    queue = [start]
+    while len(queue) > 0:
+        b = queue.pop(0)
+        for t in np.unique(block[table[representative[b]]]).tolist():
+            if t in representative and t not in order:
+                order[t] = len(order)
+                queue.append(t)
+
+    bdd = base.CompiledPL.BDD_MANAGER
+    bdd.declare(*atoms)
+    masks = np.arange(table.shape[1])
+    cubes = [bdd.cube({p: bool(m >> i & 1) for i, p in enumerate(atoms)}) for m in masks.tolist()]
+    trans_dict = dict()
+    for b, idx in order.items():
+        row = block[table[representative[b]]]
+        trans_dict[idx] = dict()
+        for t in np.unique(row).tolist():
+            if t not in order:
+                continue
+            u = bdd.false
+            for m in masks[row == t].tolist():
+                u = u | cubes[m]
+            trans_dict[idx][base.bdd2formula(u)] = order[t]
+
+    final = [idx for b, idx in order.items() if accepting[representative[b]]]
+    return cls(states=list(range(len(order))), atoms=atoms, trans_dict=trans_dict, init_state=0, final=final)
+
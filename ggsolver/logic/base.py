@@ -1,6 +1,14 @@
+import atexit
+import collections
+import functools
+import hashlib
 import itertools
+import json
 import logging
+import os
+import numpy as np
 import spot
+import buddy
 from dd.autoref import BDD
 from ggsolver.logic.formula import BaseFormula, ParsingError
 from tqdm import tqdm
@@ -59,25 +67,12 @@ class PL(BaseFormula):
     def evaluate(self, true_atoms):
         """
         Evaluates a propositional logic formula given the set of true atoms.
+        The formula is compiled once (see :func:`compile_pl`) and cached.
 
         :param true_atoms: (Iterable[str]) A propositional logic formula.
         :return: (bool) True if formula is true, otherwise False.
         """
-        # Define a transform to apply to AST of spot.formula.
-        def transform(node: spot.formula):
-            if node.is_literal():
-                if "!" not in node.to_str():
-                    if node.to_str() in true_atoms:
-                        return spot.formula.tt()
-                    else:
-                        return spot.formula.ff()
-
-            return node.map(transform)
-
-        # Apply the transform and return the result.
-        # Since every literal is replaced by true or false,
-        #   the transformed formula is guaranteed to be either true or false.
-        return True if transform(self._repr).is_tt() else False
+        return compile_pl(self.f_str, tuple(sorted(self.atoms()))).evaluate(true_atoms)
 
     def atoms(self):
         """
@@ -109,22 +104,166 @@ class PL(BaseFormula):
             boolean_to_isop=True
         ).to_str()
 
+    def bdd(self):
+        """
+        Returns the BDD representing the formula in the shared manager `CompiledPL.BDD_MANAGER`.
+
+        :return: (dd.autoref.Function) BDD of the formula.
+        """
+        return compile_pl(self.f_str, tuple(sorted(self.atoms()))).bdd()
+
+    def iter_allsat(self):
+        """
+        Generates the satisfying assignments to atoms of the given propositional logic formula
+        by enumerating the paths of its BDD.
+
+        :return: (Generator[tuple[str]]) Each assignment is a tuple of atoms that are true (in sorted order).
+        """
+        atoms = sorted(self.atoms())
+        for assignment in CompiledPL.BDD_MANAGER.pick_iter(self.bdd(), care_vars=set(atoms)):
+            yield tuple(p for p in atoms if assignment[p])
+
     def allsat(self):
         """
         Generates the set of all satisfying assignments to atoms of the given propositional logic formula.
 
-        .. note:: Complexity: Exponential in the number of atoms.
+        .. note:: Complexity: Linear in the number of satisfying assignments. See :meth:`PL.iter_allsat`.
+        """
+        return list(self.iter_allsat())
+
+    def count_sat(self):
+        """
+        Counts the satisfying assignments to atoms of the given propositional logic formula without enumerating them.
+
+        :return: (int) Number of satisfying assignments.
+        """
+        return CompiledPL.BDD_MANAGER.count(self.bdd(), nvars=len(self.atoms()))
+
+
+class CompiledPL:
+    """
+    A propositional logic formula compiled for fast evaluation over bitmask valuations.
+
+    A valuation is represented by an integer whose i-th bit is set when `atoms()[i]` is true.
+    When there are at most 16 atoms, the formula is compiled into a truth table (a boolean array of size 2^|AP|)
+    and evaluation is an array lookup. Otherwise, the formula is compiled into a BDD.
+
+    Use :func:`compile_pl` to construct compiled formulas, which caches them by formula string and atoms.
+
+    :param f_str: (str) PL formula in spot syntax.
+    :param atoms: (Iterable[str]) Atoms that define the bit order of valuations. Atoms of the formula
+        that are not given are appended in sorted order.
+    """
+    BDD_MANAGER = BDD()
+
+    def __init__(self, f_str, atoms=()):
+        formula = spot.formula(f_str)
+        if not formula.is_boolean():
+            raise ParsingError(f"Given formula:{f_str} is not a PL formula.")
+
+        self.f_str = f_str
+        self._formula = formula
+        self._atoms = list(atoms) + sorted(set(self._collect_atoms(formula)) - set(atoms))
+        self._atom_index = {p: i for i, p in enumerate(self._atoms)}
+        self._table = None
+        self._bdd = None
+
+        if len(self._atoms) <= 16:
+            masks = np.arange(2 ** len(self._atoms))
+            columns = {p: ((masks >> i) & 1).astype(bool) for i, p in enumerate(self._atoms)}
+            self._table = self._compile(formula, columns.get, np.ones(len(masks), dtype=bool))
+        else:
+            self.bdd()
+
+    def __call__(self, mask):
+        """
+        Evaluates the formula.
+
+        :param mask: (int) Valuation of atoms as a bitmask.
+        :return: (bool) True if formula is true, otherwise False.
+        """
+        if self._table is not None:
+            return bool(self._table[mask])
+
+        bdd = self.BDD_MANAGER
+        values = {p: bool(mask >> self._atom_index[p] & 1) for p in bdd.support(self._bdd)}
+        return bdd.let(values, self._bdd) == bdd.true
+
+    def atoms(self):
+        """ Atoms of the compiled formula in bit order. """
+        return list(self._atoms)
+
+    def mask(self, true_atoms):
+        """
+        Encodes a set of true atoms as a bitmask. Atoms that are not atoms of the compiled formula are ignored.
+
+        :param true_atoms: (Iterable[str]) Atoms that are true.
+        :return: (int) Bitmask.
+        """
+        index = self._atom_index
+        return sum(1 << index[p] for p in set(true_atoms) if p in index)
+
+    def evaluate(self, true_atoms):
+        """
+        Evaluates the formula given the set of true atoms.
+
+        :param true_atoms: (Iterable[str]) Atoms that are true.
+        :return: (bool) True if formula is true, otherwise False.
         """
-        # Apply limitation on atoms we allow in ggsolver. Raises ValueError if |atoms| exceeds limit.
-        util.apply_atoms_limit(self.atoms())
+        return self(self.mask(true_atoms))
 
-        # For each assignment, check whether the formula evaluates to True.
-        # If yes, include it in set of all satisfying assignments.
-        sat_assignments = []
-        for assignment in util.powerset(self.atoms()):
-            if self.evaluate(assignment):
-                sat_assignments.append(assignment)
-        return sat_assignments
+    def bdd(self):
+        """
+        Returns the BDD of the formula in the shared manager `CompiledPL.BDD_MANAGER`.
+        The BDD is constructed on first call.
+
+        :return: (dd.autoref.Function) BDD of the formula.
+        """
+        if self._bdd is None:
+            bdd = self.BDD_MANAGER
+            bdd.declare(*self._atoms)
+            self._bdd = self._compile(self._formula, bdd.var, bdd.true)
+        return self._bdd
+
+    def truth_table(self):
+        """
+        Returns the truth table of the formula: a boolean array indexed by valuation bitmasks.
+
+        :return: (numpy array or None) Truth table. None, if the formula has more than 16 atoms.
+        """
+        return self._table
+
+    @staticmethod
+    def _collect_atoms(formula):
+        if formula.kind() == spot.op_ap:
+            return {formula.ap_name()}
+        return set().union(*(CompiledPL._collect_atoms(child) for child in formula))
+
+    @staticmethod
+    def _compile(formula, var, true):
+        """ Evaluates the AST of a spot formula over an algebra (truth table columns or BDDs). """
+        kind = formula.kind()
+        if kind == spot.op_tt:
+            return true
+        if kind == spot.op_ff:
+            return ~true
+        if kind == spot.op_ap:
+            return var(formula.ap_name())
+
+        children = [CompiledPL._compile(child, var, true) for child in formula]
+        if kind == spot.op_Not:
+            return ~children[0]
+        if kind == spot.op_And:
+            return functools.reduce(lambda x, y: x & y, children)
+        if kind == spot.op_Or:
+            return functools.reduce(lambda x, y: x | y, children)
+        if kind == spot.op_Xor:
+            return (children[0] & ~children[1]) | (~children[0] & children[1])
+        if kind == spot.op_Implies:
+            return ~children[0] | children[1]
+        if kind == spot.op_Equiv:
+            return (children[0] & children[1]) | (~children[0] & ~children[1])
+        raise ParsingError(f"Operator in {formula} is not supported by PL.")
 
 
 class Automaton(models.GraphicalModel):
@@ -205,10 +344,18 @@ class Automaton(models.GraphicalModel):
             self.atoms = atoms_
 
         if "trans_dict" in kwargs:
+            # Guards are compiled on first use. All guards share the bit order of self.atoms().
+            compiled = dict()
+
             def delta_(state, inp):
+                if state not in compiled:
+                    atoms = tuple(self.atoms())
+                    compiled[state] = [(compile_pl(str(formula), atoms), n_state)
+                                       for formula, n_state in kwargs["trans_dict"][state].items()]
+
                 next_states = set()
-                for formula, n_state in kwargs["trans_dict"][state].items():
-                    if PL(f_str=formula, atoms=self.atoms()).evaluate(inp):
+                for formula, n_state in compiled[state]:
+                    if formula.evaluate(inp):
                         next_states.add(n_state)
 
                 if self.is_deterministic():
@@ -219,7 +366,11 @@ class Automaton(models.GraphicalModel):
 
                 return next_states
 
+            def guards_(state):
+                return [(formula, n_state) for formula, n_state in kwargs["trans_dict"][state].items()]
+
             self.delta = delta_
+            self.guards = guards_
 
         if "init_state" in kwargs:
             self.initialize(kwargs["init_state"])
@@ -273,42 +424,62 @@ class Automaton(models.GraphicalModel):
                                               f"Currently it is set to '{self._input_domain}'."
         input_func = getattr(self, self._input_domain)
         atoms = input_func()
-        inputs = util.powerset(atoms)
         logging.info(util.ColoredMsg.ok(f"[INFO] Input domain function detected as '{self._input_domain}'. [OK]"))
 
         # Graph property: input domain (stores the name of edge property that represents inputs)
         graph["input_domain"] = self._input_domain
         logging.info(util.ColoredMsg.ok(f"[INFO] Processed graph property: input_domain. [OK]"))
 
-        # # Get input domain
-        # inputs = input_func()
-
         # Edge properties: input, prob,
         ep_input = EdgePropertyMap(graph=graph)
         ep_prob = EdgePropertyMap(graph=graph, default=None)
 
         # Generate edges
-        delta = getattr(self, "delta")
-        edges = {uid: dict() for uid in node_ids}
-        for state, inp in tqdm(itertools.product(self.__states.keys(), inputs),
-                               total=len(self.__states) * 2 ** len(atoms),
-                               desc="Specialized unpointed graphify adding edges for automaton "):
-
-            new_edges = self._gen_edges(delta, state, inp)
-
-            # Update graph edges
-            uid = self.__states[state]
-            for _, t, _, _ in new_edges:
-                vid = self.__states[t]
-                if vid not in edges[uid]:
-                    edges[uid][vid] = list()
-                edges[uid][vid].append(inp)
-
-        for uid in edges.keys():
-            for vid in edges[uid].keys():
-                key = graph.add_edge(uid, vid)
-                ep_input[uid, vid, key] = sat2formula(atoms, edges[uid][vid])
-                ep_prob[uid, vid, key] = None
+        #   If automaton provides guards, then guards of transitions to the same state are ORed.
+        #   Otherwise, delta is evaluated for every input in powerset of atoms and inputs are merged using sat2formula.
+        guards = getattr(self, "guards")
+        if len(states) > 0 and guards(states[0]) is not None:
+            for state in tqdm(states, desc="Specialized unpointed graphify adding edges for automaton "):
+                edges = dict()
+                for formula, n_state in guards(state):
+                    if str(formula).strip() in ["false", "0"]:
+                        continue
+                    edges.setdefault(n_state, []).append(str(formula))
+
+                uid = self.__states[state]
+                for n_state, formulas in edges.items():
+                    label = formulas[0] if len(formulas) == 1 else " | ".join(f"({f})" for f in formulas)
+                    vid = self.__states[n_state]
+                    key = graph.add_edge(uid, vid)
+                    ep_input[uid, vid, key] = PL(f_str=label, atoms=atoms)
+                    ep_prob[uid, vid, key] = None
+
+        else:
+            # Apply limitation on atoms we allow in ggsolver. Raises ValueError if |atoms| exceeds limit.
+            util.apply_atoms_limit(atoms)
+            inputs = util.powerset(atoms)
+
+            delta = getattr(self, "delta")
+            edges = {uid: dict() for uid in node_ids}
+            for state, inp in tqdm(itertools.product(self.__states.keys(), inputs),
+                                   total=len(self.__states) * 2 ** len(atoms),
+                                   desc="Specialized unpointed graphify adding edges for automaton "):
+
+                new_edges = self._gen_edges(delta, state, inp)
+
+                # Update graph edges
+                uid = self.__states[state]
+                for _, t, _, _ in new_edges:
+                    vid = self.__states[t]
+                    if vid not in edges[uid]:
+                        edges[uid][vid] = list()
+                    edges[uid][vid].append(inp)
+
+            for uid in edges.keys():
+                for vid in edges[uid].keys():
+                    key = graph.add_edge(uid, vid)
+                    ep_input[uid, vid, key] = sat2formula(atoms, edges[uid][vid])
+                    ep_prob[uid, vid, key] = None
 
         # Add edge properties to graph
         graph["input"] = ep_input
@@ -378,6 +549,20 @@ class Automaton(models.GraphicalModel):
     # ==========================================================================
     # FUNCTIONS TO BE IMPLEMENTED BY USER.
     # ==========================================================================
+    def guards(self, state):
+        """
+        Returns the outgoing transitions of the given state as a list of (guard, next state) pairs, where guard
+        is a PL formula (string) over atoms. Several pairs may share the same next state.
+
+        Graphify uses guards to construct edge labels in time proportional to the number of transitions.
+        By default, guards are not available (returns None) and graphify evaluates `delta` for every element of
+        sigma.
+
+        :param state: (an element of `self.states()`) A valid state.
+        :return: (list of tuples or None) Guarded transitions.
+        """
+        return None
+
     def sigma(self):
         """
         Returns the set of alphabet of automaton. It is the powerset of atoms().
@@ -394,6 +579,7 @@ class Automaton(models.GraphicalModel):
         # Copy all functions from automaton.
         self.states = aut.states
         self.delta = aut.delta
+        self.guards = aut.guards
         self._input_domain = "atoms"
 
         for gp in aut.GRAPH_PROPERTY:
@@ -406,6 +592,129 @@ class Automaton(models.GraphicalModel):
             setattr(self, ep, getattr(aut, ep))
 
 
+class TranslationCache:
+    """
+    Cache of LTL-to-automaton translations performed by :class:`SpotAutomaton`.
+
+    A translation is identified by the key (formula, atoms, options), where formula is the simplified
+    formula string (see `spot.simplify`), so that equivalent formulas written differently share an entry,
+    atoms is the sorted tuple of user-provided atoms and options is the tuple of options passed to
+    `spot.translate` (None, if options are determined automatically). Each entry stores the spot automaton,
+    the acceptance condition (in ggsolver terms) and the precompiled transition function (guards and
+    transition table).
+
+    Entries are held in memory with least-recently-used eviction. If `cache_dir` is given, entries are also
+    persisted on disk: the automaton in HOA format (`<digest>.hoa`), the precompiled transition function
+    (`<digest>.npz`) and the metadata (`<digest>.json`), where digest is the SHA-256 hash of the key.
+
+    :param maxsize: (int) Maximum number of entries held in memory.
+    :param cache_dir: (str or None) Directory for on-disk persistence. If None, entries are not persisted.
+    """
+    def __init__(self, maxsize=128, cache_dir=None):
+        self._maxsize = maxsize
+        self._cache_dir = cache_dir
+        self._entries = collections.OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self._cache_dir is not None and os.path.exists(self._fpath(key, "json")))
+
+    @staticmethod
+    def key(formula, atoms, options):
+        """ Constructs the cache key for a translation. """
+        formula = spot.simplify(spot.formula(formula)).to_str()
+        return formula, tuple(sorted(atoms)), tuple(options) if options is not None else None
+
+    def set_cache_dir(self, cache_dir):
+        """ Sets the directory for on-disk persistence. If None, entries are not persisted. """
+        self._cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def clear(self):
+        """ Clears the in-memory entries. Persisted entries are not deleted. """
+        self._entries.clear()
+
+    def get(self, key):
+        """
+        Returns the cached entry for the given key, or None if the translation is not cached.
+        On-disk entries are loaded into memory.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        if self._cache_dir is not None and os.path.exists(self._fpath(key, "json")):
+            entry = self._load(key)
+            self._insert(key, entry)
+            return entry
+
+        return None
+
+    def put(self, key, entry):
+        """
+        Caches an entry. An entry is a dictionary with keys
+        "spot_aut", "acc_cond", "atoms", "guards" and "table".
+
+        .. note:: Cached entries are shared. :class:`SpotAutomaton` stores a copy of the spot automaton in the
+            cache and copies it again on every cache hit.
+        """
+        self._insert(key, entry)
+        if self._cache_dir is not None:
+            self._save(key, entry)
+
+    def _insert(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def _fpath(self, key, ext):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self._cache_dir, f"{digest}.{ext}")
+
+    def _save(self, key, entry):
+        with open(self._fpath(key, "hoa"), "w") as file:
+            file.write(entry["spot_aut"].to_str("hoa"))
+
+        # Guards are flattened into CSR arrays: cubes of state q are at positions ptr[q]:ptr[q+1].
+        arrays = dict()
+        if len(entry["atoms"]) <= 62:
+            cubes = [cube for guards in entry["guards"] for cube in guards]
+            arrays["ptr"] = np.cumsum([0] + [len(guards) for guards in entry["guards"]])
+            arrays["cubes"] = np.array(cubes, dtype=np.int64).reshape(-1, 3)
+        if entry["table"] is not None:
+            arrays["table"] = entry["table"]
+        np.savez_compressed(self._fpath(key, "npz"), **arrays)
+
+        # Metadata is written last, and marks the entry as complete.
+        with open(self._fpath(key, "json"), "w") as file:
+            json.dump({"key": list(key), "acc_cond": list(entry["acc_cond"]), "atoms": entry["atoms"]}, file)
+
+    def _load(self, key):
+        with open(self._fpath(key, "json"), "r") as file:
+            meta = json.load(file)
+
+        entry = {
+            "spot_aut": spot.automaton(self._fpath(key, "hoa")),
+            "acc_cond": tuple(meta["acc_cond"]),
+            "atoms": meta["atoms"],
+            "guards": None,
+            "table": None
+        }
+        with np.load(self._fpath(key, "npz")) as arrays:
+            if "ptr" in arrays:
+                ptr, cubes = arrays["ptr"], arrays["cubes"].tolist()
+                entry["guards"] = [[tuple(cube) for cube in cubes[ptr[q]:ptr[q + 1]]] for q in range(len(ptr) - 1)]
+            if "table" in arrays:
+                entry["table"] = arrays["table"]
+        return entry
+
+
 class SpotAutomaton(Automaton):
     """
     `SpotAutomaton` constructs an :class:`Automaton` from an LTL specification string using
@@ -419,7 +728,9 @@ class SpotAutomaton(Automaton):
     This is intentionally done to be able to run our codes on robots that may not have logic libraries installed.
     """
 
-    def __init__(self, formula=None, options=None, atoms=None):
+    TRANSLATION_CACHE = TranslationCache()     #: Cache of translations shared by all instances.
+
+    def __init__(self, formula=None, options=None, atoms=None, use_cache=True):
         """
         Given an LTL formula, SpotAutomaton determines the best options for spot.translate() function
         to generate a deterministic automaton in ggsolver.Automaton format.
@@ -427,6 +738,9 @@ class SpotAutomaton(Automaton):
         :param formula: (str) LTL formula.
         :param options: (List/Tuple of str) Valid options for spot.translate() function. By default, the
             value is `None`, in which case, the options are determined automatically. See description below.
+        :param atoms: (Iterable[str]) Atoms in addition to those appearing in the formula.
+        :param use_cache: (bool) If True, the translation is looked up in (and added to)
+            `SpotAutomaton.TRANSLATION_CACHE`. See :class:`TranslationCache`.
 
         **Default translation options:** While constructing an automaton using `spot`, we use the following
         options: `deterministic, high, complete, unambiguous, SBAcc`. If selected acceptance condition
@@ -456,6 +770,19 @@ class SpotAutomaton(Automaton):
         self._formula = formula
         self._user_atoms = set(atoms) if atoms is not None else set()
 
+        # Translations with options determined automatically are cached with options=None.
+        key = TranslationCache.key(formula, self._user_atoms, options)
+        entry = self.TRANSLATION_CACHE.get(key) if use_cache else None
+        if entry is not None:
+            logging.info(util.ColoredMsg.ok(f"[INFO] Loaded translation of {self._formula} from cache. [OK]"))
+            self.spot_aut = spot.make_twa_graph(entry["spot_aut"], spot.twa_prop_set.all())
+            self._acc_cond = entry["acc_cond"]
+            self._atoms = list(entry["atoms"])
+            self._atom_index = {p: i for i, p in enumerate(self._atoms)}
+            self._guards = entry["guards"] if entry["guards"] is not None else self._compile_guards()
+            self._table = entry["table"]
+            return
+
         # If options are not given, determine the set of options to generate deterministic automaton with
         # state-based acceptance condition.
         if options is None:
@@ -463,21 +790,41 @@ class SpotAutomaton(Automaton):
 
         print(f"[INFO] Translating {self._formula} with options={options}.")
         self.spot_aut = spot.translate(formula, *options)
-
-        # Set the acceptance condition (in ggsolver terms)
+        self._acc_cond = self._determine_acc_cond()
+
+        # Precompile the transition function.
+        #   Atoms are sorted. An input (set of true atoms) is represented by a bitmask, where i-th bit is set
+        #   when atoms()[i] is true. Every edge condition is stored as a list of cubes (care, value, dst):
+        #   an input mask satisfies the cube when `mask & care == value`.
+        self._atoms = sorted({str(ap) for ap in self.spot_aut.ap()} | self._user_atoms)
+        self._atom_index = {p: i for i, p in enumerate(self._atoms)}
+        self._guards = self._compile_guards()
+        self._table = self._compile_table()
+
+        if use_cache:
+            self.TRANSLATION_CACHE.put(key, {
+                "spot_aut": spot.make_twa_graph(self.spot_aut, spot.twa_prop_set.all()),
+                "acc_cond": self._acc_cond,
+                "atoms": self._atoms,
+                "guards": self._guards,
+                "table": self._table
+            })
+
+    def _determine_acc_cond(self):
+        """ Determines the acceptance condition (in ggsolver terms) of the translated automaton. """
         name = self.spot_aut.acc().name()
-        if name == "Büchi" and spot.mp_class(formula).upper() in ["S"]:
-            self._acc_cond = (Automaton.ACC_SAFETY, 0)
-        elif name == "Büchi" and spot.mp_class(formula).upper() in ["B", "G"]:
-            self._acc_cond = (Automaton.ACC_REACH, 0)
-        elif name == "Büchi" and spot.mp_class(formula).upper() in ["O", "R"]:
-            self._acc_cond = (Automaton.ACC_BUCHI, 0)
+        if name == "Büchi" and spot.mp_class(self._formula).upper() in ["S"]:
+            return Automaton.ACC_SAFETY, 0
+        elif name == "Büchi" and spot.mp_class(self._formula).upper() in ["B", "G"]:
+            return Automaton.ACC_REACH, 0
+        elif name == "Büchi" and spot.mp_class(self._formula).upper() in ["O", "R"]:
+            return Automaton.ACC_BUCHI, 0
         elif name == "co-Büchi":
-            self._acc_cond = (Automaton.ACC_COBUCHI, 0)
+            return Automaton.ACC_COBUCHI, 0
         elif name == "all":
-            self._acc_cond = (Automaton.ACC_SAFETY, 0)
+            return Automaton.ACC_SAFETY, 0
         else:  # name contains "parity":
-            self._acc_cond = (Automaton.ACC_PARITY, 0)
+            return Automaton.ACC_PARITY, 0
 
     def _determine_options(self):
         """
@@ -493,13 +840,89 @@ class SpotAutomaton(Automaton):
         else:  # cls.upper() == "T":
             return 'parity min even', "Deterministic", "High", "Complete", "Unambiguous", "SBAcc", "colored"
 
+    def _compile_guards(self):
+        """
+        Decomposes the condition of every edge into cubes by enumerating the paths of its BDD.
+
+        :return: (list of lists) For every state, a list of cubes (care, value, dst).
+        """
+        bdd_dict = self.spot_aut.get_dict()
+        var2bit = {bdd_dict.varnum(ap): 1 << self._atom_index[str(ap)] for ap in self.spot_aut.ap()}
+
+        def cubes(cond, care, value):
+            if cond == buddy.bddfalse:
+                return
+            if cond == buddy.bddtrue:
+                yield care, value
+                return
+            bit = var2bit[buddy.bdd_var(cond)]
+            yield from cubes(buddy.bdd_low(cond), care | bit, value)
+            yield from cubes(buddy.bdd_high(cond), care | bit, value | bit)
+
+        guards = []
+        for state in range(self.spot_aut.num_states()):
+            guards.append([(care, value, int(t.dst)) for t in self.spot_aut.out(state)
+                           for care, value in cubes(t.cond, 0, 0)])
+        return guards
+
+    def _compile_table(self):
+        """
+        Tabulates the transition function of a deterministic automaton as an array of shape (|Q|, 2^|AP|).
+        The entry `table[q, mask]` is the successor of `q` on input `mask`, or -1 if undefined.
+        The table is not constructed for non-deterministic automata, or when the number of atoms exceeds 16.
+        """
+        if not self.is_deterministic() or len(self._atoms) > 16:
+            return None
+
+        masks = np.arange(2 ** len(self._atoms))
+        table = np.full((self.spot_aut.num_states(), len(masks)), -1, dtype=np.int32)
+        for state, guards in enumerate(self._guards):
+            for care, value, dst in guards:
+                table[state, (masks & care) == value] = dst
+        return table
+
+    def guards(self, state):
+        """
+        Returns the outgoing transitions of the given state as a list of (guard, next state) pairs.
+        Conditions of edges to the same state are ORed and formatted as a PL formula by spot.
+        """
+        bdd_dict = self.spot_aut.get_dict()
+        conditions = dict()
+        for t in self.spot_aut.out(state):
+            dst = int(t.dst)
+            conditions[dst] = conditions[dst] | t.cond if dst in conditions else t.cond
+        return [(spot.bdd_format_formula(bdd_dict, cond), dst) for dst, cond in conditions.items()
+                if cond != buddy.bddfalse]
+
     def states(self):
         """ States of automaton. """
         return list(range(self.spot_aut.num_states()))
 
     def atoms(self):
-        """ Atomic propositions appearing in LTL formula. """
-        return list({str(ap) for ap in self.spot_aut.ap()} | self._user_atoms)
+        """ Atomic propositions appearing in LTL formula (and the user-provided atoms) in sorted order. """
+        return list(self._atoms)
+
+    def atoms2mask(self, inp):
+        """
+        Encodes a set of true atoms as a bitmask, where i-th bit is set when `atoms()[i]` is true.
+        Atoms that are not atoms of the automaton are ignored.
+
+        :param inp: (Iterable[str]) Atoms that are true.
+        :return: (int) Bitmask.
+        """
+        index = self._atom_index
+        return sum(1 << index[p] for p in set(inp) if p in index)
+
+    def transition_table(self):
+        """
+        Returns the precompiled transition table of a deterministic automaton: an array of shape (|Q|, 2^|AP|),
+        whose entry `[q, mask]` is the successor of state `q` on input `mask` (see :meth:`atoms2mask`),
+        or -1 if the transition is undefined.
+
+        :return: (numpy array or None) Transition table. None, if the automaton is non-deterministic or
+            has more than 16 atoms.
+        """
+        return self._table
 
     def delta(self, state, inp):
         """
@@ -507,32 +930,21 @@ class SpotAutomaton(Automaton):
         returns a list/tuple of states.
 
         :param state: (object) A valid state.
-        :param inp: (list) List of atoms that are true (an element of sigma).
+        :param inp: (list or int) List of atoms that are true (an element of sigma), or its bitmask
+            (see :meth:`atoms2mask`).
         """
-        # Preprocess inputs
-        inp_dict = {p: True for p in inp} | {p: False for p in self.atoms() if p not in inp}
+        mask = inp if isinstance(inp, (int, np.integer)) else self.atoms2mask(inp)
 
-        # Initialize a BDD over set of atoms.
-        bdd = BDD()
-        bdd.declare(*self.atoms())
-
-        # Get spot BDD dict to extract formula
-        bdd_dict = self.spot_aut.get_dict()
+        # Deterministic automaton: table lookup.
+        if self._table is not None:
+            next_state = int(self._table[state, mask])
+            return next_state if next_state >= 0 else None
 
         # Get next states
         next_states = []
-        for t in self.spot_aut.out(state):
-            label = spot.bdd_format_formula(bdd_dict, t.cond)
-            label = spot.formula(label)
-            if label.is_ff():
-                continue
-            elif label.is_tt():
-                next_states.append(int(t.dst))
-            else:
-                label = spot.formula(label).to_str('spin')
-                v = bdd.add_expr(label)
-                if bdd.let(inp_dict, v) == bdd.true:
-                    next_states.append(int(t.dst))
+        for care, value, dst in self._guards[state]:
+            if mask & care == value and dst not in next_states:
+                next_states.append(dst)
 
         # Return based on whether automaton is deterministic or non-deterministic.
         #   If automaton is deterministic but len(next_states) = 0, then automaton is incomplete, return None.
@@ -638,26 +1050,94 @@ class SpotAutomaton(Automaton):
         return bool(self.spot_aut.prop_inherently_weak())
 
 
+@functools.lru_cache(maxsize=4096)
+def compile_pl(f_str, atoms=()):
+    """
+    Compiles a PL formula for fast evaluation (see :class:`CompiledPL`). Compiled formulas are cached.
+
+    :param f_str: (str) PL formula in spot syntax.
+    :param atoms: (tuple[str]) Atoms that define the bit order of valuations.
+    :return: (:class:`CompiledPL`) Compiled formula.
+    """
+    return CompiledPL(f_str, atoms)
+
+
+# Release cached BDDs before the shared BDD manager is garbage collected at exit.
+atexit.register(compile_pl.cache_clear)
+
+
 def sat2formula(atoms, sat_assignments):
     """
     Given a subset of elements from powerset(atoms), generates a propositional logic formula
     that accepts exactly those elements.
 
+    The assignments are collected in a BDD, which is then converted to an irredundant sum-of-products
+    (see :func:`bdd2formula`).
+
     :param atoms: (Iterable[str]) The set of atoms.
     :param sat_assignments: (Iterable[powerset(atoms)]) A subset of powerset(atoms) representing
                             satisfiable assignments of the formula to be generated.
-    :return: (str) String representing PL formula that accepts exactly the satisfying assignments.
+    :return: (PL) PL formula that accepts exactly the satisfying assignments.
     """
-    # Generate all clauses
-    formula = []
+    atoms = list(atoms)
+    bdd = CompiledPL.BDD_MANAGER
+    bdd.declare(*atoms)
+
+    # Each assignment is a minterm: conjunction of atoms in assignment and negation of atoms not in assignment.
+    u = bdd.false
     for assignment in sat_assignments:
-        # Each clause includes an ANDing of atoms in assignment and ANDing of negation of atoms not in assignment
-        complete_acc = [p if p in assignment else f"!{p}" for p in atoms]
-        formula.append(f"({' & '.join(complete_acc)})")
+        assignment = set(assignment)
+        u = u | bdd.cube({p: p in assignment for p in atoms})
 
-    # Construct DNF formula by joining all clauses using disjunction
-    formula = " | ".join(formula)
-    formula = PL(f_str=formula, atoms=atoms).simplify()
+    return PL(f_str=bdd2formula(u), atoms=atoms)
 
-    # Simplify the formula
-    return PL(f_str=formula, atoms=atoms)
+
+def bdd2formula(u):
+    """
+    Converts a BDD into an irredundant sum-of-products formula using Minato-Morreale algorithm.
+
+    :param u: (dd.autoref.Function) BDD in manager `CompiledPL.BDD_MANAGER`.
+    :return: (str) PL formula in spot syntax.
+    """
+    bdd = CompiledPL.BDD_MANAGER
+    if u == bdd.false:
+        return "false"
+
+    cover = _isop(bdd, u, u, dict())[0]
+    if any(len(cube) == 0 for cube in cover):
+        return "true"
+
+    cubes = []
+    for cube in cover:
+        literals = [p if cube[p] else f"!{p}" for p in sorted(cube, key=bdd.level_of_var)]
+        cubes.append(literals[0] if len(literals) == 1 else f"({' & '.join(literals)})")
+    return " | ".join(cubes)
+
+
+def _isop(bdd, lower, upper, cache):
+    """
+    Minato-Morreale algorithm. Computes an irredundant cover `f` such that lower <= f <= upper.
+
+    :return: (tuple) List of cubes (dict[str, bool]) and the BDD of their disjunction.
+    """
+    if lower == bdd.false:
+        return [], bdd.false
+    if upper == bdd.true:
+        return [dict()], bdd.true
+    if (lower, upper) in cache:
+        return cache[lower, upper]
+
+    # Top variable and cofactors
+    var = bdd.var_at_level(min(lower.level, upper.level))
+    lower0, lower1 = bdd.let({var: False}, lower), bdd.let({var: True}, lower)
+    upper0, upper1 = bdd.let({var: False}, upper), bdd.let({var: True}, upper)
+
+    # Cubes that must contain !var (resp. var), and cubes that do not contain var.
+    cover0, f0 = _isop(bdd, lower0 & ~upper1, upper0, cache)
+    cover1, f1 = _isop(bdd, lower1 & ~upper0, upper1, cache)
+    cover_d, fd = _isop(bdd, (lower0 & ~f0) | (lower1 & ~f1), upper0 & upper1, cache)
+
+    cover = [{**cube, var: False} for cube in cover0] + [{**cube, var: True} for cube in cover1] + cover_d
+    f = (~bdd.var(var) & f0) | (bdd.var(var) & f1) | fd
+    cache[lower, upper] = cover, f
+    return cover, f
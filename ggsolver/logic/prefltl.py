@@ -1,9 +1,10 @@
 import itertools
+import numpy as np
 from ggsolver.graph import *
 from ggsolver.logic.formula import BaseFormula, PARSERS_DIR
 from ggsolver.logic.ltl import LTL, ScLTL
 from ggsolver.logic.base import Automaton, ParsingError
-from ggsolver.logic.automata import DFA
+from ggsolver.logic.automata import DFA, letter_table
 from lark import Lark, Transformer
 from pathlib import Path
 
@@ -78,8 +79,14 @@ class PrefScLTL(PrefLTL):
     # ==================================================================
     # IMPLEMENTATION OF ABSTRACT METHODS
     # ==================================================================
-    def translate(self):
-        return DFPA(outcomes=self.outcomes(), pref_model=self._repr)
+    def translate(self, pointed=False):
+        """
+        Translates the formula to a DFPA.
+
+        :param pointed: (bool) If True, the states of DFPA are the product states reachable from initial state.
+        :return: (DFPA) Deterministic finite-state preference automaton.
+        """
+        return DFPA(outcomes=self.outcomes(), pref_model=self._repr, pointed=pointed)
 
 
 class LTLPrefParser:
@@ -192,16 +199,48 @@ class PrefModel:
     # PREFERENCE DETERMINATION
     # ============================================================================
     def is_weakly_preferred(self, idx1, idx2):
-        return (idx1, idx2) in self._relation
+        return bool(self._weak[idx1] >> idx2 & 1)
 
     def is_strictly_preferred(self, idx1, idx2):
-        return (idx1, idx2) in self._relation and (idx2, idx1) not in self._relation
+        return bool(self._worse[idx1] >> idx2 & 1)
 
     def is_indifferent(self, idx1, idx2):
-        return (idx1, idx2) in self._relation and (idx2, idx1) in self._relation
+        return bool(self._weak[idx1] >> idx2 & 1) and bool(self._weak[idx2] >> idx1 & 1)
 
     def is_incomparable(self, idx1, idx2):
-        return (idx1, idx2) not in self._relation and (idx2, idx1) not in self._relation
+        return not (self._weak[idx1] >> idx2 & 1) and not (self._weak[idx2] >> idx1 & 1)
+
+    def worse_than(self, idx):
+        """
+        Returns the bitset of outcomes that are strictly less preferred than the outcome at given index.
+        The i-th bit of the bitset is set if the outcome at index i is strictly less preferred.
+        """
+        return self._worse[idx]
+
+    def better_than(self, idx):
+        """
+        Returns the bitset of outcomes that are strictly preferred to the outcome at given index.
+        The i-th bit of the bitset is set if the outcome at index i is strictly preferred.
+        """
+        return self._better[idx]
+
+    def maximal(self, outcomes):
+        """
+        Returns the maximal elements of a set of outcomes given as a bitset,
+        i.e., the outcomes in the set that are not strictly less preferred than another outcome in the set.
+
+        :param outcomes: (int) Bitset of outcomes, whose i-th bit is set if the outcome at index i is in the set.
+        :return: (int) Bitset of maximal outcomes.
+        """
+        maximal = outcomes
+        idx = 0
+        remaining = outcomes
+        while remaining:
+            if remaining & 1 and self._better[idx] & outcomes:
+                maximal &= ~(1 << idx)
+            remaining >>= 1
+            idx += 1
+        return maximal
 
     # ============================================================================
     # PROPERTIES AND HELPER FUNCTIONS
@@ -234,20 +273,44 @@ class PrefModel:
             self._relation.add((outcome_idx, 0))
 
     def transitive_closure(self):
-        model = set(self._relation)
-        while True:
-            new_relations = set((x, w) for x, y in model for z, w in model if z == y)
-            # print(f"new_relations={[str(x), str(y) for x, y in new_relations]}")
-            # print(f"{new_relations=}")
-            closure_until_now = model | new_relations
-            if closure_until_now == model:
-                break
-            model = closure_until_now
-        self._relation |= model
+        """
+        Closes the relation under transitivity using Warshall's algorithm on bitset rows.
+        The i-th row of relation is a bitset whose j-th bit is set if (i, j) is in relation.
+        """
+        rows = self._relation2rows()
+        for k in range(len(rows)):
+            bit_k = 1 << k
+            row_k = rows[k]
+            for i in range(len(rows)):
+                if rows[i] & bit_k:
+                    rows[i] |= row_k
+
+        self._relation = {(i, j) for i, row in enumerate(rows) for j in range(len(rows)) if row >> j & 1}
+        self._update_bitsets()
 
     def make_reflexive(self):
         for i in range(len(self._outcomes)):
             self._relation.add((i, i))
+        self._update_bitsets()
+
+    def _relation2rows(self):
+        rows = [0] * len(self._outcomes)
+        for i, j in self._relation:
+            rows[i] |= 1 << j
+        return rows
+
+    def _update_bitsets(self):
+        """
+        Caches the relation as bitset rows: weakly preferred (`_weak`), strictly less preferred (`_worse`) and
+        strictly preferred (`_better`) outcomes of every outcome.
+        """
+        n = len(self._outcomes)
+        self._weak = self._relation2rows()
+        cols = [0] * n
+        for i, j in self._relation:
+            cols[j] |= 1 << i
+        self._worse = [self._weak[i] & ~cols[i] for i in range(n)]
+        self._better = [cols[i] & ~self._weak[i] for i in range(n)]
 
 
 class Formula2Model(Transformer):
@@ -324,22 +387,26 @@ class DFPA(Automaton):
     pref_graph: (V, E)
         - node: (f0, f1, ..., fn), where fi is True if i-th component of all states in node is the final state.
         - edge: based on preference relation.
+
+    When `pointed` is True, the states of DFPA (and the partitions of preference graph) are restricted to the
+    product states reachable from the initial state. Reachable states are explored on the transition tables of
+    component DFAs (see :func:`ggsolver.logic.automata.letter_table`), which requires at most 16 atoms.
     """
-    def __init__(self, outcomes, pref_model):
+    def __init__(self, outcomes, pref_model, pointed=False):
         super(DFPA, self).__init__(acc_cond=Automaton.ACC_PREF_MP)
         self._outcomes = outcomes
         self._pref_model = pref_model
+        self._pointed = pointed
         self._pref_graph = None
         self._automata = []
+        self._reachable = None
 
         # We will not generate automaton for alpha0 because any state that doesn't satisfy
         #   any outcomes alpha_1 ... alpha_n satisfies alpha_0, by construction.
-        atoms = reduce(set.union, [set(out.atoms()) for out in self._outcomes[1:]])
-        for i in range(1, len(self._outcomes)):
-            # FIXME. Check if LTL formula is a guarantee formula. If yes, translate as ScLTL.
-            dfa = DFA(atoms=atoms)
-            dfa.from_automaton(aut=self._outcomes[i].translate())
-            self._automata.append(dfa)
+        self._automata = self._translate_outcomes(self._outcomes[1:])
+
+        # Precompute accepting states of component DFAs.
+        self._compile_acceptance()
 
         # Construct preference graph and cache it.
         self._pref_graph = self._construct_pref_graph()
@@ -348,6 +415,8 @@ class DFPA(Automaton):
     # IMPLEMENTATION OF ABSTRACT METHODS
     # =========================================================================
     def states(self):
+        if self._pointed:
+            return self.reachable_states()
         return list(itertools.product(*[aut.states() for aut in self._automata]))
 
     def atoms(self):
@@ -374,19 +443,43 @@ class DFPA(Automaton):
         (recall 0-th outcomes is not counted). The second statement constructs the binary tuple
         representation of the maximal set.
         """
-        # Get the set of maximal outcomes satisfied by any word visiting the given state.
-        outcomes = self.maximal(state)
-
-        # Vectorize the set of outcomes
-        outcomes_vec = self.outcomes_to_vector(outcomes)
-
-        # Construct a number representing the vector.
-        satisfied_outcomes = "".join([str(val) for val in outcomes_vec])
-        return int(f"0b{satisfied_outcomes}", base=2)
+        # Acceptance set of maximal outcomes satisfied by any word visiting the given state.
+        return self._acceptance(self._outcomes_mask(state))[1]
 
     # =========================================================================
     # SPECIAL METHODS
     # =========================================================================
+    def reachable_states(self):
+        """
+        Returns the product states reachable from the initial state (in the order of :meth:`DFPA.states`
+        for unpointed DFPA). The states are computed on first call and cached.
+        """
+        indices = self._reachable_indices()
+        return [tuple(self._component_states[i][idx] for i, idx in enumerate(row)) for row in indices.tolist()]
+
+    def add_outcomes(self, pref_model):
+        """
+        Updates the DFPA to a preference model that extends the current one with new outcomes.
+        The component DFAs of outcomes already in DFPA are reused; only the new outcomes are translated.
+
+        :param pref_model: (PrefModel) The new preference model. Its outcomes (except the 0-th outcome)
+            should include the current outcomes, which are identified by their formula strings.
+        """
+        existing = {str(out): aut for out, aut in zip(self._outcomes[1:], self._automata)}
+        outcomes = pref_model.outcomes()
+        self._outcomes = outcomes
+        self._pref_model = pref_model
+
+        new_outcomes = [out for out in outcomes[1:] if str(out) not in existing]
+        translated = dict(zip(map(str, new_outcomes), self._translate_outcomes(new_outcomes)))
+        self._automata = [existing[str(out)] if str(out) in existing else translated[str(out)]
+                          for out in outcomes[1:]]
+
+        # Clear caches and reconstruct preference graph.
+        self._compile_acceptance()
+        self._reachable = None
+        self._pref_graph = self._construct_pref_graph()
+
     def pref_graph(self, force_reconstruct=False):
         if force_reconstruct:
             self._pref_graph = self._construct_pref_graph()
@@ -395,15 +488,23 @@ class DFPA(Automaton):
     def _construct_pref_graph(self):
         pref_graph = Graph()
 
-        # Construct set of unique maximal elements.
-        #   Use tuple of sorted lists to avoid duplicates. Lists needed to avoid unhashable error.
+        # Group states by their acceptance sets (unique maximal elements).
+        #   Outcome masks of all states are computed at once. States are in order of `self.states()`.
+        states = self.states()
+        if self._pointed:
+            indices = self._reachable_indices()
+        else:
+            shape = tuple(len(q) for q in self._component_states)
+            indices = np.indices(shape).reshape(len(shape), -1).T
+        masks, inverse = np.unique(self._outcome_masks(indices), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(masks)))[:-1]
+
         nodes = dict()
-        for q in self.states():
-            node_q = self.final(q)
-            if node_q in nodes:
-                nodes[node_q].add(q)
-            else:
-                nodes[node_q] = {q}
+        for mask, group in zip(masks.tolist(), np.split(order, bounds)):
+            acc_set = self._acceptance(mask)[1]
+            nodes.setdefault(acc_set, set()).update(states[idx] for idx in group.tolist())
         node_ids = pref_graph.add_nodes(len(nodes))
 
         np_state = pref_graph["state"] = NodePropertyMap(pref_graph)
@@ -414,29 +515,14 @@ class DFPA(Automaton):
             partition[i] = nodes[np_state[i]]
 
         # Add edges by comparing maximal sets.
+        #   Edge (node_j, node_i) is added if some outcome in maximal set of node_i is strictly preferred to
+        #   some outcome in maximal set of node_j, and no outcome in maximal set of node_j is strictly preferred
+        #   to any outcome in maximal set of node_i.
+        masks = [self._acc2mask(np_state[uid]) for uid in node_ids]
+        worse = [self._union(self._pref_model.worse_than, mask) for mask in masks]
+        better = [self._union(self._pref_model.better_than, mask) for mask in masks]
         for node_i, node_j in itertools.product(node_ids, node_ids):
-            # Initialize condition variables
-            cond1 = False
-            cond2 = True
-
-            # Get indices of maximal outcomes satisfied by states in node_i, node_j
-            vec_i = format(np_state[node_i], f"#0{len(self._outcomes) + 2}b")
-            vec_i = [idx - 2 for idx, value in enumerate(vec_i) if value == "1"]
-
-            vec_j = format(np_state[node_j], f"#0{len(self._outcomes) + 2}b")
-            vec_j = [idx - 2 for idx, value in enumerate(vec_j) if value == "1"]
-            # maximal_j = [idx for idx, value in enumerate(np_state[node_j]) if value == 1]
-            # maximal_i = [idx for idx, value in enumerate(np_state[node_i]) if value == 1]
-            for alpha_i, alpha_j in itertools.product(vec_i, vec_j):
-                # Condition 1
-                if self._pref_model.is_strictly_preferred(alpha_i, alpha_j):
-                    cond1 = True
-
-                # Condition 2
-                if self._pref_model.is_strictly_preferred(alpha_j, alpha_i):
-                    cond2 = False
-
-            if cond1 and cond2:
+            if worse[node_i] & masks[node_j] and not better[node_i] & masks[node_j]:
                 pref_graph.add_edge(node_j, node_i)
 
         return pref_graph
@@ -445,28 +531,127 @@ class DFPA(Automaton):
         """
         Returns the set of outcomes satisfied by any word visiting the given state.
         """
-        out = set()
-        for i in range(len(state)):
-            if 0 in self._automata[i].final(state[i]):
-                out.add(i+1)
+        mask = self._outcomes_mask(state)
+        return {self._pref_model.outcomes()[i] for i in range(len(self._outcomes)) if mask >> i & 1}
+
+    def maximal(self, state):
+        maximal = self._acceptance(self._outcomes_mask(state))[0]
+        return {self._pref_model.outcomes()[i] for i in range(len(self._outcomes)) if maximal >> i & 1}
 
-        if len(out) == 0:
-            out.add(0)
+    def _translate_outcomes(self, outcomes):
+        """ Translates every outcome to a DFA. """
+        automata = []
+        atoms = reduce(set.union, [set(out.atoms()) for out in self._outcomes[1:]], set())
+        for outcome in outcomes:
+            # FIXME. Check if LTL formula is a guarantee formula. If yes, translate as ScLTL.
+            dfa = DFA(atoms=atoms)
+            dfa.from_automaton(aut=outcome.translate())
+            automata.append(dfa)
+        return automata
 
-        return {self._pref_model.outcomes()[i] for i in out}
+    def _reachable_indices(self):
+        """
+        Explores the product states reachable from the initial state. Transitions of component DFAs are tabulated
+        over the common atoms, and the frontier is expanded on all inputs at once.
 
-    def maximal(self, state):
-        outcomes = self.outcomes(state)
-        remove = set()
-        for outcome_1 in outcomes:
-            for outcome_2 in outcomes - {outcome_1}:
-                idx1 = self._pref_model.outcome2index(outcome_1)
-                idx2 = self._pref_model.outcome2index(outcome_2)
-                if self._pref_model.is_strictly_preferred(idx2, idx1):
-                    remove.add(outcome_1)
-                    break
-
-        return outcomes - remove
+        :return: (numpy array) Array of shape (N, k) whose rows are reachable states given by indices of
+            component states, sorted lexicographically.
+        """
+        if self._reachable is not None:
+            return self._reachable
+
+        atoms = sorted(self.atoms())
+        masks = np.arange(2 ** len(atoms))
+        tables = []
+        for aut in self._automata:
+            _, aut_atoms, table = letter_table(aut)
+            # Map inputs over common atoms to inputs over atoms of component.
+            aut_masks = np.zeros(len(masks), dtype=np.int64)
+            for j, p in enumerate(aut_atoms):
+                if p in atoms:
+                    aut_masks |= ((masks >> atoms.index(p)) & 1) << j
+            tables.append(table[:, aut_masks])
+
+        shape = tuple(len(q) for q in self._component_states)
+        init = np.array([[self._component_index[i][q0] for i, q0 in enumerate(self.init_state())]], dtype=np.int64)
+        visited = np.ravel_multi_index(init.T, shape)
+        frontier = init
+        while len(frontier) > 0:
+            successors = np.stack([table[frontier[:, i]].reshape(-1) for i, table in enumerate(tables)], axis=1)
+            successors = successors[np.all(successors >= 0, axis=1)]
+            codes = np.setdiff1d(np.ravel_multi_index(successors.T, shape), visited)
+            visited = np.union1d(visited, codes)
+            frontier = np.stack(np.unravel_index(codes, shape), axis=1).reshape(-1, len(shape))
+
+        self._reachable = np.stack(np.unravel_index(visited, shape), axis=1).reshape(-1, len(shape))
+        return self._reachable
+
+    def _compile_acceptance(self):
+        """
+        Precomputes the states, state indices and a boolean array of accepting states of every component DFA.
+        Acceptance sets are cached by outcome masks (see :meth:`DFPA._acceptance`).
+        """
+        self._component_states = [list(aut.states()) for aut in self._automata]
+        self._component_index = [{q: idx for idx, q in enumerate(states)} for states in self._component_states]
+        self._accepting = [np.array([0 in aut.final(q) for q in states], dtype=bool)
+                           for aut, states in zip(self._automata, self._component_states)]
+        self._acc_cache = dict()
+
+    def _outcomes_mask(self, state):
+        """ Bitset of outcomes satisfied by any word visiting the given state (0-th outcome if none). """
+        mask = 0
+        for i in range(len(state)):
+            if self._accepting[i][self._component_index[i][state[i]]]:
+                mask |= 1 << (i + 1)
+        return mask if mask else 1
+
+    def _outcome_masks(self, indices):
+        """
+        Vectorized :meth:`DFPA._outcomes_mask`.
+
+        :param indices: (numpy array) Array of shape (N, k), whose rows are states given by indices of
+            component states.
+        :return: (numpy array) Outcome masks of the N states.
+        """
+        dtype = np.int64 if len(self._outcomes) < 63 else object
+        masks = np.zeros(len(indices), dtype=dtype)
+        for i, accepting in enumerate(self._accepting):
+            masks |= accepting[indices[:, i]].astype(dtype) << (i + 1)
+        masks[masks == 0] = 1
+        return masks
+
+    def _acceptance(self, mask):
+        """
+        Returns the bitset of maximal outcomes and the acceptance set for the given outcome mask.
+        Results are cached.
+        """
+        if mask not in self._acc_cache:
+            maximal = self._pref_model.maximal(mask)
+            # The acceptance set reads the bitset in reverse: 0-th outcome is the most significant bit.
+            self._acc_cache[mask] = (maximal, self._mask2acc(maximal))
+        return self._acc_cache[mask]
+
+    def _mask2acc(self, mask):
+        """ Converts a bitset of outcomes to acceptance set, in which 0-th outcome is the most significant bit. """
+        n = len(self._outcomes)
+        return sum(1 << (n - 1 - i) for i in range(n) if mask >> i & 1)
+
+    def _acc2mask(self, acc_set):
+        """ Converts an acceptance set to bitset of outcomes (inverse of `_mask2acc`). """
+        n = len(self._outcomes)
+        return sum(1 << i for i in range(n) if acc_set >> (n - 1 - i) & 1)
+
+    @staticmethod
+    def _union(rows, mask):
+        """ Union of bitset rows of the outcomes in mask. """
+        union = 0
+        idx = 0
+        while mask:
+            if mask & 1:
+                union |= rows(idx)
+            mask >>= 1
+            idx += 1
+        return union
 
     def outcomes_to_vector(self, outcomes):
         """
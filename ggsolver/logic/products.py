@@ -1,6 +1,9 @@
 import itertools
+import numpy as np
 import ggsolver.logic.automata as automata
 from functools import reduce
+from ggsolver.graph import Graph, GraphIndex, NodePropertyMap, EdgePropertyMap, _gather
+from ggsolver.logic.base import compile_pl
 
 
 class DFACrossProduct(automata.DFA):
@@ -10,7 +13,39 @@ class DFACrossProduct(automata.DFA):
         assert len(self.automata) > 0, "There should be at least one DFA to compute product!"
 
     def states(self):
-        return list(itertools.product(*[dfa.states() for dfa in self.automata]))
+        """
+        Returns the product states reachable from the initial state.
+
+        The transition function of every component is tabulated once over sigma (see
+        :func:`ggsolver.logic.automata.letter_table`) and the product states are explored from the initial state.
+        """
+        atoms = self.atoms()
+        masks = np.arange(2 ** len(atoms), dtype=np.int64)
+        comp_states, comp_tables = [], []
+        for dfa in self.automata:
+            states, dfa_atoms, table = automata.letter_table(dfa)
+            # Component input mask of every product input mask
+            sub = np.zeros(len(masks), dtype=np.int64)
+            for i, p in enumerate(dfa_atoms):
+                sub |= ((masks >> atoms.index(p)) & 1) << i
+            comp_states.append(states)
+            comp_tables.append(table[:, sub])
+
+        init = tuple(states.index(q) for states, q in zip(comp_states, self.init_state()))
+        visited = {init}
+        order = [init]
+        queue = [init]
+        while len(queue) > 0:
+            idx = queue.pop()
+            succ = np.stack([table[i] for table, i in zip(comp_tables, idx)], axis=1)
+            succ = np.unique(succ[np.all(succ >= 0, axis=1)], axis=0)
+            for next_idx in map(tuple, succ.tolist()):
+                if next_idx not in visited:
+                    visited.add(next_idx)
+                    order.append(next_idx)
+                    queue.append(next_idx)
+
+        return [tuple(states[i] for states, i in zip(comp_states, idx)) for idx in order]
 
     def atoms(self):
         return list(reduce(set.union, [set(dfa.atoms()) for dfa in self.automata]))
@@ -27,7 +62,7 @@ class DFAIntersectionProduct(DFACrossProduct):
         """
         DFAs have single acceptance set. Hence, we assert acceptance set of final states to be 0.
         """
-        return all(dfa.final(state[0]) == 0 for dfa in self.automata)
+        return [0] if all(0 in dfa.final(q) for dfa, q in zip(self.automata, state)) else [-1]
 
 
 class DFAUnionProduct(DFACrossProduct):
@@ -35,4 +70,278 @@ class DFAUnionProduct(DFACrossProduct):
         """
         DFAs have single acceptance set. Hence, we assert acceptance set of final states to be 0.
         """
-        return any(dfa.final(state[0]) == 0 for dfa in self.automata)
\ No newline at end of file
+        return [0] if any(0 in dfa.final(q) for dfa, q in zip(self.automata, state)) else [-1]
+
+
+def product_with_dfa(game_graph, aut, label_prop="label"):
+    """
+    Constructs the product of a game graph with a deterministic automaton. Only the product states reachable from
+    the initial state of the game are constructed.
+
+    The product transition function is defined as `delta((s, q), a) = (t, aut.delta(q, L(t)))`, where
+    `t = game.delta(s, a)`, and the initial state is `(s0, aut.delta(q0, L(s0)))`. If the game graph has no
+    initial state, every game state `s` paired with `aut.delta(q0, L(s))` is an initial state.
+
+    The product is computed on arrays. Game labels are grouped into letters, the automaton transitions are
+    tabulated once for every (automaton state, letter) pair (using :meth:`SpotAutomaton.transition_table` when
+    available), and the reachable product states are explored layer by layer.
+
+    The returned graph has node properties "state" (pair of game state and automaton state), "turn" and "final"
+    (`True` if the automaton state is accepting) and graph property "init_state". The other node properties
+    (e.g., "label"), edge properties (e.g., "input", "prob") and graph properties (e.g., "actions") of the game
+    graph are copied from the corresponding game nodes, edges and graph.
+
+    :param game_graph: (Graph or SubGraph instance) Game graph with node properties "state", "turn" and `label_prop`.
+    :param aut: (Automaton instance) A deterministic automaton (e.g., :class:`ggsolver.logic.automata.DFA`).
+    :param label_prop: (str) Name of node property that maps game states to the list of atoms true in them.
+    :return: (Graph) Product game graph.
+    """
+    nodes = GraphIndex.of(game_graph).nodes
+    letter, letters = _group_letters(nodes, game_graph[label_prop])
+
+    # Automaton letter table: table[q, letter] is the index of successor state (-1 if undefined).
+    aut_states = list(aut.states())
+    table = _automaton_table(aut, aut_states, letters)
+    q0 = aut_states.index(aut.init_state())
+
+    # Construct product graph
+    graph, uids, qids, init_uid = _product_graph(game_graph, nodes, letter, table, q0)
+    np_state = game_graph["state"]
+    is_final = np.array([_is_accepting(aut.final(q)) for q in aut_states], dtype=bool)
+    _set_product_properties(
+        graph,
+        states=((np_state[u], aut_states[q]) for u, q in zip(uids.tolist(), qids.tolist())),
+        turn=(game_graph["turn"][u] for u in uids.tolist()),
+        final=is_final[qids].tolist(),
+        init_uid=init_uid
+    )
+    return graph
+
+
+def product(game_graph, aut_graph, label_prop="label"):
+    """
+    Constructs the product of a game graph with the graph of a deterministic automaton
+    (e.g., obtained by graphifying a :class:`ggsolver.logic.automata.DFA`, or loaded from a file).
+    Only the product states reachable from the initial state of the game are constructed.
+
+    The product is defined as in :func:`product_with_dfa`. The automaton is given by its graph, whose edge property
+    "input" labels every edge with a PL formula. The formulas are evaluated once for every letter
+    (a distinct label value in the game graph), which yields a table of automaton successors per letter.
+    Hence, neither the `delta` function of the game nor that of the automaton is called.
+
+    The returned graph has node properties "state" (pair of node ids in game graph and automaton graph),
+    "turn" and "final" (`True` if the automaton node is accepting) and graph property "init_state". The other
+    node, edge and graph properties of the game graph are copied as in :func:`product_with_dfa`.
+
+    :param game_graph: (Graph or SubGraph instance) Game graph with node properties "state", "turn" and `label_prop`.
+    :param aut_graph: (Graph or SubGraph instance) Graph of a deterministic automaton with node properties
+        "state" and "final", edge property "input" and graph property "init_state".
+    :param label_prop: (str) Name of node property that maps game states to the list of atoms true in them.
+    :return: (Graph) Product game graph.
+    """
+    nodes = GraphIndex.of(game_graph).nodes
+    letter, letters = _group_letters(nodes, game_graph[label_prop])
+
+    # Automaton letter table from the guards of automaton edges.
+    aut_nodes = sorted(aut_graph.nodes())
+    aut_index = {qid: idx for idx, qid in enumerate(aut_nodes)}
+    table = np.full((len(aut_nodes), len(letters)), -1, dtype=np.int64)
+    atoms = tuple(sorted(set(itertools.chain.from_iterable(letters))))
+    masks = np.array([sum(1 << atoms.index(p) for p in inp) for inp in letters], dtype=np.int64)
+    ep_input = aut_graph["input"]
+    for qid, pid, key in aut_graph.edges():
+        guard = compile_pl(str(ep_input[qid, pid, key]), atoms)
+        truth_table = guard.truth_table()
+        enabled = truth_table[masks] if truth_table is not None else np.array([guard(m) for m in masks.tolist()],
+                                                                               dtype=bool)
+        row = table[aut_index[qid]]
+        if np.any(row[enabled] >= 0):
+            raise ValueError(f"Automaton graph is non-deterministic at node {qid}.")
+        row[enabled] = aut_index[pid]
+
+    np_aut_state = aut_graph["state"]
+    init_state = aut_graph["init_state"]
+    q0 = next(idx for idx, qid in enumerate(aut_nodes) if np_aut_state[qid] == init_state)
+
+    # Construct product graph
+    graph, uids, qids, init_uid = _product_graph(game_graph, nodes, letter, table, q0)
+    aut_nodes = np.array(aut_nodes, dtype=np.int64)
+    is_final = np.array([_is_accepting(aut_graph["final"][qid]) for qid in aut_nodes.tolist()], dtype=bool)
+    _set_product_properties(
+        graph,
+        states=zip(uids.tolist(), aut_nodes[qids].tolist()),
+        turn=(game_graph["turn"][u] for u in uids.tolist()),
+        final=is_final[qids].tolist(),
+        init_uid=init_uid
+    )
+    return graph
+
+
+# ==========================================================================
+# HELPER FUNCTIONS
+# ==========================================================================
+def _group_letters(nodes, np_label):
+    """
+    Groups the labels of nodes into letters.
+
+    :return: (tuple) An array mapping node id to its letter index and the list of letters (sorted tuples of atoms).
+    """
+    letter2id = dict()
+    letter = np.full(int(nodes.max()) + 1 if len(nodes) > 0 else 0, -1, dtype=np.int64)
+    for uid in nodes.tolist():
+        label = np_label[uid]
+        key = tuple(sorted(set(label))) if label is not None else tuple()
+        letter[uid] = letter2id.setdefault(key, len(letter2id))
+    return letter, list(letter2id.keys())
+
+
+def _automaton_table(aut, aut_states, letters):
+    """
+    Tabulates the transition function of a deterministic automaton over the given letters.
+
+    :return: (numpy array) Array of shape (|Q|, |letters|) whose entry [q, a] is the index (in `aut_states`)
+        of the successor of q-th state on a-th letter, or -1 if the transition is undefined.
+    """
+    # Precompiled table (SpotAutomaton) is indexed by state numbers and input bitmasks.
+    transition_table = getattr(aut, "transition_table", None)
+    table = transition_table() if transition_table is not None else None
+    if table is not None and aut_states == list(range(table.shape[0])):
+        masks = np.array([aut.atoms2mask(a) for a in letters], dtype=np.int64)
+        return table[:, masks].astype(np.int64)
+
+    state2idx = {q: idx for idx, q in enumerate(aut_states)}
+    table = np.full((len(aut_states), len(letters)), -1, dtype=np.int64)
+    for idx, q in enumerate(aut_states):
+        for a, inp in enumerate(letters):
+            next_q = aut.delta(q, list(inp))
+            if next_q is not None:
+                table[idx, a] = state2idx[next_q]
+    return table
+
+
+def _init_nodes(graph, nodes):
+    """ Node ids of the initial state of graph. All nodes, if the graph has no initial state. """
+    init_state = graph["init_state"] if graph.has_property("init_state") else None
+    if init_state is None:
+        return nodes
+    np_state = graph["state"]
+    return np.array([uid for uid in nodes.tolist() if np_state[uid] == init_state], dtype=np.int64)
+
+
+def _is_accepting(acc_set):
+    """ Whether a state with the given acceptance set(s) is accepting (in acceptance set 0). """
+    if isinstance(acc_set, (list, tuple, set)):
+        return 0 in acc_set
+    return acc_set == 0
+
+
+def _reachable_pairs(index, letter, table, init_pairs):
+    """
+    Explores the product states reachable from the initial product states.
+    A product state (u, q) is encoded as the integer `u * |Q| + q`.
+
+    :param index: (GraphIndex) Index of game graph.
+    :param letter: (numpy array) Array mapping game node to its letter index.
+    :param table: (numpy array) Automaton letter table (see :func:`_automaton_table`).
+    :param init_pairs: (numpy array) Encoded initial product states.
+    :return: (tuple of numpy arrays) Sorted encoded product states; and the source product state index,
+        target product state index and game edge id of every product edge.
+    """
+    num_q = table.shape[0]
+    succ_ptr, succ_eid, dst = index.succ_ptr, index.succ_eid, index.dst
+
+    visited = np.unique(init_pairs)
+    frontier = visited
+    e_src, e_dst, e_eid = [], [], []
+    while frontier.size > 0:
+        # Game edges leaving the frontier
+        uids, qids = np.divmod(frontier, num_q)
+        lengths = succ_ptr[uids + 1] - succ_ptr[uids]
+        eids = _gather(succ_ptr, succ_eid, uids)
+        if eids.size == 0:
+            break
+        sources = np.repeat(frontier, lengths)
+
+        # Automaton moves on the label of target game node
+        vids = dst[eids]
+        next_q = table[np.repeat(qids, lengths), letter[vids]]
+        defined = next_q >= 0
+        targets = vids[defined] * num_q + next_q[defined]
+        e_src.append(sources[defined])
+        e_dst.append(targets)
+        e_eid.append(eids[defined])
+
+        frontier = np.setdiff1d(targets, visited, assume_unique=False)
+        visited = np.union1d(visited, frontier)
+
+    p_src = np.concatenate(e_src) if len(e_src) > 0 else np.zeros(0, dtype=np.int64)
+    p_dst = np.concatenate(e_dst) if len(e_dst) > 0 else np.zeros(0, dtype=np.int64)
+    p_eid = np.concatenate(e_eid) if len(e_eid) > 0 else np.zeros(0, dtype=np.int64)
+    return visited, np.searchsorted(visited, p_src), np.searchsorted(visited, p_dst), p_eid
+
+
+def _product_graph(game_graph, nodes, letter, table, q0):
+    """
+    Explores the reachable product states and constructs the product graph with one node per product state.
+    Copies the node properties (except "state", "turn" and "final") of the game node, the edge properties of the
+    game edge and the graph properties (except "init_state") of the game graph to the product graph.
+
+    :return: (tuple) The product graph; arrays mapping product node to game node and to automaton state index;
+        the product node of the initial state (None, if the game graph has no initial state).
+    """
+    num_q = table.shape[0]
+
+    # Initial product states
+    init = _init_nodes(game_graph, nodes)
+    init_q = table[q0, letter[init]]
+    init_pairs = np.unique(init[init_q >= 0] * num_q + init_q[init_q >= 0])
+
+    # Explore reachable product states
+    index = GraphIndex.of(game_graph)
+    edges = index.edges
+    pairs, p_src, p_dst, p_eid = _reachable_pairs(index, letter, table, init_pairs)
+    uids, qids = np.divmod(pairs, num_q)
+
+    graph = Graph()
+    graph.add_nodes(len(pairs))
+    keys = graph.add_edges(zip(p_src.tolist(), p_dst.tolist()))
+
+    # Copy properties of game nodes, edges and graph.
+    game_uids = uids.tolist()
+    for p_name, np_game in game_graph.node_properties.items():
+        if p_name in ("state", "turn", "final"):
+            continue
+        np_prop = NodePropertyMap(graph, default=np_game.default)
+        np_prop.update((uid, value) for uid, value in enumerate(np_game[u] for u in game_uids)
+                       if value != np_game.default)
+        graph[p_name] = np_prop
+
+    p_edges = list(zip(p_src.tolist(), p_dst.tolist(), keys))
+    game_edges = [edges[e] for e in p_eid.tolist()]
+    for p_name, ep_game in game_graph.edge_properties.items():
+        ep_prop = EdgePropertyMap(graph, default=ep_game.default)
+        ep_prop.update((edge, value) for edge, value in zip(p_edges, (ep_game[e] for e in game_edges))
+                       if value != ep_game.default)
+        graph[p_name] = ep_prop
+
+    for p_name, value in game_graph.graph_properties.items():
+        if p_name != "init_state":
+            graph[p_name] = value
+
+    init_uid = int(np.searchsorted(pairs, init_pairs[0])) if len(init_pairs) == 1 else None
+    return graph, uids, qids, init_uid
+
+
+def _set_product_properties(graph, states, turn, final, init_uid):
+    """ Sets node properties "state", "turn", "final" and graph property "init_state" of the product graph. """
+    np_state = NodePropertyMap(graph)
+    np_turn = NodePropertyMap(graph)
+    np_final = NodePropertyMap(graph)
+    node_ids = range(graph.number_of_nodes())
+    np_state.update(zip(node_ids, states))
+    np_turn.update(zip(node_ids, turn))
+    np_final.update(zip(node_ids, final))
+    graph["state"] = np_state
+    graph["turn"] = np_turn
+    graph["final"] = np_final
+    graph["init_state"] = np_state[init_uid] if init_uid is not None else None
@@ -2,7 +2,7 @@
 Example from Principles of Model Checking, Fig. 10.21.
 """
 from ggsolver.mdp.models import QualitativeMDP
-from ggsolver.mdp.reachability import ASWinReach, PWinReach
+from ggsolver.mdp.reach import ASWinReach, PWinReach
 
 
 if __name__ == '__main__':
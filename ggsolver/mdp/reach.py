@@ -1,7 +1,7 @@
 import random
+import numpy as np
 # from ggsolver.models import Solver
 import ggsolver.models as models
-from tqdm import tqdm
 
 
 class ASWinReach(models.Solver):
@@ -21,64 +21,31 @@ class ASWinReach(models.Solver):
 
     def solve(self):
         """
-        Alg. 45 from Principles of Model Checking.
-        Using the same variable names as Alg. 45.
+        Alg. 45 from Principles of Model Checking (see :func:`almost_sure_reach`).
+
+        A node is winning if a final node is reached from it with probability one. An action is winning at a winning
+        node if all its edges lead to winning nodes.
         """
-        # Initialize algorithm variables
-        graph = self._solution
-        b = self._final
-
-        # Make B absorbing
-        for uid in b:
-            for _, vid, key in graph.out_edges(uid):
-                graph.hide_edge(uid, vid, key)
-
-        # Compute the set of nodes disconnected from B
-        disconnected = self.disconnected(graph, b)
-        set_u = {s for s in graph.nodes() if s in disconnected}
-
-        while True:
-            set_r = set_u.copy()
-            while len(set_r) > 0:
-                u = set_r.pop()
-
-                for t, a in self.pre(graph, u):
-                    if t in set_u:
-                        continue
-                    self.remove_act(graph, t, a)
-                    if len(graph.successors(t)) == 0:
-                        set_r.add(t)
-                        set_u.add(t)
-                graph.hide_node(u)
-            disconnected = self.disconnected(graph, b)
-            set_u = {s for s in set(graph.nodes()) - set_u if s in disconnected}
-            if len(set_u) == 0:
-                break
-
-        # Process node, edge winners
-        for uid in tqdm(self._solution.nodes(), desc="Processing node, edge winners..."):
-            self._node_winner[uid] = 1 if self._solution.is_node_visible(uid) else 3
-            out_edges = self._solution.out_edges(uid)
-            winning_acts = {self._solution["input"][uid, vid, key]
-                            for _, vid, key in out_edges if self._solution.is_edge_visible(uid, vid, key)}
-            for _, vid, key in out_edges:
-                self._edge_winner[uid, vid, key] = 1 if self._solution["input"][uid, vid, key] in winning_acts else 3
-
-    @staticmethod
-    def disconnected(graph, sources):
-        reachable_nodes = graph.reverse_bfs(sources)
-        return set(graph.visible_nodes()) - reachable_nodes
-
-    def pre(self, graph, vid):
-        if graph.has_node(vid):
-            return {(uid, graph["input"][uid, vid, key]) for uid, _, key in graph.in_edges(vid)}
-        return set()
-
-    def remove_act(self, graph, uid, act):
-        for _, vid, key in graph.out_edges(uid):
-            if graph["input"][uid, vid, key] == act:
-                # print(f"\tHiding {uid}, {act}, edge:{uid, vid, key}")
-                graph.hide_edge(uid, vid, key)
+        # Reset the solver
+        self.reset()
+
+        index = self._graph_index
+        alive = index.mask(index.nodes)
+        target = index.mask(self._final) & alive
+        win = almost_sure_reach(index, alive, target)
+
+        # Action at a node is winning if none of its edges leaves the winning region.
+        #   Final nodes are absorbing: their edges have no winner.
+        _, _, edge_group = index.action_groups()
+        num_groups = int(edge_group.max(initial=-1)) + 1
+        group_win = np.bincount(edge_group, weights=~win[index.dst], minlength=num_groups) == 0
+        node_winner = np.where(win, 1, 3)
+        edge_winner = np.where(win[index.src] & group_win[edge_group], 1, 3)
+        edge_winner[target[index.src]] = -1
+        self._save_winners(node_winner, edge_winner)
+
+        # Mark the game as solved.
+        self._is_solved = True
 
 
 class PWinReach(models.Solver):
@@ -97,27 +64,84 @@ class PWinReach(models.Solver):
         self._strategy_graph = None
 
     def solve(self):
+        """
+        Computes the nodes from which a final node is reached with positive probability, i.e., the nodes from
+        which there exists a path to a final node. An action is winning at a node if some edge labeled by the action
+        leads to a winning node.
+
+        The backward search runs over the cached predecessor index of the graph (see
+        :class:`ggsolver.graph.GraphIndex`) with one array of nodes per layer.
+        """
         # Reset the solver
         self.reset()
 
-        # Get final states
-        final = self._final
-
-        with tqdm(total=self._solution.number_of_nodes()) as progress_bar:
-            # Identify the set of nodes from which a final state can be reached (i.e., there exists a path in graph)
-            progress_bar.set_description("Running reverse BFS...")
-            reachable_nodes = self._solution.reverse_bfs(final)
-
-            # Hide the nodes in MDP.
-            progress_bar.set_description("Marking node, edge winners...")
-            for uid in self._solution.nodes():
-                progress_bar.update(1)
-                self._node_winner[uid] = 1 if uid in reachable_nodes else 3
-                out_edges = self._solution.out_edges(uid)
-                winning_acts = {self._solution["input"][uid, vid, key]
-                                for _, vid, key in out_edges if vid not in reachable_nodes}
-                for _, vid, key in out_edges:
-                    self._edge_winner[uid, vid, key] = 1 if self._solution["input"][uid, vid, key] in winning_acts else 3
+        # Backward search from final nodes over the predecessor index.
+        index = self._graph_index
+        alive = index.mask(index.nodes)
+        win = positive_reach(index, alive, index.mask(self._final) & alive)
+
+        # Action at a node is winning if one of its edges leads to a winning node.
+        _, _, edge_group = index.action_groups()
+        group_win = np.bincount(edge_group, weights=win[index.dst], minlength=edge_group.max(initial=-1) + 1) > 0
+        node_winner = np.where(win, 1, 3)
+        edge_winner = np.where(group_win[edge_group], 1, 3)
+        self._save_winners(node_winner, edge_winner)
 
         # Mark the game as solved.
         self._is_solved = True
+
+
+def backward_reach(index, alive, target, enabled=None):
+    """
+    Computes the alive nodes from which the target is reachable using only alive nodes and enabled edges.
+
+    :param index: (GraphIndex) Index of the graph.
+    :param alive: (numpy array) Boolean mask of nodes in the sub-MDP.
+    :param target: (numpy array) Boolean mask of target nodes.
+    :param enabled: (numpy array) Boolean mask of enabled edges (indexed by edge id). [Default: None, all edges]
+    :return: (numpy array) Boolean mask of nodes.
+    """
+    reach = target & alive
+    frontier = np.flatnonzero(reach)
+    while frontier.size > 0:
+        eids = index.in_edges(frontier)
+        if enabled is not None:
+            eids = eids[enabled[eids]]
+        sources = np.unique(index.src[eids])
+        frontier = sources[alive[sources] & ~reach[sources]]
+        reach[frontier] = True
+    return reach
+
+
+def positive_reach(index, alive, target):
+    """
+    Computes the nodes from which the target is reached with positive probability within the sub-MDP of alive nodes.
+    Parameters are as in :func:`backward_reach`.
+    """
+    return backward_reach(index, alive, target)
+
+
+def almost_sure_reach(index, alive, target):
+    """
+    Computes the nodes from which the target is reached with probability one within the sub-MDP of alive nodes
+    (Alg. 45 from Principles of Model Checking). Nodes that cannot reach the target are removed together with the
+    actions that may lead to removed nodes, until every remaining node can reach the target.
+
+    :param index: (GraphIndex) Index of the graph with edge property "input".
+    :param alive: (numpy array) Boolean mask of nodes in the sub-MDP.
+    :param target: (numpy array) Boolean mask of target nodes.
+    :return: (numpy array) Boolean mask of nodes.
+    """
+    _, _, edge_group = index.action_groups()
+    alive = alive.copy()
+
+    # An action (group of edges) is enabled if none of its edges leaves the alive nodes.
+    num_groups = int(edge_group.max(initial=-1)) + 1
+    group_ok = np.bincount(edge_group, weights=~alive[index.dst], minlength=num_groups) == 0
+    while True:
+        reach = backward_reach(index, alive, target, enabled=group_ok[edge_group])
+        lost = np.flatnonzero(alive & ~reach)
+        if lost.size == 0:
+            return alive
+        alive[lost] = False
+        group_ok[edge_group[index.in_edges(lost)]] = False
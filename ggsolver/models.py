@@ -1,11 +1,13 @@
 import inspect
 import itertools
+import json
 import logging
 import random
 import typing
+import numpy as np
 from functools import partial
 from ggsolver import util
-from ggsolver.graph import NodePropertyMap, EdgePropertyMap, Graph, SubGraph
+from ggsolver.graph import NodePropertyMap, EdgePropertyMap, Graph, SubGraph, GraphIndex, _gather
 from tqdm import tqdm
 
 # try:
@@ -1002,24 +1004,29 @@ class Solver:
     Represents a game solver that computes the winning regions and strategies for the players
     under a fixed solution concept.
 
+    Solvers of the same graph share its :class:`ggsolver.graph.GraphIndex` (state to node mapping, edge arrays,
+    predecessor index, action grouping), which is constructed once per graph. The node and edge winners are
+    stored in arrays indexed by node id and edge id. The solution subgraph (see :meth:`Solver.solution`) and
+    its property maps are constructed only when requested.
+
     :param graph: (Graph or SubGraph instance) Graph or subgraph representing the game on a graph.
     """
     def __init__(self, graph, **kwargs):
         # Load and validate graph
         self._graph = graph
-        self._solution = SubGraph(self._graph)
+        self._graph_index = GraphIndex.of(graph)
+        self._solution = None
 
-        # Associate node and edge properties with solution
-        self._node_winner = NodePropertyMap(self._solution, default=-1)     # Values denote which player wins from node.
-        self._edge_winner = EdgePropertyMap(self._solution, default=-1)     # Values denote which player wins from edge.
-        self._solution["node_winner"] = self._node_winner
-        self._solution["edge_winner"] = self._edge_winner
+        # Node and edge winners (-1 if undetermined), indexed by node id and edge id.
+        self._node_winner = np.full(self._graph_index.num_nodes, -1, dtype=np.int64)
+        self._edge_winner = np.full(len(self._graph_index.edges), -1, dtype=np.int64)
 
         # Status variables
         self._is_solved = False
 
         # Cache variables
-        self._state2node = {self._solution["state"][uid]: uid for uid in self._solution.nodes()}
+        self._state2node = self._graph_index.state2node()
+        self._index = None
 
     def __str__(self):
         return f"<Solver for {self._graph}>"
@@ -1028,6 +1035,10 @@ class Solver:
         """ Returns the input game graph. """
         return self._graph
 
+    def graph_index(self):
+        """ Returns the (shared) index of the input game graph. """
+        return self._graph_index
+
     def state2node(self, state):
         """ Helper function to get the node id associated with given state. """
         return self._state2node[state]
@@ -1046,6 +1057,8 @@ class Solver:
         """
         if not self.is_solved():
             raise ValueError(f"{self} is not solved.")
+        if self._solution is None:
+            self._solution = self._make_solution()
         return self._solution
 
     def solve(self):
@@ -1055,41 +1068,123 @@ class Solver:
     def winner(self, state):
         """ Returns the player who wins from the given state. """
         uid = self.state2node(state)
-        return self._node_winner[uid]
+        return int(self._node_winner[uid])
 
     def win_acts(self, state):
         """ Retuns the list of winning actions from the given state. """
-        # Get the input domain (name of function) of game
-        ep_input = self._solution["input"]
-
-        # Get node id for the state
+        index = self._get_action_index()
         uid = self.state2node(state)
+        actions = index["actions"]
+        return [actions[i] for i in index["indices"][index["indptr"][uid]:index["indptr"][uid + 1]].tolist()]
 
-        # Determine which player has a winning strategy at the state
-        player = self._node_winner[uid]
-
-        # Identify all winning actions.
-        win_acts = set()
-        for _, vid, key in self._graph.out_edges(uid):
-            if self._edge_winner[uid, vid, key] == player:
-                # win_acts.add(self._graph[ep_input][uid, vid, key])
-                win_acts.add(ep_input[uid, vid, key])
+    def win_acts_batch(self, states):
+        """
+        Returns the lists of winning actions from the given states.
 
-        # Convert to list and return
-        return list(win_acts)
+        :param states: (Iterable) States.
+        :return: (list of lists) i-th element is the list of winning actions from i-th state.
+        """
+        index = self._get_action_index()
+        uids = np.fromiter((self._state2node[state] for state in states), dtype=np.int64)
+        lengths = index["indptr"][uids + 1] - index["indptr"][uids]
+        bounds = np.cumsum(lengths)
+        actions = index["actions"]
+        flat = [actions[i] for i in _gather(index["indptr"], index["indices"], uids).tolist()]
+        return [flat[stop - length:stop] for stop, length in zip(bounds.tolist(), lengths.tolist())]
 
     def win_region(self, player):
         """ Returns the winning region for the player. """
-        # return [self._solution["state"][uid] for uid in self._solution.nodes() if self._node_winner[uid] == player]
-        return [self._solution["state"][uid] for uid in self._solution.nodes() if self._node_winner[uid] == player]
+        index = self._get_index()
+        if player not in index["regions"]:
+            np_state = self._graph["state"]
+            index["regions"][player] = [np_state[uid] for uid in np.flatnonzero(self.win_region_mask(player)).tolist()]
+        return list(index["regions"][player])
+
+    def win_region_mask(self, player):
+        """
+        Returns the winning region for the player as a boolean array indexed by node id.
+
+        :param player: (int) Player.
+        :return: (numpy array) Boolean mask of nodes from which the player wins.
+        """
+        index = self._get_index()
+        return index["winner"] == player
 
     def reset(self):
         """ Resets the solver. """
-        self._solution = SubGraph(self._graph)
-        self._node_winner = NodePropertyMap(self._solution, default=-1)  # Values denote which player wins from node.
-        self._edge_winner = EdgePropertyMap(self._solution, default=-1)  # Values denote which player wins from edge.
-        self._solution["node_winner"] = self._node_winner
-        self._solution["edge_winner"] = self._edge_winner
+        self._solution = None
+        self._node_winner = np.full(self._graph_index.num_nodes, -1, dtype=np.int64)
+        self._edge_winner = np.full(len(self._graph_index.edges), -1, dtype=np.int64)
+        self._index = None
+
+    def _make_solution(self):
+        """
+        Constructs the solution subgraph with node property "node_winner" and edge property "edge_winner"
+        from the winner arrays.
+        """
+        graph_index = self._graph_index
+        nodes = graph_index.nodes
+        np_winner = NodePropertyMap(self._graph, default=-1)
+        np_winner.update((uid, w) for uid, w in zip(nodes.tolist(), self._node_winner[nodes].tolist()) if w != -1)
+        ep_winner = EdgePropertyMap(self._graph, default=-1)
+        ep_winner.update((edge, w) for edge, w in zip(graph_index.edges, self._edge_winner.tolist()) if w != -1)
+
+        solution = SubGraph(self._graph)
+        solution["node_winner"] = np_winner
+        solution["edge_winner"] = ep_winner
+        return solution
+
+    def _save_winners(self, node_winner, edge_winner):
+        """
+        Saves the node and edge winners computed on arrays.
+
+        :param node_winner: (numpy array) Array mapping node id to the winner.
+        :param edge_winner: (numpy array) Array mapping edge id (see :class:`ggsolver.graph.GraphIndex`)
+            to the winner.
+        """
+        nodes = self._graph_index.nodes
+        self._node_winner[nodes] = node_winner[nodes]
+        self._edge_winner[:] = edge_winner
+        self._index = None
+
+    def _set_edge_winner(self, uid, vid, key, winner):
+        """ Sets the winner of edge (uid, vid, key). """
+        self._edge_winner[self._graph_index.edge2id()[uid, vid, key]] = winner
+
+    def _get_index(self):
+        """
+        Returns the query index of the solution, which is constructed on first call after solving the game
+        and discarded by :meth:`Solver.reset`. The index contains
+
+        - "winner": array mapping node id to the winner (-1 for nodes not in solution).
+        - "regions": cache of winning regions (list of states) of players.
+        """
+        if self._index is None:
+            self._index = {"winner": self._node_winner, "regions": dict()}
+        return self._index
+
+    def _get_action_index(self):
+        """
+        Returns the query index of the solution (see :meth:`Solver._get_index`) extended with the winning actions
+        of every node in CSR format: "actions", "indptr", "indices". The winning actions at node `uid` are
+        `actions[i]` for `i` in `indices[indptr[uid]:indptr[uid + 1]]`.
+        """
+        index = self._get_index()
+        if "indptr" in index:
+            return index
+
+        # Winning actions: inputs of edges won by the winner of source node.
+        graph_index = self._graph_index
+        actions, edge_act = graph_index.actions()
+        won = self._edge_winner == index["winner"][graph_index.src]
+        num_actions = max(len(actions), 1)
+        pairs = np.unique(graph_index.src[won] * num_actions + edge_act[won])
+        pair_node, pair_act = np.divmod(pairs, num_actions)
+
+        indptr = np.zeros(graph_index.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_node, minlength=graph_index.num_nodes), out=indptr[1:])
+        index.update({"actions": actions, "indptr": indptr, "indices": pair_act})
+        return index
 
 
 class Strategy:
@@ -1098,27 +1193,123 @@ class Strategy:
 
     Allows customization of losing behavior by specifying a function that maps a losing node to an action.
     By default, losing state is mapped to None.
+
+    The strategy is compiled into flat arrays indexed by node id. Actions are stored once in a list
+    (see :meth:`Strategy.actions`) and referred to by their index. The compiled strategy can be saved to
+    and loaded from a compact binary file (numpy `.npz` format), which does not require the game graph.
+    States and actions must be JSON-serializable to save the strategy.
     """
     def __init__(self, graph, player, losing_behavior=None, **kwargs):
-        assert "node_winner" in graph.node_properties(), "graph must have node property called 'node_winner'. " \
-                                                         "Ensure the graph is the solution generated by a Solver."
-        assert "edge_winner" in graph.edge_properties(), "graph must have edge property called 'edge_winner'. " \
-                                                         "Ensure the graph is the solution generated by a Solver."
+        assert "node_winner" in graph.node_properties, "graph must have node property called 'node_winner'. " \
+                                                       "Ensure the graph is the solution generated by a Solver."
+        assert "edge_winner" in graph.edge_properties, "graph must have edge property called 'edge_winner'. " \
+                                                       "Ensure the graph is the solution generated by a Solver."
         assert losing_behavior is None or callable(losing_behavior), \
             "losing behavior should be a function that takes a state as input and returns either None or an action."
 
         # Instance variables
         self._graph = graph
         self._player = player
-        self._strategy = dict()
         self._losing_behavior = (lambda st: None) if losing_behavior is None else losing_behavior
+        self._actions = list()
+        self._action2index = dict()
+        self._state2node = dict()
 
         # Generate and cache strategy
         self._gen_strategy()
 
+    def actions(self):
+        """ Returns the list of actions. Compiled strategy refers to actions by their index in this list. """
+        return self._actions
+
+    def player(self):
+        """ Returns the player whose strategy is represented. """
+        return self._player
+
+    def state2node(self, state):
+        """ Returns the node id associated with given state. """
+        return self._state2node[state]
+
+    def save(self, fpath):
+        """
+        Saves the compiled strategy to a binary file (numpy `.npz` format).
+
+        :param fpath: (str) Path to which the file should be saved.
+        """
+        arrays = self._arrays()
+        states = list(self._state2node.keys())
+        np.savez_compressed(
+            fpath,
+            kind=np.array(self.__class__.__name__),
+            player=np.array(self._player),
+            actions=np.array(json.dumps(self._actions)),
+            states=np.array(json.dumps(states)),
+            nodes=np.array([self._state2node[st] for st in states], dtype=np.int64),
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, fpath):
+        """
+        Loads a compiled strategy from a binary file saved by :meth:`Strategy.save`.
+        JSON lists in states and actions are converted to tuples.
+
+        :param fpath: (str) Path to file.
+        :return: (Strategy) Strategy of the same class as the saved one.
+        """
+        with np.load(fpath) as data:
+            kind = str(data["kind"])
+            strategy_cls = {sub.__name__: sub for sub in Strategy.__subclasses__()}.get(kind, cls)
+            obj = strategy_cls.__new__(strategy_cls)
+            obj._graph = None
+            obj._player = int(data["player"])
+            obj._losing_behavior = None
+            obj._actions = [_from_json(act) for act in json.loads(str(data["actions"]))]
+            obj._action2index = {act: idx for idx, act in enumerate(obj._actions)}
+            states = [_from_json(st) for st in json.loads(str(data["states"]))]
+            obj._state2node = dict(zip(states, data["nodes"].tolist()))
+            obj._load_arrays({name: data[name] for name in data.files})
+        return obj
+
     def _gen_strategy(self):
         raise NotImplementedError
 
+    def _arrays(self):
+        """ Returns the arrays representing compiled strategy as a dictionary {name: array}. """
+        raise NotImplementedError
+
+    def _load_arrays(self, arrays):
+        """ Restores the compiled strategy from the arrays saved by `_arrays`. """
+        raise NotImplementedError
+
+    def _compile_edges(self):
+        """
+        Collects the winning edges of the player.
+
+        :return: (tuple) Sorted array of node ids; arrays of source node and action index of winning edges
+            (in order of `graph.edges()`).
+        """
+        graph = self._graph
+        np_state = graph["state"]
+        nodes = np.array(sorted(graph.nodes()), dtype=np.int64)
+        self._state2node = {np_state[uid]: uid for uid in nodes.tolist()}
+
+        ep_input = graph["input"]
+        win_edges = graph["edge_winner"]
+        src, act = [], []
+        for uid, vid, key in graph.edges():
+            if win_edges[uid, vid, key] == self._player:
+                src.append(uid)
+                act.append(self._intern(ep_input[uid, vid, key]))
+        return nodes, np.array(src, dtype=np.int64), np.array(act, dtype=np.int64)
+
+    def _intern(self, action):
+        """ Returns the index of action, adding it to the list of actions if needed. """
+        if action not in self._action2index:
+            self._action2index[action] = len(self._actions)
+            self._actions.append(action)
+        return self._action2index[action]
+
 
 class DeterministicStrategy(Strategy):
     """
@@ -1126,23 +1317,43 @@ class DeterministicStrategy(Strategy):
 
     Allows customization of losing behavior by specifying a function that maps a losing node to an action.
     By default, losing state is mapped to None.
+
+    The strategy is compiled into an array mapping node id to the index of the selected action (-1 for None).
     """
     def __call__(self, state):
         """ Returns the action selected by strategy at given state. """
-        return self._strategy[state]
+        return self.at_node(self._state2node[state])
+
+    def at_node(self, uid):
+        """ Returns the action selected by strategy at given node. """
+        idx = self._table[uid]
+        return self._actions[idx] if idx >= 0 else None
+
+    def table(self):
+        """ Returns the compiled strategy: an array mapping node id to the index of action (-1 for None). """
+        return self._table
 
     def _gen_strategy(self):
         # Generate a deterministic strategy by choosing an action at every winning state.
         # States that are losing for the player return according to `losing_behavior` function.
-        ep_input = self._graph["input"]
-        win_edges = self._graph["edge_winner"]
-        for uid in self._graph.nodes():
-            state = self._graph["state"][uid]
-            for _, vid, key in self._graph.out_edges(uid):
-                if win_edges[uid, vid, key] == self._player:
-                    self._strategy[state] = self._graph[ep_input][uid, vid, key]
-                    break
-                self._strategy[state] = self._losing_behavior(state)
+        nodes, src, act = self._compile_edges()
+        self._table = np.full(int(nodes.max()) + 1 if len(nodes) > 0 else 0, -1, dtype=np.int32)
+
+        # The first winning edge of every node.
+        win_nodes, first = np.unique(src, return_index=True)
+        self._table[win_nodes] = act[first]
+
+        np_state = self._graph["state"]
+        for uid in np.setdiff1d(nodes, win_nodes).tolist():
+            action = self._losing_behavior(np_state[uid])
+            if action is not None:
+                self._table[uid] = self._intern(action)
+
+    def _arrays(self):
+        return {"table": self._table}
+
+    def _load_arrays(self, arrays):
+        self._table = arrays["table"]
 
 
 class NonDeterministicStrategy(Strategy):
@@ -1151,43 +1362,68 @@ class NonDeterministicStrategy(Strategy):
 
     Allows customization of losing behavior by specifying a function that maps a losing node to an action.
     By default, losing state is mapped to None.
+
+    The strategy is compiled in CSR format: the indices of winning actions at node `uid` are
+    `indices[indptr[uid]:indptr[uid + 1]]`.
     """
 
     def __call__(self, state):
         """ Returns the action selected by strategy at given state. """
+        return self.at_node(self._state2node[state])
 
-        actions = self._strategy[state]
-        try:
-            return random.choice(actions)
-        except IndexError:   # In case the list is empty.
+    def at_node(self, uid):
+        """ Returns an action sampled uniformly from the winning actions at given node. """
+        start, stop = self._indptr[uid], self._indptr[uid + 1]
+        if start == stop:   # In case the list is empty.
             return None
+        return self._actions[self._indices[random.randrange(start, stop)]]
 
-    def _gen_strategy(self):
-        # Generate a deterministic strategy by choosing an action at every winning state.
-        # States that are losing for the player return according to `losing_behavior` function.
-        ep_input = self._graph["input"]
-        win_edges = self._graph["edge_winner"]
-
-        # Visit all states
-        for uid in self._graph.nodes():
-            state = self._graph["state"][uid]
-
-            # Initialize strategy as empty set
-            self._strategy[state] = set()
-
-            # Visit all outgoing edges from that state
-            for _, vid, key in self._graph.out_edges(uid):
-                # If they are winning for the player, include the action
-                if win_edges[uid, vid, key] == self._player:
-                    self._strategy[state].add(self._graph[ep_input][uid, vid, key])
+    def win_acts(self, state):
+        """ Returns the list of actions that may be selected at given state. """
+        uid = self._state2node[state]
+        return [self._actions[idx] for idx in self._indices[self._indptr[uid]:self._indptr[uid + 1]].tolist()]
 
-            # If no actions were winning, follow losing behavior
-            if len(self._strategy[state]) == 0:
-                # User must ensure that losing behavior returns an iterable
-                self._strategy[state] = self._losing_behavior(state)
+    def table(self):
+        """ Returns the compiled strategy as a tuple of arrays (indptr, indices) in CSR format. """
+        return self._indptr, self._indices
 
-            # Store the valid actions as a list
-            self._strategy[state] = list(self._strategy[state])
+    def _gen_strategy(self):
+        # Generate a non-deterministic strategy by collecting all winning actions at every state.
+        # States that are losing for the player return according to `losing_behavior` function.
+        nodes, src, act = self._compile_edges()
+        num_nodes = int(nodes.max()) + 1 if len(nodes) > 0 else 0
+
+        # If no actions were winning, follow losing behavior.
+        #   User must ensure that losing behavior returns an iterable (or None).
+        np_state = self._graph["state"]
+        losing_src, losing_act = [], []
+        for uid in np.setdiff1d(nodes, src).tolist():
+            actions = self._losing_behavior(np_state[uid])
+            for action in (actions if actions is not None else []):
+                losing_src.append(uid)
+                losing_act.append(self._intern(action))
+        src = np.concatenate([src, np.array(losing_src, dtype=np.int64)])
+        act = np.concatenate([act, np.array(losing_act, dtype=np.int64)])
+
+        # Unique (node, action) pairs sorted by node.
+        pairs = np.unique(np.column_stack([src, act]), axis=0).reshape(-1, 2)
+        self._indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs[:, 0], minlength=num_nodes), out=self._indptr[1:])
+        self._indices = pairs[:, 1].astype(np.int32)
+
+    def _arrays(self):
+        return {"indptr": self._indptr, "indices": self._indices}
+
+    def _load_arrays(self, arrays):
+        self._indptr = arrays["indptr"]
+        self._indices = arrays["indices"]
+
+
+def _from_json(value):
+    """ Converts (nested) lists loaded from JSON to tuples. """
+    if isinstance(value, list):
+        return tuple(_from_json(v) for v in value)
+    return value
 
 
 # Currently (v0.1.5) I do not include randomized strategies with customizable probability distribution on each state.
@@ -1,6 +1,10 @@
 import logging
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ggsolver.graph import GraphIndex
 from ggsolver.mdp.models import QualitativeMDP
-from ggsolver.mdp.reachability import ASWinReach
+from ggsolver.mdp.reach import almost_sure_reach
 from tqdm import tqdm
 logging.basicConfig(level=logging.INFO)
 
@@ -34,13 +38,27 @@ class PrefModel:
 
 
 class ImprovementMDP(QualitativeMDP):
-    def __init__(self, mdp, pref_model: PrefModel):
+    """
+    Improvement MDP of an MDP with respect to a preference model over outcomes.
+
+    :param mdp: (QualitativeMDP) The MDP.
+    :param pref_model: (PrefModel) Preference model over outcomes.
+    :param max_workers: (int) Number of processes used to compute the winning regions of outcomes.
+        If 1, the winning regions are computed in the current process. If None, the number of processors is used.
+        A process pool requires the calling script to be guarded by `if __name__ == "__main__"`. [Default: 1]
+
+    The winning regions of outcomes are stored as sets of MDP states in `_winning_regions`
+    ({outcome index: set of states}).
+    """
+    def __init__(self, mdp, pref_model: PrefModel, max_workers=1):
         super(ImprovementMDP, self).__init__()
         self._mdp = mdp
         self._pref = pref_model
+        self._max_workers = max_workers
         self._outcomes = dict()
         self._winning_regions = dict()
         self._mp_outcomes = self._compute_mp_outcomes()
+        self._mp_class, self._transition = self._compute_transition_table()
 
     def states(self):
         return [(st, 0) for st in self._mdp.states()] + [(st, 1) for st in self._mdp.states()]
@@ -56,27 +74,28 @@ class ImprovementMDP(QualitativeMDP):
         next_states = set()
 
         # Condition 1
-        next_mdp_states = self._mdp.delta(si, act)
-        for n_state in next_mdp_states:
-            # Condition 2 (Safety)
-            if any(self._pref.is_strictly_preferred(r1, r2)
-                   for r1 in self._mp_outcomes[si]
-                   for r2 in self._mp_outcomes[n_state]):
-                continue
-
-            # Condition 3
-            if any(self._pref.is_strictly_preferred(r2, r1)
-                   for r1 in self._mp_outcomes[si]
-                   for r2 in self._mp_outcomes[n_state]) or \
-                    (len(self._mp_outcomes[si]) == 0 and len(self._mp_outcomes[n_state]) > 0):
-                next_states.add((n_state, 1))
-
-            # Condition 4
-            else:
-                next_states.add((n_state, 0))
+        #   Conditions 2 (safety), 3 and 4 are precomputed for every pair of MP(v) classes.
+        row = self._transition[self._mp_class[si]]
+        for n_state in self._mdp.delta(si, act):
+            cls = row[self._mp_class[n_state]]
+            if cls >= 0:
+                next_states.add((n_state, int(cls)))
 
         return next_states
 
+    def classify(self, states, next_states):
+        """
+        Classifies the transitions between the given pairs of MDP states.
+
+        :param states: (Iterable) Source states of MDP.
+        :param next_states: (Iterable) Successor states of MDP. Same length as `states`.
+        :return: (numpy array) For every pair, -1 if the transition is not in improvement MDP (condition 2),
+            1 if it is an improvement (condition 3), and 0 otherwise (condition 4).
+        """
+        src = np.fromiter((self._mp_class[st] for st in states), dtype=np.int64)
+        dst = np.fromiter((self._mp_class[st] for st in next_states), dtype=np.int64)
+        return self._transition[src, dst]
+
     def init_state(self):
         return self._mdp.init_state(), 0
 
@@ -94,8 +113,8 @@ class ImprovementMDP(QualitativeMDP):
         # For each state, v, identify outcomes(v).
         outcomes = {st: set() for st in self._mdp.states()}
         for idx, win in winning_regions.items():
-            for node in win.win1():
-                outcomes[win.graph()["state"][node]].add(idx)
+            for st in win:
+                outcomes[st].add(idx)
         self._outcomes = outcomes
         # print(outcomes)
 
@@ -105,17 +124,105 @@ class ImprovementMDP(QualitativeMDP):
 
         return mp_outcomes
 
+    def _compute_transition_table(self):
+        """
+        Interns the MP(v) sets as bitsets of outcomes and classifies the transitions between every pair of
+        distinct bitsets.
+
+        :return: (tuple) Mapping of MDP state to the class of its MP(v) bitset and the transition table,
+            whose entry (i, j) is -1, 1 or 0 (see :meth:`ImprovementMDP.classify`).
+        """
+        indices = list(self._pref.outcomes_dict().keys())
+        position = {idx: i for i, idx in enumerate(indices)}
+
+        # worse[i]: bitset of outcomes to which i-th outcome is strictly preferred.
+        worse = [sum(1 << position[b] for b in indices if self._pref.is_strictly_preferred(a, b)) for a in indices]
+
+        masks = dict()
+        mp_class = dict()
+        for st, mp_st in self._mp_outcomes.items():
+            mask = sum(1 << position[idx] for idx in mp_st)
+            mp_class[st] = masks.setdefault(mask, len(masks))
+
+        # rows[c]: bitset of outcomes to which some outcome in c-th class is strictly preferred.
+        masks = list(masks)
+        rows = [0] * len(masks)
+        for c, mask in enumerate(masks):
+            for i, row in enumerate(worse):
+                if mask >> i & 1:
+                    rows[c] |= row
+
+        transition = np.zeros((len(masks), len(masks)), dtype=np.int8)
+        for c1, mask1 in enumerate(masks):
+            for c2, mask2 in enumerate(masks):
+                if rows[c1] & mask2:
+                    transition[c1, c2] = -1
+                elif rows[c2] & mask1 or (mask1 == 0 and mask2 != 0):
+                    transition[c1, c2] = 1
+
+        return mp_class, transition
+
     def _compute_winning_regions(self):
+        """
+        Computes the almost-sure winning region to reach the final states of every outcome.
+
+        The games of different outcomes are independent. When more than one worker is allowed (`max_workers` is
+        not 1), they are solved by a pool of processes. The workers share the arrays of the graph index, which are
+        saved once to a temporary directory and memory-mapped by every worker.
+
+        :return: (dict) Mapping of outcome index to the set of winning states.
+        """
         print(f"Computing winning regions ... ")
         graph = self._mdp.graphify()
+        index = GraphIndex.of(graph)
+        targets = self._compute_final_nodes(graph, index)
+
+        regions = dict()
+        if self._max_workers == 1 or len(targets) <= 1:
+            for idx in tqdm(targets, desc="Solving for winning regions"):
+                regions[idx] = _almost_sure_win(index, targets[idx])
+        else:
+            with tempfile.TemporaryDirectory() as dirpath:
+                index.save(dirpath)
+                with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+                    futures = {executor.submit(_solve_outcome, dirpath, nodes): idx for idx, nodes in targets.items()}
+                    for future in tqdm(as_completed(futures), total=len(futures), desc="Solving for winning regions"):
+                        regions[futures[future]] = future.result()
+
+        np_state = graph["state"]
+        return {idx: {np_state[uid] for uid in regions[idx].tolist()} for idx in targets}
+
+    def _compute_final_nodes(self, graph, index):
+        """
+        Determines the final nodes of all outcomes in one pass over the nodes whose states belong to some outcome.
+
+        :return: (dict) Mapping of outcome index to the array of final nodes.
+        """
         # PATCH (in general final states should be determined in model)
-        win = {idx: ASWinReach(graph, final={node for node in graph.nodes()
-                                             if graph["state"][node] in final and graph["state"][node][3][idx] == 1})
-               for idx, final in self._pref.outcomes_dict().items()}
+        #   A node is final for outcome idx if its state is in the outcome and state[3][idx] == 1.
+        state2node = index.state2node()
+        np_state = graph["state"]
+        outcomes = self._pref.outcomes_dict()
+        indices = list(outcomes.keys())
+
+        # Membership of candidate nodes (rows) in outcomes (columns).
+        members = [[state2node[st] for st in final if st in state2node] for final in outcomes.values()]
+        candidates = np.unique(np.fromiter((uid for nodes in members for uid in nodes), dtype=np.int64))
+        member = np.zeros((len(candidates), len(indices)), dtype=bool)
+        for col, nodes in enumerate(members):
+            member[np.searchsorted(candidates, nodes), col] = True
+
+        flags = np.array([np_state[uid][3] for uid in candidates.tolist()]).reshape(len(candidates), -1)
+        is_final = member & (flags[:, indices] == 1) if len(candidates) > 0 else member
+        return {idx: candidates[is_final[:, col]] for col, idx in enumerate(indices)}
+
+
+def _almost_sure_win(index, final):
+    """ Almost-sure winning nodes to reach the final nodes in the graph of given index. """
+    alive = index.mask(index.nodes)
+    return np.flatnonzero(almost_sure_reach(index, alive, index.mask(final) & alive))
 
-        pbar = tqdm(win)
-        for idx in pbar:
-            pbar.set_description(f"Solving for winning regions {idx}/{len(win)}")
-            win[idx].solve()
-        return win
 
+def _solve_outcome(dirpath, final):
+    """ Worker: solves the almost-sure reachability game of an outcome on the memory-mapped graph index. """
+    return _almost_sure_win(GraphIndex.load(dirpath), final)
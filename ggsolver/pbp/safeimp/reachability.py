@@ -1,14 +1,29 @@
 """
 Solver for SPI and SASI strategies.
 """
-from ggsolver.mdp.reachability import ASWinReach, PWinReach
+import logging
+import numpy as np
 from ggsolver.models import Solver
-from pprint import pprint
+from ggsolver.mdp.reach import positive_reach, almost_sure_reach
+
+
+logger = logging.getLogger(__name__)
 
 
 class SASIReach(Solver):
     """
     Alg. 1 from ACC 2023 paper.
+
+    Computes the levels `W_1, W_2, ...` of an improvement MDP, whose states are pairs `(si, mi)`.
+    `W_1` is the almost-sure winning region to reach the final nodes. Every next level `W_{k+1}` is the almost-sure
+    winning region to reach `R_{k+1} = {(si, 1) | (si, 0) in W_k}`. The rank of a node is the largest `k` such that
+    the node is in `W_k` (and 0, if it is not in `W_1`).
+
+    The levels are computed incrementally. Almost-sure reachability is monotone in the targets. Hence, when the
+    targets shrink (`R_{k+1} ⊆ R_k`), `W_{k+1} ⊆ W_k` and `W_{k+1}` is computed within the sub-MDP of `W_k`.
+    Targets are mapped from `(si, 0)` to `(si, 1)` using an array that pairs the nodes, which is constructed once.
+    The iteration stops when there are no targets or when the targets do not change (then, every further level
+    would be the same).
     """
     def __init__(self, graph, final, **kwargs):
         """
@@ -21,61 +36,58 @@ class SASIReach(Solver):
         super(SASIReach, self).__init__(graph, **kwargs)
         self._final = final
         self._strategy_graph = None
-        self._state2id = {self._graph["state"][uid]: uid for uid in self._graph.nodes()}
+        self._state2id = self._state2node
+        self._pairing = _pair_nodes(self._graph_index, self._graph["state"], self._state2node)
+        self._win1 = list()
+        self._rank = None
 
     def solve(self):
-        print(f"Initialize iter_count=0")
-        iter_count = 0
-
-        set_r = set(self._final)
-        # print(f"set_r={[self._graph['state'][node] for node in set_r]}")
-
-        set_cal_w = []
-        # print(f"set_cal_w={set_cal_w}")
-
-        while len(set_r) > 0:
-            print(f"--------- {iter_count + 1}-th iteration -----------")
-            set_w = ASWinReach(self._graph, final=set_r)
-            set_w.solve()
-            set_w = set_w.win1()
-            # print(f"set_r={[self._graph['state'][node] for node in set_r]}")
-            # print(f"set_w={[self._graph['state'][node] for node in set_w]}")
-
-            set_r = set()
-            for uid in set_w:
-                si, mi = self._graph["state"][uid]
-                if mi == 0:
-                    set_r.add((si, 1))
-
-            set_r = {node for node in self._graph.nodes() if self._graph["state"][node] in set_r}
-
-            if iter_count == 0:
-                set_cal_w.insert(0, set(self._graph.nodes()) - set_w)
-
-            set_cal_w.append(set_w)
-            # print(f"set_cal_w={[{self._graph['state'][node] for node in level} for level in set_cal_w]}")
-
-            iter_count += 1
-
-        self._win1 = set_cal_w
-        print("Num levels: ", len(self._win1))
-        # print("------ win ---------")
-        # iter_count = 0
-        # for level in set_cal_w:
-        #     # print(iter_count, [self._graph['state'][node] for node in level])
-        #     iter_count += 1
-        # print(f"win1={[[self._graph['state'][node] for node in level] for level in self._win1]}")
+        index = self._graph_index
+        all_nodes = index.mask(index.nodes)
+        alive = all_nodes
+        target = index.mask(self._final) & all_nodes
+
+        levels = []
+        while target.any():
+            win = self._win_region(alive, target)
+            if len(levels) == 0:
+                levels.append(all_nodes & ~win)
+            levels.append(win)
+            logger.info(f"{self.__class__.__name__}: level {len(levels) - 1} has {np.count_nonzero(win)} nodes.")
+
+            # Next targets: (si, 1) such that (si, 0) is winning.
+            next_target = index.mask(self._pairing[win & (self._pairing >= 0)])
+            if np.array_equal(next_target, target):
+                break
+
+            # Warm start: if the targets shrink, next level is contained in current level.
+            alive = win if not np.any(next_target & ~target) else all_nodes
+            target = next_target
+
+        self._win1 = [set(np.flatnonzero(level).tolist()) for level in levels]
+        self._rank = np.zeros(index.num_nodes, dtype=np.int64)
+        for rank, level in enumerate(levels[1:], start=1):
+            self._rank[level] = rank
+        self._is_solved = True
+
+    def win1(self):
+        """ Returns the list of levels. The k-th level is the set of nodes in `W_k` (0-th level: nodes not in `W_1`). """
+        return self._win1
 
     def rank(self, state):
         uid = self._state2id[state]
-        for rank in range(len(self._win1) - 1, -1, -1):
-            if uid in self._win1[rank]:
-                return rank
+        return int(self._rank[uid])
+
+    def _win_region(self, alive, target):
+        """ Almost-sure winning region to reach the target within the sub-MDP of alive nodes. """
+        return almost_sure_reach(self._graph_index, alive, target)
 
 
-class SPIReach(Solver):
+class SPIReach(SASIReach):
     """
     Alg. 1 from ACC 2023 paper.
+
+    Computes the levels as :class:`SASIReach` using positive winning regions instead of almost-sure winning regions.
     """
     def __init__(self, graph, final, **kwargs):
         """
@@ -85,56 +97,18 @@ class SPIReach(Solver):
         :param final: (iterable) A list/tuple/set of final nodes in graph.
         :param kwargs: SureWinReach accepts no keyword arguments.
         """
-        super(SPIReach, self).__init__(graph, **kwargs)
-        self._final = final
-        self._strategy_graph = None
-        self._state2id = {self._graph["state"][uid]: uid for uid in self._graph.nodes()}
-
-    def solve(self):
-        print(f"Initialize iter_count=0")
-        iter_count = 0
-
-        set_r = set(self._final)
-        # print(f"set_r={[self._graph['state'][node] for node in set_r]}")
-
-        set_cal_w = []
-        # print(f"set_cal_w={set_cal_w}")
+        super(SPIReach, self).__init__(graph, final, **kwargs)
 
-        while len(set_r) > 0:
-            print(f"--------- {iter_count + 1}-th iteration -----------")
-            set_w = PWinReach(self._graph, final=set_r)
-            set_w.solve()
-            set_w = set_w.win1()
-            # print(f"set_r={[self._graph['state'][node] for node in set_r]}")
-            # print(f"set_w={[self._graph['state'][node] for node in set_w]}")
+    def _win_region(self, alive, target):
+        """ Positive winning region to reach the target within the sub-MDP of alive nodes. """
+        return positive_reach(self._graph_index, alive, target)
 
-            set_r = set()
-            for uid in set_w:
-                si, mi = self._graph["state"][uid]
-                if mi == 0:
-                    set_r.add((si, 1))
 
-            set_r = {node for node in self._graph.nodes() if self._graph["state"][node] in set_r}
-
-            if iter_count == 0:
-                set_cal_w.insert(0, set(self._graph.nodes()) - set_w)
-
-            set_cal_w.append(set_w)
-            # print(f"set_cal_w={[{self._graph['state'][node] for node in level} for level in set_cal_w]}")
-
-            iter_count += 1
-
-        self._win1 = set_cal_w
-        print("Num levels: ", len(self._win1))
-        # print("------ win ---------")
-        # iter_count = 0
-        # for level in set_cal_w:
-        #     # print(iter_count, [self._graph['state'][node] for node in level])
-        #     iter_count += 1
-        # print(f"win1={[[self._graph['state'][node] for node in level] for level in self._win1]}")
-
-    def rank(self, state):
-        uid = self._state2id[state]
-        for rank in range(len(self._win1) - 1, -1, -1):
-            if uid in self._win1[rank]:
-                return rank
\ No newline at end of file
+def _pair_nodes(index, np_state, state2node):
+    """ Array mapping the node of (si, 0) to the node of (si, 1). Other nodes are mapped to -1. """
+    pairing = np.full(index.num_nodes, -1, dtype=np.int64)
+    for uid in index.nodes.tolist():
+        si, mi = np_state[uid]
+        if mi == 0:
+            pairing[uid] = state2node.get((si, 1), -1)
+    return pairing
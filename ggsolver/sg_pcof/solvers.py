@@ -1,6 +1,9 @@
 import random
+import numpy as np
 # from ggsolver.models import Solver
+import ggsolver.graph as mod_graph
 import ggsolver.models as models
+from ggsolver.mdp.reach import positive_reach
 from tqdm import tqdm
 
 
@@ -25,7 +28,8 @@ class ASWinReach(models.Solver):
         Using the same variable names as Alg. 45.
         """
         # Initialize algorithm variables
-        graph = self._solution
+        #   Subgraph is used to hide the edges and nodes that are removed by the algorithm.
+        graph = mod_graph.SubGraph(self._graph)
         b = self._final
 
         # Make B absorbing
@@ -56,13 +60,13 @@ class ASWinReach(models.Solver):
                 break
 
         # Process node, edge winners
-        for uid in tqdm(self._solution.nodes(), desc="Processing node, edge winners..."):
-            self._node_winner[uid] = 1 if self._solution.is_node_visible(uid) else 3
-            out_edges = self._solution.out_edges(uid)
-            winning_acts = {self._solution["input"][uid, vid, key]
-                            for _, vid, key in out_edges if self._solution.is_edge_visible(uid, vid, key)}
+        for uid in tqdm(graph.nodes(), desc="Processing node, edge winners..."):
+            self._node_winner[uid] = 1 if graph.is_node_visible(uid) else 3
+            out_edges = graph.out_edges(uid)
+            winning_acts = {graph["input"][uid, vid, key]
+                            for _, vid, key in out_edges if graph.is_edge_visible(uid, vid, key)}
             for _, vid, key in out_edges:
-                self._edge_winner[uid, vid, key] = 1 if self._solution["input"][uid, vid, key] in winning_acts else 3
+                self._set_edge_winner(uid, vid, key, 1 if graph["input"][uid, vid, key] in winning_acts else 3)
 
     @staticmethod
     def disconnected(graph, sources):
@@ -97,27 +101,28 @@ class PWinReach(models.Solver):
         self._strategy_graph = None
 
     def solve(self):
+        """
+        Computes the nodes from which a final node is reached with positive probability, i.e., the nodes from
+        which there exists a path to a final node. An action is winning at a node if some edge labeled by the action
+        leads to a winning node.
+
+        The backward search runs over the cached predecessor index of the graph (see
+        :class:`ggsolver.graph.GraphIndex`) with one array of nodes per layer.
+        """
         # Reset the solver
         self.reset()
 
-        # Get final states
-        final = self._final
-
-        with tqdm(total=self._solution.number_of_nodes()) as progress_bar:
-            # Identify the set of nodes from which a final state can be reached (i.e., there exists a path in graph)
-            progress_bar.set_description("Running reverse BFS...")
-            reachable_nodes = self._solution.reverse_bfs(final)
-
-            # Hide the nodes in MDP.
-            progress_bar.set_description("Marking node, edge winners...")
-            for uid in self._solution.nodes():
-                progress_bar.update(1)
-                self._node_winner[uid] = 1 if uid in reachable_nodes else 3
-                out_edges = self._solution.out_edges(uid)
-                winning_acts = {self._solution["input"][uid, vid, key]
-                                for _, vid, key in out_edges if vid not in reachable_nodes}
-                for _, vid, key in out_edges:
-                    self._edge_winner[uid, vid, key] = 1 if self._solution["input"][uid, vid, key] in winning_acts else 3
+        # Backward search from final nodes over the predecessor index.
+        index = self._graph_index
+        alive = index.mask(index.nodes)
+        win = positive_reach(index, alive, index.mask(self._final) & alive)
+
+        # Action at a node is winning if one of its edges leads to a winning node.
+        _, _, edge_group = index.action_groups()
+        group_win = np.bincount(edge_group, weights=win[index.dst], minlength=edge_group.max(initial=-1) + 1) > 0
+        node_winner = np.where(win, 1, 3)
+        edge_winner = np.where(group_win[edge_group], 1, 3)
+        self._save_winners(node_winner, edge_winner)
 
         # Mark the game as solved.
         self._is_solved = True
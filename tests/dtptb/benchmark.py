@@ -0,0 +1,29 @@
+"""
+Benchmarks dtptb parity game solvers for randomly generated parity games with variety of inputs.
+"""
+
+import logging
+import time
+from rand_pg import rand_parity_game
+from ggsolver.dtptb import SWinParity, SWinParityPP
+
+
+def benchmark(num_nodes, num_colors, max_out_degree, seed=0):
+    game = rand_parity_game(num_nodes, num_colors, max_out_degree, seed=seed)
+    row = [num_nodes, num_colors, max_out_degree]
+    regions = []
+    for solver_cls in [SWinParity, SWinParityPP]:
+        solver = solver_cls(game)
+        start = time.perf_counter()
+        solver.solve()
+        row.append(time.perf_counter() - start)
+        regions.append(sorted(solver.win_region(1)))
+    assert regions[0] == regions[1], "Solvers disagree on winning region of player 1."
+    return row
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.ERROR)
+    print(f"{'nodes':>8} {'colors':>8} {'degree':>8} {'zielonka(s)':>12} {'pp(s)':>12}")
+    for n, c, d in [(100, 5, 3), (1000, 10, 3), (1000, 100, 3), (10000, 10, 5), (10000, 1000, 5)]:
+        print("{:>8} {:>8} {:>8} {:>12.4f} {:>12.4f}".format(*benchmark(n, c, d)))
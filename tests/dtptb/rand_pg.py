@@ -0,0 +1,47 @@
+"""
+Generates random parity games given number of nodes, number of colors and maximum out degree for any node.
+"""
+
+import numpy as np
+import ggsolver.graph as graph
+
+
+def rand_parity_game(num_nodes, num_colors, max_out_degree, seed=None):
+    """
+    Generates a random deterministic two-player turn-based parity game.
+    Every node has at least one successor, a random owner and a random color in `[0, num_colors)`.
+
+    :param num_nodes: (int) Number of nodes.
+    :param num_colors: (int) Number of colors.
+    :param max_out_degree: (int) Maximum number of successors of a node.
+    :param seed: (int) Seed for random number generator.
+    :return: (Graph) Game graph with node properties "state", "turn", "final", edge property "input" and
+        graph properties required by dtptb solvers.
+    """
+    rng = np.random.default_rng(seed)
+    turn = rng.integers(1, 3, size=num_nodes)
+    color = rng.integers(0, num_colors, size=num_nodes)
+    out_degree = rng.integers(1, max_out_degree + 1, size=num_nodes)
+
+    game = graph.Graph()
+    nodes = list(game.add_nodes(num_nodes))
+    np_state = graph.NodePropertyMap(game)
+    np_turn = graph.NodePropertyMap(game)
+    np_final = graph.NodePropertyMap(game)
+    ep_input = graph.EdgePropertyMap(game)
+    for uid in nodes:
+        np_state[uid] = uid
+        np_turn[uid] = int(turn[uid])
+        np_final[uid] = int(color[uid])
+        for vid in set(rng.integers(0, num_nodes, size=out_degree[uid]).tolist()):
+            key = game.add_edge(uid, vid)
+            ep_input[uid, vid, key] = vid
+
+    game["state"] = np_state
+    game["turn"] = np_turn
+    game["final"] = np_final
+    game["input"] = ep_input
+    game["is_deterministic"] = True
+    game["is_probabilistic"] = False
+    game["is_turn_based"] = True
+    return game